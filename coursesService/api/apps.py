@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # Hooks the request metrics into every database connection; must run
+        # before the first connection is opened.
+        from coursesService import metrics  # noqa: F401
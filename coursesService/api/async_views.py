@@ -0,0 +1,162 @@
+import json
+import math
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models.functions import Lower
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed, Throttled
+
+from base.models import Course
+from base.search import search_courses
+from coursesService.authentication import ExternalJWTAuthentication
+from .serializers import CourseSerializer, parse_fields
+from .pagination import apaginate_rows, parse_limit, trim_rows, with_key_fields
+from .permissions import IsStudent, IsStaff
+from .throttling import ReadWriteThrottle, get_store as get_throttle_store
+from .views import _catalog_snapshot_response, _filter_courses
+from . import cache, catalog
+
+# Native async versions of getCourses, createCourse and deleteCourse.
+#
+# DRF function views are synchronous, so under ASGI each one occupies a
+# thread for its whole duration. These are plain Django async views that read
+# through Django's async ORM and only hop to a thread for the parts Django
+# cannot do asynchronously (serializer validation queries and transactions).
+# Responses match the DRF views; discussion threads still go through the outbox.
+
+
+async def _authorize(request, permission):
+    """
+    Authenticate ``request``, check ``permission`` and charge the client's
+    rate limit, like DRF does for the sync views.
+
+    Returns ``None`` if the request may proceed, otherwise the error response.
+    """
+    try:
+        result = ExternalJWTAuthentication().authenticate(request)
+    except AuthenticationFailed as exc:
+        # ExternalJWTAuthentication has no authenticate_header, so DRF answers 403 here too
+        return JsonResponse({'detail': str(exc.detail)}, status=status.HTTP_403_FORBIDDEN)
+    if result is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'},
+                            status=status.HTTP_403_FORBIDDEN)
+    request.user, request.auth = result
+    if not permission().has_permission(request, None):
+        return JsonResponse({'detail': 'You do not have permission to perform this action.'},
+                            status=status.HTTP_403_FORBIDDEN)
+    throttle = ReadWriteThrottle()
+    if get_throttle_store().blocking:
+        allowed = await sync_to_async(throttle.allow_request)(request, None)
+    else:
+        allowed = throttle.allow_request(request, None)
+    if not allowed:
+        wait = throttle.wait()
+        return JsonResponse({'detail': str(Throttled(wait).detail)}, status=status.HTTP_429_TOO_MANY_REQUESTS,
+                            headers={'Retry-After': str(math.ceil(wait))})
+    return None
+
+
+async def _list_courses(params):
+    """
+    Async counterpart of ``views._list_courses``; returns ``(data, error)``.
+    """
+    q = params.get('q', '').strip()
+    try:
+        courses = _filter_courses(params)
+        fields = parse_fields(params.get('fields', ''))
+        if q:
+            if 'cursor' in params:
+                return None, 'cursor cannot be combined with q'
+            limit = parse_limit(params.get('limit', '')) if 'limit' in params else settings.COURSES_SEARCH_MAX_RESULTS
+            rows = search_courses(courses, q).values(*fields)[:limit]
+            return [row async for row in rows], None
+
+        courses = courses.order_by('courseSubject', 'courseID')
+        if 'limit' in params or 'cursor' in params:
+            limit = parse_limit(params.get('limit', ''))
+            rows = courses.values(*with_key_fields(fields))
+            page, next_cursor = await apaginate_rows(rows, limit, params.get('cursor', ''))
+            return {'results': trim_rows(page, fields), 'next_cursor': next_cursor}, None
+        return [row async for row in courses.values(*fields)], None
+    except ValueError as e:
+        return None, str(e)
+
+
+@require_http_methods(['GET'])
+async def getCoursesAsync(request):
+    """
+    Async version of ``getCourses``, with the same query parameters, caching and conditional GET.
+    """
+    denied = await _authorize(request, IsStudent)
+    if denied:
+        return denied
+
+    if not any(request.GET.get(name, '').strip() for name in cache.LISTING_PARAMS):
+        # Building a snapshot takes a lock and runs sync ORM code
+        return await sync_to_async(_catalog_snapshot_response)(request)
+
+    # Reads the catalog version from the database
+    key = await sync_to_async(cache.listing_cache_key)(request.GET)
+    validators = cache.listing_validators(key)
+    headers = cache.validator_headers(validators)
+    if cache.is_not_modified(request, validators):
+        return HttpResponse(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    entry = cache.get_listing(key)
+    if entry is None:
+        data, error = await _list_courses(request.GET)
+        if error:
+            return JsonResponse({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+        entry = cache.store_listing(key, data)
+    return JsonResponse(entry['data'], safe=False, headers=headers)
+
+
+def _save_new_course(data, creator_id):
+    serializer = CourseSerializer(data=data)
+    if not serializer.is_valid():
+        return None, serializer.errors
+    catalog.create_course(serializer, creator_id)
+    return serializer.data, None
+
+
+@csrf_exempt
+@require_http_methods(['POST'])
+async def createCourseAsync(request):
+    """
+    Async version of ``createCourse``. Expects a JSON request body.
+    """
+    denied = await _authorize(request, IsStaff)
+    if denied:
+        return denied
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'error': 'Request body must be JSON'}, status=status.HTTP_400_BAD_REQUEST)
+    # Validation queries for uniqueness and the write runs in a transaction,
+    # neither of which Django's async ORM supports yet.
+    created, errors = await sync_to_async(_save_new_course)(data, request.user.id)
+    if errors:
+        return JsonResponse(errors, status=status.HTTP_400_BAD_REQUEST)
+    return JsonResponse(created, status=status.HTTP_201_CREATED)
+
+
+@csrf_exempt
+@require_http_methods(['DELETE'])
+async def deleteCourseAsync(request, courseSubject, courseID):
+    """
+    Async version of ``deleteCourse``.
+    """
+    denied = await _authorize(request, IsStaff)
+    if denied:
+        return denied
+    try:
+        course = await Course.objects.alias(courseSubject_lower=Lower('courseSubject')).aget(
+            courseSubject_lower=courseSubject.lower(), courseID=courseID)
+    except Course.DoesNotExist:
+        return JsonResponse({'error': 'Course not found'}, status=status.HTTP_404_NOT_FOUND)
+    await sync_to_async(catalog.delete_course)(course)
+    return HttpResponse(status=status.HTTP_204_NO_CONTENT)
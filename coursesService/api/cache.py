@@ -0,0 +1,120 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+
+from . import snapshot
+
+# Read-through cache for course listings.
+#
+# Every cache key embeds the current catalog generation: the catalog version
+# of api.snapshot, i.e. the seq of the latest CourseChange. Every write path
+# appends to the change log in its transaction, so once a write commits all
+# workers build new keys, and the listings cached before it become
+# unreachable and simply age out of the cache. Like the snapshot, writes that
+# bypass the API do not change the generation; call clear() afterwards.
+
+# Query parameters that affect the course listing; anything else is ignored
+# when building the cache key.
+LISTING_PARAMS = ('courseSubject', 'courseSubject_prefix', 'courseID', 'title', 'instructor', 'instructor_prefix',
+                  'q', 'days', 'starts_after', 'ends_before', 'limit', 'cursor', 'fields')
+
+# Query parameters that affect the facet counts
+FACET_PARAMS = ('courseSubject', 'courseSubject_prefix', 'courseID', 'title', 'instructor', 'instructor_prefix',
+                'q', 'days', 'starts_after', 'ends_before')
+
+
+def _cache():
+    return caches[settings.COURSES_CACHE_ALIAS]
+
+
+def get_generation():
+    """
+    Return ``(generation, last_modified)``: the catalog version and the Unix
+    time of the write that reached it (0 before the first logged write).
+    Costs one indexed query.
+    """
+    generation, last_modified = snapshot.catalog_version()
+    return generation, last_modified or 0
+
+
+def clear():
+    """Drop every cached listing and facet count."""
+    _cache().clear()
+
+
+def listing_cache_key(params, kind='list', names=LISTING_PARAMS):
+    """
+    Build a cache key from the normalized listing parameters.
+
+    Parameter order, blank values and unrelated parameters do not change the
+    key. ``kind`` and ``names`` select another cached endpoint and its parameters.
+    """
+    normalized = sorted(
+        (name, params.get(name, '').strip())
+        for name in names if params.get(name, '').strip()
+    )
+    digest = hashlib.sha256(json.dumps(normalized).encode('utf-8')).hexdigest()
+    generation, last_modified = get_generation()
+    return f'courses:{kind}:{generation}:{last_modified}:{digest}'
+
+
+def get_listing(key):
+    """Return the cached entry for ``key``, or ``None`` on a miss."""
+    return _cache().get(key)
+
+
+def store_listing(key, data):
+    """Cache serialized listing ``data`` under ``key`` and return the entry."""
+    entry = {'data': data}
+    _cache().set(key, entry, timeout=settings.COURSES_CACHE_TIMEOUT)
+    return entry
+
+
+def listing_validators(key):
+    """
+    Return the ETag and last-modified time of the listing cached under ``key``.
+
+    Both come from the catalog state rather than the body: the key embeds the
+    catalog generation, its time and a digest of the parameters, and a listing
+    only changes when a write advances the generation. Conditional requests
+    are therefore answered without reading the cache entry, running the query
+    or hashing the response.
+    """
+    _, _, generation, last_modified, digest = key.split(':')
+    return {
+        'etag': f'"{generation}-{digest[:16]}"',
+        'last_modified': int(last_modified),
+    }
+
+
+def is_not_modified(request, validators):
+    """
+    Evaluate the request's conditional headers against ``listing_validators()``.
+
+    ``If-None-Match`` takes precedence over ``If-Modified-Since``.
+    """
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        return '*' in etags or validators['etag'] in etags
+    if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return if_modified_since is not None and validators['last_modified'] <= if_modified_since
+
+
+def validator_headers(validators):
+    """
+    Return the ETag and Last-Modified headers for ``listing_validators()``.
+
+    Last-Modified has one-second resolution, so a response served in the same
+    second as the last write is dated a second earlier: a write later in that
+    second then still counts as newer when the client revalidates with
+    ``If-Modified-Since`` alone.
+    """
+    return {
+        'ETag': validators['etag'],
+        'Last-Modified': http_date(min(validators['last_modified'], int(time.time()) - 1)),
+    }
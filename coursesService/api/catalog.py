@@ -0,0 +1,124 @@
+from django.db import transaction
+from django.db.models import F
+
+from base import facets, prerequisites
+from base.models import Course
+from base.schedule import parse_schedule
+from . import changes, outbox, snapshot
+
+# Write paths for the course catalog.
+#
+# Every view that creates, updates or deletes courses goes through these helpers, so
+# the course write and its side effects (discussions outbox, facet counts,
+# prerequisite graph, change log, catalog snapshot) stay consistent no matter
+# which endpoint made the change.
+
+
+def create_course(serializer, creator_id):
+    """
+    Save a validated ``CourseSerializer`` as a new course and return the course.
+
+    The course, its discussion-thread outbox entry, its facet counts, its
+    prerequisite edges and its change-log entry are written in one transaction.
+    """
+    with transaction.atomic():
+        course = serializer.save(creator_id=creator_id)
+        outbox.enqueue_discussion_create(course)
+        facets.record(added=[facets.facet_values(course)])
+        prerequisites.refresh([course], created=True)
+        changes.record_created([course])
+    outbox.wake_dispatcher()
+    snapshot.schedule_rebuild()
+    return course
+
+
+# Fields shown in a course's discussion thread; changing any of them updates the thread
+THREAD_FIELDS = ('courseSubject', 'courseID', 'title')
+
+# Fields that change a course's place in the prerequisite graph
+GRAPH_FIELDS = ('courseSubject', 'courseID', 'requirements')
+
+
+def update_course(course, new_values, expected_version):
+    """
+    Apply ``new_values`` (field name to new value) to ``course`` if its stored
+    version is still ``expected_version``.
+
+    The check and the write are a single conditional UPDATE of just the
+    changed columns, so no row lock is held between reading and writing.
+    Returns the updated course, or ``None`` if the course was changed or
+    deleted concurrently. The discussion thread is only updated when a field
+    it shows changes.
+    """
+    old_subject, old_id = course.courseSubject, course.courseID
+    old_facets = facets.facet_values(course)
+    if 'schedule' in new_values:
+        days, start, end = parse_schedule(new_values['schedule'])
+        new_values = {**new_values, 'schedule_days': days, 'schedule_start': start, 'schedule_end': end}
+    with transaction.atomic():
+        updated = Course.objects.filter(pk=old_id, version=expected_version).update(
+            **new_values, version=F('version') + 1)
+        if not updated:
+            return None
+        for field, value in new_values.items():
+            setattr(course, field, value)
+        course.version = expected_version + 1
+        if any(field in new_values for field in facets.FACETS):
+            facets.record(added=[facets.facet_values(course)], removed=[old_facets])
+        if any(field in new_values for field in GRAPH_FIELDS):
+            old_key = (old_subject.upper(), old_id)
+            key_changed = old_key != prerequisites.course_key(course)
+            prerequisites.refresh([course], removed_keys=[old_key] if key_changed else (),
+                                  removed_ids=[old_id] if old_id != course.courseID else ())
+        changes.record_updated(old_subject, old_id, course)
+        if any(field in new_values for field in THREAD_FIELDS):
+            outbox.enqueue_discussion_update(old_subject, old_id, course)
+            outbox.wake_dispatcher()
+    snapshot.schedule_rebuild()
+    return course
+
+
+def delete_course(course):
+    """
+    Delete ``course``, queueing the deletion of its discussion thread,
+    uncounting its facets, updating the prerequisite graph and logging the
+    change in the same transaction.
+    """
+    with transaction.atomic():
+        outbox.enqueue_discussion_delete(course)
+        facets.record(removed=[facets.facet_values(course)])
+        changes.record_deleted([course])
+        key = prerequisites.course_key(course)
+        course.delete()
+        prerequisites.refresh(removed_keys=[key])
+    outbox.wake_dispatcher()
+    snapshot.schedule_rebuild()
+
+
+def delete_courses(courses, limit=None):
+    """
+    Delete every course in the ``courses`` queryset and return the deleted
+    courses.
+
+    The matching rows are locked and read once, then removed with one
+    set-based DELETE. The discussion-thread deletions are queued with one
+    outbox INSERT (the dispatcher delivers them concurrently), and the facet
+    counts, prerequisite graph and change log are updated, all in the same
+    transaction. Raises ``ValueError`` without deleting anything if more than
+    ``limit`` courses match.
+    """
+    with transaction.atomic():
+        matched = courses.select_for_update()
+        deleted = list(matched if limit is None else matched[:limit + 1])
+        if limit is not None and len(deleted) > limit:
+            raise ValueError(f'More than {limit} courses match; narrow the filter')
+        if not deleted:
+            return []
+        outbox.enqueue_discussion_deletes(deleted)
+        facets.record(removed=[facets.facet_values(course) for course in deleted])
+        changes.record_deleted(deleted)
+        Course.objects.filter(pk__in=[course.courseID for course in deleted]).delete()
+        prerequisites.refresh(removed_keys=[prerequisites.course_key(course) for course in deleted])
+    outbox.wake_dispatcher()
+    snapshot.schedule_rebuild()
+    return deleted
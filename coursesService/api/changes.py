@@ -0,0 +1,202 @@
+import asyncio
+import json
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, transaction
+
+from base.models import CourseChange
+from .serializers import COURSE_FIELDS
+
+# Catalog change log behind GET /api/courses/changes/.
+#
+# The catalog write paths call the record_* helpers inside the transaction of
+# their Course write. Readers page through the log by ``seq``; long-poll and
+# Server-Sent Events readers wait on a condition that is notified when a write
+# in this process commits, and re-check the database every
+# COURSES_CHANGES_POLL_INTERVAL seconds to see writes from other processes.
+# Under ASGI, SSE readers wait on the event loop instead (aiter_events).
+
+CHANGE_FIELDS = ('seq', 'action', 'courseSubject', 'courseID', 'course')
+
+# Arbitrary key of the PostgreSQL advisory lock that serializes log appends
+_POSTGRES_LOCK_KEY = 0x636f7572
+
+_committed = threading.Condition()
+# Bumped with every notify, so event-loop readers can see commits without
+# blocking on the condition
+_commits = 0
+
+# Seconds between an event-loop reader's checks of _commits
+_COMMIT_CHECK_INTERVAL = 0.05
+
+# Long-poll and SSE readers each hold a worker thread while they wait, so
+# their number is capped per process (COURSES_CHANGES_MAX_WAITERS).
+_waiters_lock = threading.Lock()
+_waiters = 0
+
+
+def course_row(course):
+    """Return the JSON-ready field values of ``course``, as listed by getCourses."""
+    return {field: getattr(course, field) for field in COURSE_FIELDS}
+
+
+def _append(entries):
+    if connection.vendor == 'postgresql':
+        # Sequence values are handed out at INSERT time but become visible at
+        # COMMIT; holding this lock until commit keeps commit order equal to
+        # seq order, so a reader can never skip a change committed late.
+        # SQLite write transactions are already serialized.
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [_POSTGRES_LOCK_KEY])
+    CourseChange.objects.bulk_create(entries)
+    transaction.on_commit(_notify)
+
+
+def _notify():
+    global _commits
+    with _committed:
+        _commits += 1
+        _committed.notify_all()
+
+
+def record_created(courses):
+    """Log the creation of ``courses``."""
+    _append([CourseChange(action=CourseChange.ACTION_CREATE, courseSubject=course.courseSubject,
+                          courseID=course.courseID, course=course_row(course)) for course in courses])
+
+
+def record_updated(old_subject, old_id, course):
+    """
+    Log an update of the course previously keyed by ``(old_subject, old_id)``;
+    ``course`` holds the new values.
+    """
+    if (old_subject, old_id) == (course.courseSubject, course.courseID):
+        _append([CourseChange(action=CourseChange.ACTION_UPDATE, courseSubject=course.courseSubject,
+                              courseID=course.courseID, course=course_row(course))])
+        return
+    _append([
+        CourseChange(action=CourseChange.ACTION_DELETE, courseSubject=old_subject, courseID=old_id),
+        CourseChange(action=CourseChange.ACTION_CREATE, courseSubject=course.courseSubject,
+                     courseID=course.courseID, course=course_row(course)),
+    ])
+
+
+def record_deleted(courses):
+    """Log the deletion of ``courses``."""
+    _append([CourseChange(action=CourseChange.ACTION_DELETE, courseSubject=course.courseSubject,
+                          courseID=course.courseID) for course in courses])
+
+
+def changes_since(since, limit):
+    """Return up to ``limit`` changes with ``seq`` greater than ``since``, oldest first."""
+    return list(CourseChange.objects.filter(seq__gt=since).order_by('seq').values(*CHANGE_FIELDS)[:limit])
+
+
+def acquire_waiter():
+    """
+    Reserve one of the COURSES_CHANGES_MAX_WAITERS waiting slots of this
+    process. Returns False if all are taken; otherwise call
+    :func:`release_waiter` once the reader stops waiting.
+    """
+    global _waiters
+    with _waiters_lock:
+        if _waiters >= settings.COURSES_CHANGES_MAX_WAITERS:
+            return False
+        _waiters += 1
+        return True
+
+
+def release_waiter():
+    global _waiters
+    with _waiters_lock:
+        _waiters -= 1
+
+
+def wait_for_changes(since, limit, timeout):
+    """
+    Return the changes after ``since`` like :func:`changes_since`, waiting up
+    to ``timeout`` seconds for one to be committed if there are none yet.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        changes = changes_since(since, limit)
+        remaining = deadline - time.monotonic()
+        if changes or remaining <= 0:
+            return changes
+        with _committed:
+            _committed.wait(min(remaining, settings.COURSES_CHANGES_POLL_INTERVAL))
+
+
+async def _await_changes(since, limit, timeout):
+    # wait_for_changes for the event loop: sleeps instead of blocking a thread
+    deadline = time.monotonic() + timeout
+    while True:
+        changes = await sync_to_async(changes_since)(since, limit)
+        remaining = deadline - time.monotonic()
+        if changes or remaining <= 0:
+            return changes
+        seen = _commits
+        poll_deadline = time.monotonic() + min(remaining, settings.COURSES_CHANGES_POLL_INTERVAL)
+        while _commits == seen and (left := poll_deadline - time.monotonic()) > 0:
+            await asyncio.sleep(min(left, _COMMIT_CHECK_INTERVAL))
+
+
+def _format_events(changes):
+    return ''.join(
+        f"id: {change['seq']}\nevent: {change['action']}\ndata: {json.dumps(change, separators=(',', ':'))}\n\n"
+        for change in changes
+    ).encode('utf-8')
+
+
+def iter_events(since, limit):
+    """
+    Yield the change log after ``since`` as Server-Sent Events, waiting for
+    new changes until COURSES_CHANGES_SSE_MAX_DURATION has passed.
+
+    Each event's ``id`` is its ``seq``, so a reconnecting ``EventSource``
+    resumes from the ``Last-Event-ID`` it sends. A comment line is sent while
+    idle so proxies keep the connection open.
+
+    The caller must hold a slot from :func:`acquire_waiter`; it is released
+    when the stream ends or is closed.
+    """
+    try:
+        yield b'retry: 1000\n\n'
+        deadline = time.monotonic() + settings.COURSES_CHANGES_SSE_MAX_DURATION
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            changes = wait_for_changes(since, limit, min(remaining, settings.COURSES_CHANGES_SSE_HEARTBEAT))
+            if not changes:
+                yield b': keep-alive\n\n'
+                continue
+            yield _format_events(changes)
+            since = changes[-1]['seq']
+    finally:
+        release_waiter()
+
+
+async def aiter_events(since, limit):
+    """
+    Like :func:`iter_events`, as an async iterator for ASGI servers. Waiting
+    happens on the event loop, so an idle stream holds no thread.
+    """
+    try:
+        yield b'retry: 1000\n\n'
+        deadline = time.monotonic() + settings.COURSES_CHANGES_SSE_MAX_DURATION
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            changes = await _await_changes(since, limit, min(remaining, settings.COURSES_CHANGES_SSE_HEARTBEAT))
+            if not changes:
+                yield b': keep-alive\n\n'
+                continue
+            yield _format_events(changes)
+            since = changes[-1]['seq']
+    finally:
+        release_waiter()
@@ -0,0 +1,200 @@
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from coursesService import metrics
+
+# Client for the discussions service.
+#
+# All calls share one requests.Session, so TCP/TLS connections are kept alive
+# and reused from a bounded pool. Every call has connect/read timeouts, and a
+# circuit breaker fails fast while the discussions service is down instead of
+# letting each caller wait for its own timeout.
+
+
+class DiscussionsError(Exception):
+    """Raised when a call to the discussions service could not be completed."""
+
+
+class CircuitOpenError(DiscussionsError):
+    """Raised without contacting the service while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Count consecutive failures and stop calls for a while once they pile up.
+
+    States:
+        closed: calls go through; ``failure_threshold`` consecutive failures open the circuit.
+        open: calls are rejected until ``reset_timeout`` seconds have passed.
+        half-open: a single trial call is let through; success closes the
+            circuit, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold, reset_timeout, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self):
+        """Return True if a call may be attempted now."""
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._trial_in_flight = False
+
+
+class DiscussionsClient:
+    """
+    Pooled, instrumented HTTP client for the discussions service.
+
+    The base URL and timeouts are read from settings on every call; the pool
+    size and circuit breaker thresholds are fixed when the client is built.
+    """
+
+    def __init__(self, pool_size=None, breaker=None):
+        pool_size = pool_size or settings.DISCUSSIONS_POOL_SIZE
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.breaker = breaker or CircuitBreaker(
+            failure_threshold=settings.DISCUSSIONS_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=settings.DISCUSSIONS_BREAKER_RESET_TIMEOUT,
+        )
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._errors = 0
+        self._rejected = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    @staticmethod
+    def threads_url():
+        return f"{settings.DISCUSSIONS_API_BASE_URL}course-discussions/"
+
+    def request(self, method, url, json=None):
+        """
+        Send one request through the pool and return the ``requests.Response``.
+
+        Connection errors, timeouts and 5xx responses count as failures for the
+        circuit breaker. Raises ``CircuitOpenError`` while the circuit is open
+        and ``DiscussionsError`` if no response was received.
+        """
+        if not self.breaker.allow():
+            with self._lock:
+                self._rejected += 1
+            raise CircuitOpenError(f"Discussions service circuit is open; {method} {url} not attempted")
+
+        timeout = (settings.DISCUSSIONS_CONNECT_TIMEOUT, settings.DISCUSSIONS_READ_TIMEOUT)
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, json=json, timeout=timeout)
+        except requests.exceptions.RequestException as exc:
+            self._observe(time.perf_counter() - start, failed=True)
+            raise DiscussionsError(f"{method} {url} failed: {exc}") from exc
+
+        failed = response.status_code >= 500
+        self._observe(time.perf_counter() - start, failed=failed)
+        return response
+
+    def _observe(self, elapsed, failed):
+        metrics.observe_discussions_call(elapsed)
+        if failed:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        with self._lock:
+            self._requests += 1
+            self._errors += failed
+            self._latency_total += elapsed
+            self._latency_max = max(self._latency_max, elapsed)
+
+    def create_thread(self, payload):
+        """Create the general discussion thread for a course."""
+        return self.request('POST', self.threads_url(), json=payload)
+
+    def update_thread(self, course_subject, course_id, payload):
+        """Update the discussion thread of a course, addressed by its current key."""
+        return self.request('PATCH', f"{self.threads_url()}{course_subject}/{course_id}/", json=payload)
+
+    def delete_thread(self, course_subject, course_id):
+        """Delete the discussion thread of a course."""
+        return self.request('DELETE', f"{self.threads_url()}{course_subject}/{course_id}/")
+
+    def stats(self):
+        """Return a snapshot of the request, error and latency counters."""
+        with self._lock:
+            return {
+                'requests': self._requests,
+                'errors': self._errors,
+                'rejected': self._rejected,
+                'latency_seconds_total': self._latency_total,
+                'latency_seconds_max': self._latency_max,
+                'circuit_state': self.breaker.state,
+            }
+
+
+def thread_payload(course):
+    """Build the request body that creates the discussion thread for ``course``."""
+    return {
+        "course_id": str(course.courseID),
+        "course_subject": course.courseSubject,
+        "title": f"Discussion for {course.title}",
+        "body": f"This is the general discussion thread for {course.courseSubject} {course.courseID}: {course.title}.",
+        "author": "System"
+    }
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide discussions client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = DiscussionsClient()
+    return _client
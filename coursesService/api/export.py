@@ -0,0 +1,85 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
+from .serializers import COURSE_FIELDS
+
+# Streaming catalog export.
+#
+# Rows are read with values() in fixed-size chunks and encoded as they arrive,
+# so memory use does not grow with the catalog and the first bytes are sent
+# before the query has finished. Under ASGI the chunks are handed to Django as
+# an async iterator; a sync one would be read to the end before sending.
+
+# Fields exported when the request does not ask for a sparse fieldset
+EXPORT_FIELDS = COURSE_FIELDS
+
+# Encoded rows are buffered up to this many bytes before being yielded
+FLUSH_BYTES = 64 * 1024
+
+_encode = json.JSONEncoder(separators=(',', ':')).encode
+
+
+def _rows(courses, fields):
+    return courses.values(*fields).iterator(chunk_size=settings.COURSES_EXPORT_CHUNK_SIZE)
+
+
+def iter_ndjson(courses, fields=EXPORT_FIELDS):
+    """Yield ``fields`` of ``courses`` as newline-delimited JSON, one course per line."""
+    buffer = []
+    size = 0
+    for row in _rows(courses, fields):
+        line = _encode(row) + '\n'
+        buffer.append(line)
+        size += len(line)
+        if size >= FLUSH_BYTES:
+            yield ''.join(buffer).encode('utf-8')
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer).encode('utf-8')
+
+
+def iter_json_array(courses, fields=EXPORT_FIELDS):
+    """Yield ``fields`` of ``courses`` as a single JSON array, encoded incrementally."""
+    # Send the opening bracket before running the query.
+    yield b'['
+    buffer = []
+    size = 0
+    separator = ''
+    for row in _rows(courses, fields):
+        item = separator + _encode(row)
+        separator = ','
+        buffer.append(item)
+        size += len(item)
+        if size >= FLUSH_BYTES:
+            yield ''.join(buffer).encode('utf-8')
+            buffer, size = [], 0
+    buffer.append(']')
+    yield ''.join(buffer).encode('utf-8')
+
+
+async def _aiter_chunks(chunks):
+    # Each chunk is produced in the request's sync thread, which owns the
+    # database connection the rows are read through.
+    produce = sync_to_async(next)
+    try:
+        while (chunk := await produce(chunks, None)) is not None:
+            yield chunk
+    finally:
+        await sync_to_async(chunks.close)()
+
+
+def streaming_response(courses, fmt, fields=EXPORT_FIELDS, asynchronous=False):
+    """
+    Return a StreamingHttpResponse of ``courses`` as ``'ndjson'`` or ``'json'``.
+    Pass ``asynchronous=True`` for requests served over ASGI.
+    """
+    if fmt == 'ndjson':
+        chunks, content_type = iter_ndjson(courses, fields), 'application/x-ndjson'
+    else:
+        chunks, content_type = iter_json_array(courses, fields), 'application/json'
+    if asynchronous:
+        chunks = _aiter_chunks(chunks)
+    return StreamingHttpResponse(chunks, content_type=content_type)
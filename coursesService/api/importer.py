@@ -0,0 +1,175 @@
+import csv
+import json
+import re
+from itertools import islice
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import as_serializer_error
+
+from base import facets, prerequisites
+from base.models import Course
+from .serializers import CourseSerializer
+from . import changes, outbox, snapshot
+
+# Bulk course import shared by POST /api/courses/bulk/ and `manage.py import_courses`.
+#
+# Rows are read lazily from a stream of text lines, validated in chunks and
+# written with one bulk_create per chunk, each chunk in its own transaction
+# together with the outbox entries for its discussion threads, its facet
+# counts, its prerequisite edges and its change-log entries.
+
+FORMAT_JSONL = 'jsonl'
+FORMAT_CSV = 'csv'
+FORMATS = (FORMAT_JSONL, FORMAT_CSV)
+
+# Input is decoded with errors='surrogateescape', which maps every byte that is
+# not valid UTF-8 to a lone surrogate, so one bad line is rejected like any
+# other bad row instead of aborting the import half way through.
+DECODE_ERRORS = 'surrogateescape'
+_UNDECODABLE = re.compile('[\udc80-\udcff]')
+UNDECODABLE_ERROR = {'non_field_errors': ["Line is not valid UTF-8"]}
+
+
+class CourseImportSerializer(CourseSerializer):
+    """
+    CourseSerializer without its per-row uniqueness validators.
+
+    ModelSerializer would run one SELECT per row to check the unique
+    courseID; the importer checks a whole chunk of keys with one query instead.
+    """
+
+    class Meta(CourseSerializer.Meta):
+        validators = []
+        extra_kwargs = {**CourseSerializer.Meta.extra_kwargs, 'courseID': {'validators': []}}
+
+
+def decode_lines(lines, encoding='utf-8'):
+    """Decode an iterable of byte lines for read_rows(), keeping undecodable bytes as surrogates."""
+    for line in lines:
+        yield line.decode(encoding, DECODE_ERRORS)
+
+
+def _read_jsonl(lines):
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        if _UNDECODABLE.search(line):
+            yield line_number, None, UNDECODABLE_ERROR
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield line_number, None, {'non_field_errors': [f"Invalid JSON: {exc}"]}
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, {'non_field_errors': ["Expected a JSON object"]}
+            continue
+        yield line_number, row, None
+
+
+def _read_csv(lines):
+    reader = csv.DictReader(lines)
+    for row in reader:
+        if any(_UNDECODABLE.search(value) for value in row.values() if isinstance(value, str)):
+            yield reader.line_num, None, UNDECODABLE_ERROR
+            continue
+        yield reader.line_num, row, None
+
+
+def read_rows(lines, fmt):
+    """
+    Parse ``lines`` (an iterable of text lines) in the given format.
+
+    Yields ``(line_number, row, parse_errors)`` tuples; ``row`` is ``None`` when
+    the line could not be parsed or held bytes that are not valid UTF-8 (see
+    decode_lines()).
+    """
+    if fmt == FORMAT_JSONL:
+        return _read_jsonl(lines)
+    if fmt == FORMAT_CSV:
+        return _read_csv(lines)
+    raise ValueError(f"Unsupported import format: {fmt}")
+
+
+def import_courses(lines, fmt, creator_id=None, batch_size=None):
+    """
+    Import courses from ``lines`` and return a report.
+
+    The report has ``created`` (number of courses written), ``error_count`` and
+    ``errors``: up to COURSES_IMPORT_MAX_REPORTED_ERRORS ``{'line', 'errors'}``
+    entries for rows that were rejected. Valid rows are imported even when
+    other rows fail.
+    """
+    batch_size = batch_size or settings.COURSES_IMPORT_BATCH_SIZE
+    report = {'created': 0, 'error_count': 0, 'errors': []}
+
+    def reject(line_number, errors):
+        report['error_count'] += 1
+        if len(report['errors']) < settings.COURSES_IMPORT_MAX_REPORTED_ERRORS:
+            report['errors'].append({'line': line_number, 'errors': errors})
+
+    rows = read_rows(lines, fmt)
+    # One serializer instance validates every row, so its fields are built
+    # once per import instead of once per row.
+    validator = CourseImportSerializer()
+    seen_ids = set()
+    try:
+        while True:
+            chunk = list(islice(rows, batch_size))
+            if not chunk:
+                break
+
+            valid = []
+            for line_number, row, parse_errors in chunk:
+                if parse_errors:
+                    reject(line_number, parse_errors)
+                    continue
+                try:
+                    data = validator.run_validation(row)
+                except ValidationError as exc:
+                    reject(line_number, as_serializer_error(exc))
+                    continue
+                courseID = data['courseID']
+                if courseID in seen_ids:
+                    reject(line_number, {'courseID': ["Duplicate courseID in import."]})
+                    continue
+                seen_ids.add(courseID)
+                valid.append((line_number, data))
+            if not valid:
+                continue
+
+            try:
+                with transaction.atomic():
+                    existing = set(Course.objects.filter(
+                        courseID__in=[data['courseID'] for _, data in valid]
+                    ).values_list('courseID', flat=True))
+                    courses = [Course(**data, creator_id=creator_id)
+                               for _, data in valid if data['courseID'] not in existing]
+                    # bulk_create skips Course.save()
+                    for course in courses:
+                        course.parse_schedule()
+                    Course.objects.bulk_create(courses)
+                    outbox.enqueue_discussion_creates(courses)
+                    facets.record(added=[facets.facet_values(course) for course in courses])
+                    prerequisites.refresh(courses, created=True)
+                    changes.record_created(courses)
+            except IntegrityError as exc:
+                # A concurrent writer inserted one of these keys after our check.
+                for line_number, _ in valid:
+                    reject(line_number, {'non_field_errors': [f"Batch rejected: {exc}"]})
+                continue
+            for line_number, data in valid:
+                if data['courseID'] in existing:
+                    reject(line_number, {'courseID': ["course with this courseID already exists."]})
+            report['created'] += len(courses)
+    finally:
+        # Chunks commit one by one, so readers must see the committed ones
+        # even if a later chunk raised.
+        if report['created']:
+            snapshot.schedule_rebuild()
+            outbox.wake_dispatcher()
+
+    report['errors'].sort(key=lambda error: error['line'])
+    return report
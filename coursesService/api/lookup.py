@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.db.models import CharField, Value
+from django.db.models.functions import Cast, Concat, Lower
+
+from base.models import Course
+
+
+def parse_keys(raw_keys, max_keys=None):
+    """
+    Validate the ``courses`` list of a lookup request.
+
+    Each key is either an object with ``courseSubject`` and ``courseID`` or a
+    ``[courseSubject, courseID]`` pair. Returns a list of
+    ``(courseSubject, courseID)`` tuples in request order. Raises
+    ``ValueError`` if the list is malformed or longer than ``max_keys``
+    (default ``COURSES_LOOKUP_MAX_KEYS``).
+    """
+    if not isinstance(raw_keys, list) or not raw_keys:
+        raise ValueError('courses must be a non-empty list')
+    max_keys = max_keys or settings.COURSES_LOOKUP_MAX_KEYS
+    if len(raw_keys) > max_keys:
+        raise ValueError(f'At most {max_keys} courses can be given per request')
+    keys = []
+    for index, raw_key in enumerate(raw_keys):
+        if isinstance(raw_key, dict):
+            courseSubject, courseID = raw_key.get('courseSubject'), raw_key.get('courseID')
+        elif isinstance(raw_key, list) and len(raw_key) == 2:
+            courseSubject, courseID = raw_key
+        else:
+            courseSubject = courseID = None
+        if not isinstance(courseSubject, str) or not isinstance(courseID, int) or isinstance(courseID, bool):
+            raise ValueError(f'courses[{index}] must be a courseSubject string and a courseID integer')
+        keys.append((courseSubject, courseID))
+    return keys
+
+
+def lookup_courses(keys, fields):
+    """
+    Resolve ``keys`` with one primary-key ``IN`` query.
+
+    Returns ``(results, missing)``: the matching course rows (only ``fields``)
+    in the order of ``keys``, and the keys that matched no course. Subjects
+    are compared case-insensitively, like the course detail routes.
+    """
+    selected = list(fields)
+    for name in ('courseSubject', 'courseID'):
+        if name not in selected:
+            selected.append(name)
+    # courseID is the primary key, so this is an index lookup per key
+    rows = Course.objects.filter(courseID__in={courseID for _, courseID in keys}).values(*selected)
+    by_key = {(row['courseSubject'].lower(), row['courseID']): row for row in rows}
+
+    results, missing = [], []
+    for courseSubject, courseID in keys:
+        row = by_key.get((courseSubject.lower(), courseID))
+        if row is None:
+            missing.append({'courseSubject': courseSubject, 'courseID': courseID})
+        else:
+            results.append({name: row[name] for name in fields})
+    return results, missing
+
+
+def filter_keys(courses, keys):
+    """
+    Restrict the Course queryset ``courses`` to exactly the courses named by
+    ``keys`` (``(courseSubject, courseID)`` tuples), with case-insensitive
+    subjects.
+
+    The primary-key ``IN`` list selects the rows; the subject check is a
+    second ``IN`` on "subject id" strings rather than one OR term per key,
+    which would exceed SQLite's expression depth limit for long key lists.
+    """
+    key = Concat(Lower('courseSubject'), Value(' '), Cast('courseID', CharField()), output_field=CharField())
+    return courses.alias(course_key=key).filter(
+        courseID__in={courseID for _, courseID in keys},
+        course_key__in={f'{courseSubject.lower()} {courseID}' for courseSubject, courseID in keys})
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from api.outbox import OutboxDispatcher
+
+
+class Command(BaseCommand):
+    help = "Deliver pending discussions-service side effects from the outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Deliver one batch and exit.")
+        parser.add_argument('--concurrency', type=int, help="Maximum concurrent HTTP calls.")
+        parser.add_argument('--batch-size', type=int, help="Entries claimed per batch.")
+        parser.add_argument('--poll-interval', type=float, help="Seconds to sleep when idle.")
+
+    def handle(self, *args, **options):
+        dispatcher = OutboxDispatcher(max_workers=options['concurrency'], batch_size=options['batch_size'])
+        if options['once']:
+            processed = dispatcher.run_once()
+            self.stdout.write(f"Processed {processed} outbox entries.")
+            return
+        self.stdout.write("Dispatching discussions outbox; press CTRL-C to stop.")
+        try:
+            dispatcher.run_forever(poll_interval=options['poll_interval'])
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,48 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api import importer
+
+
+class Command(BaseCommand):
+    help = "Import courses from a JSON Lines or CSV file (use '-' for stdin)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import, or '-' to read from stdin.")
+        parser.add_argument('--format', choices=importer.FORMATS,
+                            help="Input format; inferred from the file extension by default.")
+        parser.add_argument('--batch-size', type=int, help="Rows validated and inserted per transaction.")
+        parser.add_argument('--creator-id', type=int, help="User ID recorded as the creator of the courses.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format']
+        if fmt is None:
+            if path.endswith('.csv'):
+                fmt = importer.FORMAT_CSV
+            elif path.endswith(('.jsonl', '.ndjson')):
+                fmt = importer.FORMAT_JSONL
+            else:
+                raise CommandError("Cannot infer the format from the file name; pass --format.")
+
+        if path == '-':
+            report = self._import(sys.stdin, fmt, options)
+        else:
+            try:
+                with open(path, newline='', encoding='utf-8', errors=importer.DECODE_ERRORS) as stream:
+                    report = self._import(stream, fmt, options)
+            except OSError as exc:
+                raise CommandError(str(exc)) from exc
+
+        for error in report['errors']:
+            self.stderr.write(f"line {error['line']}: {json.dumps(error['errors'])}")
+        if report['error_count'] > len(report['errors']):
+            self.stderr.write(f"... {report['error_count'] - len(report['errors'])} more errors not shown")
+        self.stdout.write(f"Created {report['created']} courses; {report['error_count']} rows rejected.")
+
+    @staticmethod
+    def _import(stream, fmt, options):
+        return importer.import_courses(stream, fmt, creator_id=options['creator_id'],
+                                       batch_size=options['batch_size'])
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from base.facets import rebuild
+from api import cache
+
+
+class Command(BaseCommand):
+    help = "Recompute the catalog facet counts from the Course table."
+
+    def handle(self, *args, **options):
+        rebuild()
+        cache.clear()
+        self.stdout.write("Rebuilt catalog facet counts.")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from base.prerequisites import rebuild
+
+
+class Command(BaseCommand):
+    help = "Re-parse every course's requirements and recompute the prerequisite closure."
+
+    def handle(self, *args, **options):
+        rebuild()
+        self.stdout.write("Rebuilt the prerequisite graph.")
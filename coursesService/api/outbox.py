@@ -0,0 +1,309 @@
+import logging
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from base.models import DiscussionOutbox
+from . import discussions
+
+# Transactional outbox for discussions-service side effects.
+#
+# Views call the enqueue_* helpers inside the same transaction as their Course
+# write. OutboxDispatcher later claims due rows, delivers them over HTTP with
+# bounded concurrency, and reschedules failures with exponential backoff.
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_discussion_create(course):
+    """Record that a discussion thread must be created for ``course``."""
+    return DiscussionOutbox.objects.create(
+        action=DiscussionOutbox.ACTION_CREATE,
+        course_subject=course.courseSubject,
+        course_id=course.courseID,
+        payload=discussions.thread_payload(course),
+    )
+
+
+def enqueue_discussion_creates(courses):
+    """Record discussion-thread creation for many courses with a single INSERT."""
+    return DiscussionOutbox.objects.bulk_create([
+        DiscussionOutbox(
+            action=DiscussionOutbox.ACTION_CREATE,
+            course_subject=course.courseSubject,
+            course_id=course.courseID,
+            payload=discussions.thread_payload(course),
+        )
+        for course in courses
+    ])
+
+
+def enqueue_discussion_update(course_subject, course_id, course):
+    """
+    Record that the discussion thread of the course previously keyed by
+    ``(course_subject, course_id)`` must be updated to match ``course``.
+    """
+    return DiscussionOutbox.objects.create(
+        action=DiscussionOutbox.ACTION_UPDATE,
+        course_subject=course_subject,
+        course_id=course_id,
+        payload=discussions.thread_payload(course),
+    )
+
+
+def enqueue_discussion_delete(course):
+    """Record that the discussion thread of ``course`` must be deleted."""
+    return DiscussionOutbox.objects.create(
+        action=DiscussionOutbox.ACTION_DELETE,
+        course_subject=course.courseSubject,
+        course_id=course.courseID,
+    )
+
+
+def enqueue_discussion_deletes(courses):
+    """Record discussion-thread deletion for many courses with a single INSERT."""
+    return DiscussionOutbox.objects.bulk_create([
+        DiscussionOutbox(
+            action=DiscussionOutbox.ACTION_DELETE,
+            course_subject=course.courseSubject,
+            course_id=course.courseID,
+        )
+        for course in courses
+    ])
+
+
+def wake_dispatcher():
+    """
+    Start delivering pending side effects once the current transaction commits.
+
+    Does nothing unless ``DISCUSSIONS_OUTBOX_AUTOSTART`` is enabled; deployments
+    that run ``manage.py dispatch_outbox`` as a separate worker can disable it.
+    """
+    if settings.DISCUSSIONS_OUTBOX_AUTOSTART:
+        transaction.on_commit(_background.wake)
+
+
+class DeliveryError(Exception):
+    """
+    Raised when a side effect could not be delivered.
+
+    ``deferred`` errors never reached the service (the circuit breaker is
+    open); they are retried later without counting as an attempt.
+    """
+
+    def __init__(self, message, retryable=True, deferred=False):
+        super().__init__(message)
+        self.retryable = retryable
+        self.deferred = deferred
+
+
+def deliver(entry):
+    """
+    Perform the discussions-service call for one outbox entry.
+
+    Raises ``DeliveryError`` on failure. Client errors (other than 408 and 429)
+    are not retryable; deleting a thread that no longer exists counts as success.
+    """
+    client = discussions.get_client()
+    try:
+        if entry.action == DiscussionOutbox.ACTION_CREATE:
+            response = client.create_thread(entry.payload)
+        elif entry.action == DiscussionOutbox.ACTION_UPDATE:
+            response = client.update_thread(entry.course_subject, entry.course_id, entry.payload)
+        else:
+            response = client.delete_thread(entry.course_subject, entry.course_id)
+    except discussions.CircuitOpenError as exc:
+        raise DeliveryError(str(exc), deferred=True) from exc
+    except discussions.DiscussionsError as exc:
+        raise DeliveryError(str(exc)) from exc
+    if response.ok or (entry.action == DiscussionOutbox.ACTION_DELETE and response.status_code == 404):
+        return
+    retryable = response.status_code >= 500 or response.status_code in (408, 429)
+    raise DeliveryError(f"{response.request.method} {response.url} returned {response.status_code}", retryable=retryable)
+
+
+def _course_keys(action, course_subject, course_id, payload):
+    # The (subject, ID) keys an entry touches: updates also touch the key the
+    # course is renamed to.
+    keys = {(course_subject, course_id)}
+    if action == DiscussionOutbox.ACTION_UPDATE and payload:
+        keys.add((payload['course_subject'], int(payload['course_id'])))
+    return keys
+
+
+def backoff_delay(attempts):
+    """Return the delay in seconds before retry number ``attempts``, with jitter."""
+    delay = min(settings.DISCUSSIONS_OUTBOX_BACKOFF_BASE * 2 ** (attempts - 1),
+                settings.DISCUSSIONS_OUTBOX_BACKOFF_MAX)
+    return delay * random.uniform(0.5, 1.0)
+
+
+class OutboxDispatcher:
+    """
+    Deliver pending outbox entries.
+
+    All database access happens on the calling thread; only the HTTP calls run
+    on the worker pool, whose size bounds the concurrency towards the
+    discussions service.
+    """
+
+    def __init__(self, max_workers=None, batch_size=None):
+        self.max_workers = max_workers or settings.DISCUSSIONS_OUTBOX_CONCURRENCY
+        self.batch_size = batch_size or settings.DISCUSSIONS_OUTBOX_BATCH_SIZE
+
+    def claim(self):
+        """
+        Lease a batch of due entries and return them.
+
+        Due entries are taken oldest-due first, so entries backing off after
+        an outage never crowd out newer due ones. At most one entry per course
+        is claimed, and only if no older pending entry touches that course, so
+        a course's create and delete are always delivered in order. An update
+        that renames a course touches both its old and its new key.
+        """
+        now = timezone.now()
+        claimed = []
+        with transaction.atomic():
+            candidates = list(DiscussionOutbox.objects
+                              .select_for_update(skip_locked=True)
+                              .filter(status=DiscussionOutbox.STATUS_PENDING, next_attempt_at__lte=now)
+                              .order_by('next_attempt_at', 'id')[:self.batch_size * 4])
+            if not candidates:
+                return claimed
+            # The oldest pending entry touching each candidate course, due or not
+            course_ids = {course_id for entry in candidates for _, course_id in _course_keys(
+                entry.action, entry.course_subject, entry.course_id, entry.payload)}
+            first = {}
+            for row in (DiscussionOutbox.objects
+                        .filter(Q(course_id__in=course_ids)
+                                | Q(action=DiscussionOutbox.ACTION_UPDATE,
+                                    payload__course_id__in=[str(course_id) for course_id in course_ids]),
+                                status=DiscussionOutbox.STATUS_PENDING)
+                        .order_by('-id').values('id', 'action', 'course_subject', 'course_id', 'payload')):
+                for key in _course_keys(row['action'], row['course_subject'], row['course_id'], row['payload']):
+                    first[key] = row['id']
+            for entry in candidates:
+                if all(first.get(key) == entry.pk for key in _course_keys(
+                        entry.action, entry.course_subject, entry.course_id, entry.payload)):
+                    claimed.append(entry)
+                    if len(claimed) == self.batch_size:
+                        break
+            if claimed:
+                # The lease keeps other dispatchers away while we deliver.
+                lease_until = now + timedelta(seconds=settings.DISCUSSIONS_OUTBOX_LEASE)
+                DiscussionOutbox.objects.filter(pk__in=[e.pk for e in claimed]).update(next_attempt_at=lease_until)
+        return claimed
+
+    def run_once(self):
+        """Claim and deliver one batch. Returns the number of entries processed."""
+        entries = self.claim()
+        if not entries:
+            return 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            results = list(pool.map(self._attempt, entries))
+        for entry, error in zip(entries, results):
+            self._record(entry, error)
+        return len(entries)
+
+    def run_forever(self, poll_interval=None, stop_event=None):
+        """Deliver entries until ``stop_event`` is set, sleeping while idle."""
+        poll_interval = poll_interval or settings.DISCUSSIONS_OUTBOX_POLL_INTERVAL
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            close_old_connections()
+            if not self.run_once():
+                stop_event.wait(poll_interval)
+
+    def next_due(self):
+        """Return the time the next pending entry becomes due, or ``None``."""
+        entry = (DiscussionOutbox.objects
+                 .filter(status=DiscussionOutbox.STATUS_PENDING)
+                 .order_by('next_attempt_at').only('next_attempt_at').first())
+        return entry.next_attempt_at if entry else None
+
+    @staticmethod
+    def _attempt(entry):
+        try:
+            deliver(entry)
+        except DeliveryError as exc:
+            return exc
+        return None
+
+    @staticmethod
+    def _record(entry, error):
+        now = timezone.now()
+        if error is not None and error.deferred:
+            # Nothing was sent: try again once the circuit breaker lets calls through
+            logger.info("Discussion %s for %s %s deferred: %s",
+                        entry.action, entry.course_subject, entry.course_id, error)
+            entry.last_error = str(error)
+            entry.next_attempt_at = now + timedelta(seconds=settings.DISCUSSIONS_BREAKER_RESET_TIMEOUT)
+            entry.save(update_fields=['last_error', 'next_attempt_at'])
+            return
+        entry.attempts += 1
+        if error is None:
+            entry.status = DiscussionOutbox.STATUS_DELIVERED
+            entry.delivered_at = now
+            entry.last_error = ""
+        else:
+            logger.warning("Discussion %s for %s %s failed (attempt %d): %s",
+                           entry.action, entry.course_subject, entry.course_id, entry.attempts, error)
+            entry.last_error = str(error)
+            if not error.retryable or entry.attempts >= settings.DISCUSSIONS_OUTBOX_MAX_ATTEMPTS:
+                entry.status = DiscussionOutbox.STATUS_FAILED
+            else:
+                entry.next_attempt_at = now + timedelta(seconds=backoff_delay(entry.attempts))
+        entry.save(update_fields=['attempts', 'status', 'delivered_at', 'last_error', 'next_attempt_at'])
+
+
+class _BackgroundDispatcher:
+    """
+    In-process dispatcher thread, started on demand after a write commits.
+
+    The thread drains due entries, sleeps until the next retry is due, and
+    exits once nothing is pending, so idle workers carry no extra thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def wake(self):
+        with self._lock:
+            self._wakeup.set()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="discussions-outbox", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        dispatcher = OutboxDispatcher()
+        try:
+            while True:
+                self._wakeup.clear()
+                if dispatcher.run_once():
+                    continue
+                next_due = dispatcher.next_due()
+                if next_due is None:
+                    with self._lock:
+                        if not self._wakeup.is_set():
+                            self._thread = None
+                            return
+                    continue
+                delay = (next_due - timezone.now()).total_seconds()
+                self._wakeup.wait(min(max(delay, 0.05), settings.DISCUSSIONS_OUTBOX_POLL_INTERVAL))
+        except Exception:
+            logger.exception("Discussions outbox dispatcher stopped")
+            with self._lock:
+                self._thread = None
+        finally:
+            connections.close_all()
+
+
+_background = _BackgroundDispatcher()
@@ -0,0 +1,111 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.db.models import Q
+
+
+def encode_cursor(courseSubject, courseID):
+    """
+    Encode the (courseSubject, courseID) key of the last course on a page
+    into an opaque, URL-safe cursor string.
+    """
+    raw = json.dumps([courseSubject, courseID], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by :func:`encode_cursor`.
+
+    Returns a ``(courseSubject, courseID)`` tuple. Raises ``ValueError`` if
+    the cursor is malformed.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        courseSubject, courseID = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (binascii.Error, UnicodeError, ValueError, TypeError) as exc:
+        raise ValueError('Invalid cursor') from exc
+    if not isinstance(courseSubject, str) or not isinstance(courseID, int):
+        raise ValueError('Invalid cursor')
+    return courseSubject, courseID
+
+
+def parse_limit(raw_limit):
+    """
+    Parse the ``limit`` query parameter, falling back to the default page
+    size and capping it at ``COURSES_PAGE_MAX_LIMIT``.
+    """
+    if not raw_limit:
+        return settings.COURSES_PAGE_DEFAULT_LIMIT
+    try:
+        limit = int(raw_limit)
+    except ValueError as exc:
+        raise ValueError('limit must be an integer') from exc
+    if limit < 1:
+        raise ValueError('limit must be positive')
+    return min(limit, settings.COURSES_PAGE_MAX_LIMIT)
+
+
+def seek_after(courses, cursor):
+    """
+    Restrict ``courses`` to the rows strictly after the key stored in ``cursor``.
+    """
+    if not cursor:
+        return courses
+    courseSubject, courseID = decode_cursor(cursor)
+    # The leading range condition lets the database seek on the index;
+    # the OR only refines rows that share the cursor's subject.
+    return courses.filter(
+        Q(courseSubject__gte=courseSubject)
+        & (Q(courseSubject__gt=courseSubject) | Q(courseID__gt=courseID))
+    )
+
+
+# Fields every paginated row must carry so the next cursor can be built
+KEY_FIELDS = ('courseSubject', 'courseID')
+
+
+def with_key_fields(fields):
+    """Return ``fields`` extended by any missing KEY_FIELDS."""
+    return [*fields, *(name for name in KEY_FIELDS if name not in fields)]
+
+
+def trim_rows(page, fields):
+    """Drop the key fields :func:`with_key_fields` added from a page of row dicts."""
+    if all(name in fields for name in KEY_FIELDS):
+        return page
+    return [{name: row[name] for name in fields} for row in page]
+
+
+def _split_page(page, limit):
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor(page[-1]['courseSubject'], page[-1]['courseID'])
+    return page, next_cursor
+
+
+def paginate_rows(rows, limit, cursor=None):
+    """
+    Return one page of a ``values()`` queryset using keyset pagination.
+
+    ``rows`` must be ordered by ``courseSubject`` then ``courseID`` and include
+    both fields. Instead of an OFFSET, the page starts strictly after the key
+    stored in ``cursor``, so the (courseSubject, courseID) index is used to
+    seek directly to the page and every page costs the same regardless of depth.
+
+    Returns ``(page, next_cursor)`` where ``page`` is a list of row dicts and
+    ``next_cursor`` is ``None`` on the last page.
+    """
+    # Fetch one extra row to find out whether another page exists.
+    return _split_page(list(seek_after(rows, cursor)[:limit + 1]), limit)
+
+
+async def apaginate_rows(rows, limit, cursor=None):
+    """
+    Async counterpart of :func:`paginate_rows`.
+    """
+    page = [row async for row in seek_after(rows, cursor)[:limit + 1]]
+    return _split_page(page, limit)
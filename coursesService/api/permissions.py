@@ -1,16 +1,33 @@
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 
-class IsAdmin(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.is_authenticated and getattr(request.user, 'role', None) == "ADMIN"
+from coursesService.authentication import Role
 
-class IsStudent(BasePermission):
-    def has_permission(self, request, view):
-        return request.user.is_authenticated and getattr(request.user, 'role', None) in ["STUDENT", "ADMIN", "STAFF"]
+class RolePermission(BasePermission):
+    """
+    Allow authenticated users holding any of the ``allowed`` roles.
+
+    ``request.user.roles`` is parsed once when the token is decoded (see
+    ``ExternalJWTUser``), so the check is a single bitmask test. Anonymous
+    users have no ``roles`` and are refused.
+    """
+    allowed = 0
 
-class IsStaff(BasePermission):
     def has_permission(self, request, view):
-        return request.user.is_authenticated and getattr(request.user, 'role', None) in ["STAFF", "ADMIN"] 
+        try:
+            return bool(request.user.roles & self.allowed)
+        except AttributeError:
+            return False
+
+class IsAdmin(RolePermission):
+    allowed = Role.mask(Role.ADMIN)
+
+class IsStudent(RolePermission):
+    allowed = Role.mask(Role.STUDENT, Role.STAFF, Role.ADMIN)
+
+class IsStaff(RolePermission):
+    allowed = Role.mask(Role.STAFF, Role.ADMIN)
+
+_ADMIN = Role.mask(Role.ADMIN)
 
 class IsOwnerOrAdmin(BasePermission):
     """
@@ -24,7 +41,5 @@ class IsOwnerOrAdmin(BasePermission):
             return True
 
         # Write permissions: only owner or admin
-        is_owner = (obj.creator_id == request.user.id)
-        is_admin = getattr(request.user, "role", "").upper() == "ADMIN"
-        return is_owner or is_admin
-        
\ No newline at end of file
+        user = request.user
+        return obj.creator_id == user.id or bool(user.roles & _ADMIN)
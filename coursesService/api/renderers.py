@@ -0,0 +1,40 @@
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Render newline-delimited JSON: one JSON document per line.
+
+    Lists are rendered one item per line; any other value (such as an error
+    dict) is rendered as a single line.
+    """
+
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        items = data if isinstance(data, list) else [data]
+        return b''.join(json.dumps(item, separators=(',', ':')).encode('utf-8') + b'\n' for item in items)
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Accept ``text/event-stream`` (Server-Sent Events) requests.
+
+    Streams are sent by the view itself; this renderer only renders the
+    non-streaming responses (such as errors) as a single ``error`` event.
+    """
+
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return b'event: error\ndata: ' + json.dumps(data, separators=(',', ':')).encode('utf-8') + b'\n\n'
@@ -6,4 +6,30 @@ class CourseSerializer(serializers.ModelSerializer):
     class Meta:
         model = Course
         fields = '__all__'
-        extra_kwargs = {'creator_id': {'read_only': True}}
\ No newline at end of file
+        # schedule_* are parsed from schedule by Course.parse_schedule()
+        extra_kwargs = {name: {'read_only': True} for name in
+                        ('creator_id', 'version', 'schedule_days', 'schedule_start', 'schedule_end')}
+
+# Listings are read-only, so they are built from ``values()`` rows instead of
+# CourseSerializer: the rows already hold JSON-ready values under the same
+# keys, and skipping the per-field to_representation calls makes serializing
+# a large listing several times cheaper.
+
+# Same keys, in the same order, as CourseSerializer output
+COURSE_FIELDS = [field.attname for field in Course._meta.concrete_fields]
+
+
+def parse_fields(raw_fields):
+    """
+    Parse the ``fields`` query parameter (a comma-separated list of course fields).
+
+    Returns the requested field names in the order of COURSE_FIELDS, or all of
+    them if ``raw_fields`` is blank. Raises ``ValueError`` for unknown fields.
+    """
+    requested = {name.strip() for name in raw_fields.split(',') if name.strip()}
+    if not requested:
+        return COURSE_FIELDS
+    unknown = requested.difference(COURSE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return [name for name in COURSE_FIELDS if name in requested]
@@ -0,0 +1,153 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections, transaction
+from rest_framework.renderers import JSONRenderer
+
+from base.models import Course, CourseChange
+from coursesService import compression
+from .serializers import COURSE_FIELDS
+
+# Pre-serialized snapshot of the whole catalog behind the unfiltered GET /api/courses/.
+#
+# A snapshot holds the JSON body of the listing and its compressed variants,
+# tagged with the catalog version: the seq of the latest CourseChange, which
+# every write path appends in its transaction, so every worker reads the same
+# version from the database. Each process keeps the current snapshot in
+# memory; with COURSES_SNAPSHOT_CACHE_ALIAS set, built snapshots are shared
+# through that cache, so one worker builds each version and the others load
+# it. After a write commits, the writing process rebuilds the snapshot in a
+# background thread (COURSES_SNAPSHOT_PREBUILD), so readers rarely build it.
+#
+# Like the facet counts, writes that bypass the API do not change the version;
+# call clear() (or make an API write) afterwards.
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """The serialized catalog at ``version``; ``encoded`` maps an encoding to compressed bytes."""
+
+    version: int
+    body: bytes
+    encoded: dict
+    last_modified: int
+
+    @property
+    def etag(self):
+        return f'"c{self.version}"'
+
+
+_current = None
+_build_lock = threading.Lock()
+
+
+def catalog_version():
+    """Return ``(version, last_modified)``: the latest change seq and its Unix time, ``(0, None)`` if none."""
+    latest = CourseChange.objects.order_by('-seq').values_list('seq', 'created_at').first()
+    if latest is None:
+        return 0, None
+    return latest[0], int(latest[1].timestamp())
+
+
+def get_snapshot():
+    """
+    Return the snapshot of the current catalog version.
+
+    Served from process memory when current; otherwise loaded from the shared
+    cache or built, once per process even under concurrent requests. Costs
+    one indexed query for the version.
+    """
+    global _current
+    version, last_modified = catalog_version()
+    snapshot = _current
+    # A newer snapshot than the version just read is fine too: versions only grow
+    if snapshot is not None and snapshot.version >= version:
+        return snapshot
+    with _build_lock:
+        snapshot = _current
+        if snapshot is None or snapshot.version < version:
+            snapshot = _load_shared(version) or _build(version, last_modified)
+            _current = snapshot
+    return snapshot
+
+
+def clear():
+    """Drop this process's snapshot, e.g. after writes that bypassed the API."""
+    global _current
+    with _build_lock:
+        _current = None
+
+
+def _shared_cache():
+    alias = settings.COURSES_SNAPSHOT_CACHE_ALIAS
+    return caches[alias] if alias else None
+
+
+def _shared_key(version):
+    return f'courses:snapshot:{version}'
+
+
+def _load_shared(version):
+    shared = _shared_cache()
+    if shared is None:
+        return None
+    stored = shared.get(_shared_key(version))
+    return Snapshot(version=version, **stored) if stored is not None else None
+
+
+def _build(version, last_modified):
+    # Rows are read after the version, so they are at least as new as it
+    rows = list(Course.objects.order_by('courseSubject', 'courseID').values(*COURSE_FIELDS))
+    body = JSONRenderer().render(rows)
+    encoded = {encoding: compression.COMPRESSORS[encoding](body) for encoding in compression.available_encodings()}
+    stored = {'body': body, 'encoded': encoded, 'last_modified': last_modified or int(time.time())}
+    shared = _shared_cache()
+    if shared is not None:
+        shared.set(_shared_key(version), stored, timeout=settings.COURSES_CACHE_TIMEOUT)
+    return Snapshot(version=version, **stored)
+
+
+# Background rebuilds: at most one thread per process, coalescing writes that
+# commit while it runs into one more rebuild.
+_rebuild_state = threading.Lock()
+_rebuild_pending = False
+_rebuild_running = False
+
+
+def schedule_rebuild():
+    """Rebuild the snapshot in the background once the current transaction commits."""
+    if settings.COURSES_SNAPSHOT_PREBUILD:
+        transaction.on_commit(_start_rebuild)
+
+
+def _start_rebuild():
+    global _rebuild_pending, _rebuild_running
+    with _rebuild_state:
+        _rebuild_pending = True
+        if _rebuild_running:
+            return
+        _rebuild_running = True
+    threading.Thread(target=_rebuild_loop, name='catalog-snapshot', daemon=True).start()
+
+
+def _rebuild_loop():
+    global _rebuild_pending, _rebuild_running
+    try:
+        while True:
+            with _rebuild_state:
+                if not _rebuild_pending:
+                    _rebuild_running = False
+                    return
+                _rebuild_pending = False
+            try:
+                get_snapshot()
+            except Exception:
+                logger.exception("Rebuilding the catalog snapshot failed")
+    finally:
+        connections.close_all()
@@ -0,0 +1,158 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import BaseThrottle
+
+# Token-bucket rate limiting per client.
+#
+# Every client (the JWT user_id, or the address of unauthenticated requests)
+# has one bucket per scope: "read" for safe methods and read-only lookups,
+# "write" for views that change the catalog. A bucket holds up to N tokens
+# for a rate of "N/period" and refills continuously, so a client can burst N
+# requests and then sustain N per period. Buckets live in a pluggable store
+# (COURSES_THROTTLE_STORE): LocalBucketStore keeps them in process memory,
+# CacheBucketStore in a Django cache shared by all workers. Throttled requests
+# get 429 with Retry-After from DRF.
+
+# Seconds per period, keyed by its first letter as in DRF ("min", "minute" and "m" all mean 60)
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+@lru_cache(maxsize=32)
+def parse_rate(rate):
+    """
+    Parse ``"N/period"`` (``s``, ``min``, ``hour``, ``day``, as in DRF) into
+    ``(capacity, tokens per second)``; ``None`` disables throttling.
+
+    ``"0/period"`` blocks the scope: the bucket never holds a token, and
+    refills at one token per period so Retry-After is one period.
+    """
+    if rate is None:
+        return None
+    count, _, period = rate.partition('/')
+    if not period or period[0] not in PERIODS or not count.isdigit():
+        raise ValueError(f'Invalid throttle rate: {rate}')
+    capacity = int(count)
+    return capacity, max(capacity, 1) / PERIODS[period[0]]
+
+
+class LocalBucketStore:
+    """
+    Buckets in process memory. Exact within a process; with several workers
+    each one enforces the budget separately.
+    """
+
+    # Cheap enough to call on the event loop
+    blocking = False
+    # Beyond this many buckets, the least recently used one is dropped on each
+    # new client; a dropped client starts again with a full bucket.
+    max_buckets = 100_000
+
+    def __init__(self):
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, refill_rate):
+        """
+        Take one token from the bucket ``key``. Returns 0 if a token was
+        available, otherwise the seconds until one will be.
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = capacity
+                if len(self._buckets) >= self.max_buckets:
+                    self._buckets.popitem(last=False)
+            else:
+                tokens = min(capacity, bucket[0] + (now - bucket[1]) * refill_rate)
+                self._buckets.move_to_end(key)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                return 0.0
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / refill_rate
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheBucketStore:
+    """
+    Buckets in the Django cache ``COURSES_THROTTLE_CACHE_ALIAS``, shared by
+    all workers. The read-modify-write is not atomic, so concurrent requests
+    of one client in different workers can occasionally both get the last
+    token.
+    """
+
+    # Cache backends do network I/O, so async views call take() in a thread
+    blocking = True
+
+    def take(self, key, capacity, refill_rate):
+        cache = caches[settings.COURSES_THROTTLE_CACHE_ALIAS]
+        cache_key = f'courses:throttle:{key}'
+        now = time.time()
+        bucket = cache.get(cache_key)
+        tokens = capacity if bucket is None else min(capacity, bucket[0] + (now - bucket[1]) * refill_rate)
+        # Expire once the bucket would be full again anyway
+        timeout = int(capacity / refill_rate) + 1
+        if tokens >= 1:
+            cache.set(cache_key, (tokens - 1, now), timeout=timeout)
+            return 0.0
+        cache.set(cache_key, (tokens, now), timeout=timeout)
+        return (1 - tokens) / refill_rate
+
+
+@lru_cache(maxsize=4)
+def _store(path):
+    return import_string(path)()
+
+
+def get_store():
+    """Return the configured bucket store (one instance per process)."""
+    return _store(settings.COURSES_THROTTLE_STORE)
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Throttle requests with one token bucket per client and scope.
+
+    The scope's rate comes from ``COURSES_THROTTLE_RATES``.
+    """
+    scope = None
+
+    def get_scope(self, request):
+        return self.scope
+
+    def allow_request(self, request, view):
+        self.delay = 0.0
+        scope = self.get_scope(request)
+        rate = parse_rate(settings.COURSES_THROTTLE_RATES.get(scope))
+        if rate is None:
+            return True
+        user_id = getattr(request.user, 'id', None)
+        client = f'user:{user_id}' if user_id is not None else f'addr:{self.get_ident(request)}'
+        self.delay = get_store().take(f'{scope}:{client}', *rate)
+        return self.delay == 0.0
+
+    def wait(self):
+        return self.delay
+
+
+class ReadThrottle(TokenBucketThrottle):
+    """Charge the read budget, e.g. for POST endpoints that only look courses up."""
+    scope = 'read'
+
+
+class ReadWriteThrottle(TokenBucketThrottle):
+    """Charge safe methods to the read budget and everything else to the write budget (the default)."""
+
+    def get_scope(self, request):
+        return 'read' if request.method in SAFE_METHODS else 'write'
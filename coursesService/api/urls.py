@@ -1,9 +1,22 @@
 from django.urls import path
-from . import views
+from . import views, async_views
 urlpatterns = [
     path('', views.apiOverview, name='apiOverview'),
     path('courses/', views.getCourses, name='getCourses'),
     path('courses/create/', views.createCourse, name='createCourse'),
+    path('courses/bulk/', views.bulkImportCourses, name='bulkImportCourses'),
+    path('courses/bulk-delete/', views.bulkDeleteCourses, name='bulkDeleteCourses'),
+    path('courses/export/', views.exportCourses, name='exportCourses'),
+    path('courses/facets/', views.courseFacets, name='courseFacets'),
+    path('courses/changes/', views.courseChanges, name='courseChanges'),
+    path('courses/conflicts/', views.courseConflicts, name='courseConflicts'),
+    path('courses/lookup/', views.lookupCourses, name='lookupCourses'),
+    path('courses/<str:courseSubject>/<int:courseID>/', views.courseDetail, name='courseDetail'),
+    path('courses/<str:courseSubject>/<int:courseID>/prerequisites/', views.coursePrerequisites, name='coursePrerequisites'),
+    path('courses/<str:courseSubject>/<int:courseID>/unlocks/', views.courseUnlocks, name='courseUnlocks'),
     path('courses/<str:courseSubject>/<int:courseID>/delete/', views.deleteCourse, name='deleteCourse'),
+    path('async/courses/', async_views.getCoursesAsync, name='getCoursesAsync'),
+    path('async/courses/create/', async_views.createCourseAsync, name='createCourseAsync'),
+    path('async/courses/<str:courseSubject>/<int:courseID>/delete/', async_views.deleteCourseAsync, name='deleteCourseAsync'),
     path('test-routing/', views.test_routing, name='testRouting'),
 ]
\ No newline at end of file
@@ -1,12 +1,27 @@
 from rest_framework.response import Response
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes, throttle_classes
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
 from rest_framework import status
-import requests
-from django.db import models
+import math
+from django.db import IntegrityError
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Lower, Upper
 from django.conf import settings
-from base.models import Course
-from .serializers import CourseSerializer
-from .permissions import IsStudent, IsStaff, IsAdmin
+from django.utils.http import parse_etags
+from base import facets
+from base.models import Course, CourseFacetCount, CoursePrerequisiteClosure
+from base.schedule import ALL_DAYS, find_conflicts, format_clock, format_days, parse_clock, parse_days
+from base.search import search_courses
+from .serializers import CourseSerializer, parse_fields
+from .pagination import paginate_rows, parse_limit, trim_rows, with_key_fields
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
+from coursesService import compression
+from . import cache, catalog, changes, export, importer, lookup, snapshot
+from .renderers import EventStreamRenderer, NDJSONRenderer
+from .permissions import IsStudent, IsStaff, IsAdmin, IsOwnerOrAdmin
+from .throttling import ReadThrottle
 
 def test_routing(request):
     """
@@ -27,13 +42,27 @@ def apiOverview(request):
     endpoints = {
         'getCourses': '/api/courses/',
         'createCourse': '/api/courses/create/',
+        'courseDetail': '/api/courses/<courseSubject>/<courseID>/',
+        'coursePrerequisites': '/api/courses/<courseSubject>/<courseID>/prerequisites/',
+        'courseUnlocks': '/api/courses/<courseSubject>/<courseID>/unlocks/',
         'deleteCourse': '/api/courses/<courseSubject>/<courseID>/delete/',
+        'bulkImportCourses': '/api/courses/bulk/',
+        'bulkDeleteCourses': '/api/courses/bulk-delete/',
+        'exportCourses': '/api/courses/export/',
+        'lookupCourses': '/api/courses/lookup/',
+        'courseConflicts': '/api/courses/conflicts/',
+        'courseFacets': '/api/courses/facets/',
+        'courseChanges': '/api/courses/changes/',
+        'getCoursesAsync': '/api/async/courses/',
+        'createCourseAsync': '/api/async/courses/create/',
+        'deleteCourseAsync': '/api/async/courses/<courseSubject>/<courseID>/delete/',
         'testRouting': '/api/test-routing/',
     }
     return Response(endpoints)
 
 @api_view(['GET'])
 @permission_classes([IsStudent])
+@renderer_classes([*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer])
 def getCourses(request):
     """
     Retrieve a list of courses, optionally filtered by query parameters.
@@ -42,37 +71,442 @@ def getCourses(request):
 
     Query Parameters:
         - courseSubject: Filter by course subject (case-insensitive, partial match)
+        - courseSubject_prefix: Filter by the start of the course subject (case-insensitive; served from an index)
         - courseID: Filter by course ID (exact match)
         - title: Filter by course title (case-insensitive, partial match)
         - instructor: Filter by instructor name (case-insensitive, partial match)
+        - instructor_prefix: Filter by the start of the instructor name (case-insensitive; served from an index)
+        - days: Only courses meeting on (a subset of) these days, e.g. ``MWF``, ``TTh`` or ``MoWe``
+        - starts_after: Only courses starting at or after this time (``HH:MM`` or ``H:MMAM``/``H:MMPM``)
+        - ends_before: Only courses ending at or before this time
+        - q: Full-text search over title, description, instructor and requirements
+        - limit: Page size; enables cursor pagination (capped at COURSES_PAGE_MAX_LIMIT)
+        - cursor: Opaque cursor from a previous page's ``next_cursor``
+        - fields: Comma-separated course fields to return (default: all fields)
 
-    Results are always ordered by courseSubject and courseID.
+    Results are ordered by courseSubject and courseID. When ``limit`` or
+    ``cursor`` is given the response is an object with ``results`` and
+    ``next_cursor`` (``null`` on the last page); otherwise it is a plain list.
+
+    With ``q`` the results are ranked by relevance instead and returned as a
+    plain list of at most ``limit`` (default COURSES_SEARCH_MAX_RESULTS)
+    courses; ``cursor`` cannot be combined with ``q``.
+
+    Responses are cached per normalized set of query parameters until the
+    next course write, and carry ``ETag``/``Last-Modified`` headers; a
+    matching ``If-None-Match`` or ``If-Modified-Since`` yields 304 Not Modified.
+    The unfiltered JSON listing is served from the pre-serialized catalog
+    snapshot (see ``api.snapshot``) instead.
+
+    With ``?format=ndjson`` (or ``Accept: application/x-ndjson``) the filtered
+    catalog is streamed like ``exportCourses`` instead.
+    """
+    if request.accepted_renderer.format == NDJSONRenderer.format:
+        try:
+            fields = parse_fields(request.GET.get('fields', ''))
+            courses = _filter_courses(request.GET).order_by('courseSubject', 'courseID')
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return export.streaming_response(courses, 'ndjson', fields, asynchronous=_served_by_asgi(request))
+
+    if request.accepted_renderer.format == 'json' and not any(
+            request.GET.get(name, '').strip() for name in cache.LISTING_PARAMS):
+        return _catalog_snapshot_response(request)
+
+    key = cache.listing_cache_key(request.GET)
+    validators = cache.listing_validators(key)
+    headers = cache.validator_headers(validators)
+    if cache.is_not_modified(request, validators):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    entry = cache.get_listing(key)
+    if entry is None:
+        response = _list_courses(request)
+        if response.status_code != status.HTTP_200_OK:
+            return response
+        entry = cache.store_listing(key, response.data)
+    return Response(entry['data'], headers=headers)
+
+def _catalog_snapshot_response(request):
+    """
+    Serve the unfiltered listing from the pre-serialized catalog snapshot,
+    in the best encoding the client accepts, without querying the courses.
+    """
+    catalog_snapshot = snapshot.get_snapshot()
+    validators = {'etag': catalog_snapshot.etag, 'last_modified': catalog_snapshot.last_modified}
+    headers = cache.validator_headers(validators)
+    if cache.is_not_modified(request, validators):
+        return HttpResponse(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    encoding = compression.negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''),
+                                     [name for name in compression.available_encodings()
+                                      if name in catalog_snapshot.encoded])
+    if encoding is None:
+        return HttpResponse(catalog_snapshot.body, content_type='application/json', headers=headers)
+    headers.update({'Content-Encoding': encoding, 'ETag': compression.encoded_etag(catalog_snapshot.etag, encoding)})
+    return HttpResponse(catalog_snapshot.encoded[encoding], content_type='application/json', headers=headers)
+
+def _filter_courses(params):
+    """
+    Return the Course queryset restricted by the getCourses filter parameters in ``params``.
+
+    Raises ``ValueError`` if ``days``, ``starts_after`` or ``ends_before`` is malformed.
     """
     # Get all courses
     courses = Course.objects.all()
 
     # Extract filter parameters from request
-    courseSubject = request.GET.get('courseSubject', '')
-    courseID = request.GET.get('courseID', '')
-    title = request.GET.get('title', '')
-    instructor = request.GET.get('instructor', '')
+    courseSubject = params.get('courseSubject', '')
+    courseSubject_prefix = params.get('courseSubject_prefix', '')
+    courseID = params.get('courseID', '')
+    title = params.get('title', '')
+    instructor = params.get('instructor', '')
+    instructor_prefix = params.get('instructor_prefix', '')
+    days = params.get('days', '')
+    starts_after = params.get('starts_after', '')
+    ends_before = params.get('ends_before', '')
 
     # Apply filters if provided
     if courseSubject:
         courses = courses.filter(courseSubject__icontains=courseSubject)
+    if courseSubject_prefix:
+        courses = _filter_prefix(courses, 'courseSubject', courseSubject_prefix)
     if courseID:
         courses = courses.filter(courseID=courseID)
     if title:
         courses = courses.filter(title__icontains=title)
     if instructor:
         courses = courses.filter(instructor__icontains=instructor)
+    if instructor_prefix:
+        courses = _filter_prefix(courses, 'instructor', instructor_prefix)
+    if days:
+        # Courses meeting only on the given days: every non-empty subset of
+        # the mask, so the filter is an IN list on the schedule index.
+        mask = parse_days(days)
+        courses = courses.filter(schedule_days__in=[d for d in range(1, ALL_DAYS + 1) if not d & ~mask])
+    if starts_after:
+        courses = courses.filter(schedule_start__gte=parse_clock(starts_after))
+    if ends_before:
+        courses = courses.filter(schedule_end__lte=parse_clock(ends_before))
+    return courses
+
+def _filter_prefix(courses, field, value):
+    """
+    Filter ``field`` by a case-insensitive prefix of ``value``.
+
+    The prefix is expressed as a range on ``Lower(field)`` rather than a LIKE,
+    so the database can answer it with a range scan on the case-folded index.
+    """
+    prefix = value.lower()
+    alias = f'{field}_lower'
+    courses = courses.alias(**{alias: Lower(field)})
+    upper = _prefix_upper_bound(prefix)
+    if upper is None:
+        return courses.filter(**{f'{alias}__gte': prefix})
+    return courses.filter(**{f'{alias}__gte': prefix, f'{alias}__lt': upper})
+
+def _prefix_upper_bound(prefix):
+    """
+    Return the smallest string greater than every string starting with
+    ``prefix``, or ``None`` if there is none.
+
+    The last character is incremented, skipping the surrogate range (lone
+    surrogates cannot be encoded for the database); a last character of
+    U+10FFFF is dropped and the one before it incremented instead.
+    """
+    while prefix:
+        successor = ord(prefix[-1]) + 1
+        if 0xD800 <= successor <= 0xDFFF:
+            successor = 0xE000
+        if successor <= 0x10FFFF:
+            return prefix[:-1] + chr(successor)
+        prefix = prefix[:-1]
+    return None
+
+def _list_courses(request):
+    """
+    Run the course listing query for ``getCourses`` and return the uncached response.
+
+    Only the requested fields are selected, and rows are returned as fetched
+    by ``values()`` rather than through CourseSerializer.
+    """
+    q = request.GET.get('q', '').strip()
+    try:
+        courses = _filter_courses(request.GET)
+        fields = parse_fields(request.GET.get('fields', ''))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Full-text search mode: ranked results from the search index
+    if q:
+        if 'cursor' in request.GET:
+            return Response({'error': 'cursor cannot be combined with q'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = parse_limit(request.GET.get('limit', '')) if 'limit' in request.GET else settings.COURSES_SEARCH_MAX_RESULTS
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(list(search_courses(courses, q).values(*fields)[:limit]))
 
     # Always order results by courseSubject and courseID
     courses = courses.order_by('courseSubject', 'courseID')
 
-    # Serialize and return the course data
-    serializer = CourseSerializer(courses, many=True)
-    return Response(serializer.data)
+    # Opt-in keyset pagination
+    if 'limit' in request.GET or 'cursor' in request.GET:
+        try:
+            limit = parse_limit(request.GET.get('limit', ''))
+            page, next_cursor = paginate_rows(courses.values(*with_key_fields(fields)), limit,
+                                              request.GET.get('cursor', ''))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'results': trim_rows(page, fields), 'next_cursor': next_cursor})
+
+    # Return the course data
+    return Response(list(courses.values(*fields)))
+
+@api_view(['GET'])
+@permission_classes([IsStudent])
+@renderer_classes([JSONRenderer, NDJSONRenderer])
+def exportCourses(request):
+    """
+    Stream the full (optionally filtered) catalog.
+
+    **GET**: Streams every matching course, ordered by courseSubject and courseID.
+    Memory use stays constant regardless of catalog size.
+
+    Query Parameters:
+        - courseSubject, courseSubject_prefix, courseID, title, instructor, instructor_prefix, days,
+          starts_after, ends_before: Same filters as getCourses
+        - format: ``json`` (default, a JSON array) or ``ndjson`` (one course per line)
+        - fields: Comma-separated course fields to export (default: all fields)
+    """
+    try:
+        fields = parse_fields(request.GET.get('fields', ''))
+        courses = _filter_courses(request.GET).order_by('courseSubject', 'courseID')
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return export.streaming_response(courses, request.accepted_renderer.format, fields,
+                                     asynchronous=_served_by_asgi(request))
+
+# Fields loaded for each course of a conflict check
+CONFLICT_FIELDS = ['courseSubject', 'courseID', 'schedule', 'schedule_days', 'schedule_start', 'schedule_end']
+
+@api_view(['POST'])
+@permission_classes([IsStudent])
+@throttle_classes([ReadThrottle])
+def courseConflicts(request):
+    """
+    Find time-slot conflicts within a set of courses.
+
+    **POST**: Returns every pair of the given courses whose meetings overlap.
+
+    Request Body:
+        - courses: list of course keys, as for lookupCourses (at most COURSES_LOOKUP_MAX_KEYS)
+
+    Returns ``conflicts`` (``{"courses": [key, key], "days", "start", "end"}``
+    with the shared days and overlapping window), ``unscheduled`` (courses whose
+    schedule could not be parsed, e.g. TBA) and ``missing`` keys.
+    """
+    try:
+        keys = lookup.parse_keys(request.data.get('courses') if isinstance(request.data, dict) else None)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    rows, missing = lookup.lookup_courses(keys, CONFLICT_FIELDS)
+
+    meetings, unscheduled, seen = [], [], set()
+    for row in rows:
+        key = {'courseSubject': row['courseSubject'], 'courseID': row['courseID']}
+        if row['courseID'] in seen:
+            continue
+        seen.add(row['courseID'])
+        if row['schedule_days'] is None:
+            unscheduled.append({**key, 'schedule': row['schedule']})
+        else:
+            meetings.append((key, row['schedule_days'], row['schedule_start'], row['schedule_end']))
+
+    conflicts = [
+        {'courses': [first, second], 'days': format_days(days), 'start': format_clock(start), 'end': format_clock(end)}
+        for first, second, days, start, end in find_conflicts(meetings)
+    ]
+    return Response({'conflicts': conflicts, 'unscheduled': unscheduled, 'missing': missing})
+
+@api_view(['GET'])
+@permission_classes([IsStudent])
+def courseFacets(request):
+    """
+    Count courses per facet value.
+
+    **GET**: Returns ``courseSubject``, ``credits``, ``instruction_mode`` and
+    ``instructor``, each a list of ``{"value", "count"}`` entries, most frequent first.
+
+    Query Parameters:
+        - courseSubject, courseSubject_prefix, courseID, title, instructor, instructor_prefix, q,
+          days, starts_after, ends_before: Same filters as getCourses
+
+    Unfiltered and courseSubject-filtered counts are read from the
+    CourseFacetCount summary table, which every course write keeps current.
+    Other filters aggregate the matching courses. Responses are cached and
+    revalidated like getCourses.
+    """
+    key = cache.listing_cache_key(request.GET, kind='facets', names=cache.FACET_PARAMS)
+    validators = cache.listing_validators(key)
+    headers = cache.validator_headers(validators)
+    if cache.is_not_modified(request, validators):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    entry = cache.get_listing(key)
+    if entry is None:
+        try:
+            counts = _count_facets(request.GET)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        entry = cache.store_listing(key, counts)
+    return Response(entry['data'], headers=headers)
+
+# Filters the CourseFacetCount summary table can answer on its own
+SUMMARY_FACET_PARAMS = ('courseSubject', 'courseSubject_prefix')
+
+def _count_facets(params):
+    """
+    Compute the facet counts for the getCourses filters in ``params``.
+    """
+    if not any(params.get(name, '').strip() for name in cache.FACET_PARAMS if name not in SUMMARY_FACET_PARAMS):
+        rows = CourseFacetCount.objects.all()
+        courseSubject = params.get('courseSubject', '')
+        courseSubject_prefix = params.get('courseSubject_prefix', '')
+        if courseSubject:
+            rows = rows.filter(courseSubject__icontains=courseSubject)
+        if courseSubject_prefix:
+            rows = _filter_prefix(rows, 'courseSubject', courseSubject_prefix)
+        return facets.summary_counts(rows)
+    courses = _filter_courses(params)
+    q = params.get('q', '').strip()
+    if q:
+        courses = search_courses(courses, q)
+    return facets.course_counts(courses)
+
+@api_view(['GET'])
+@permission_classes([IsStudent])
+@renderer_classes([*api_settings.DEFAULT_RENDERER_CLASSES, EventStreamRenderer])
+def courseChanges(request):
+    """
+    Read the catalog change log.
+
+    **GET**: Returns the changes after ``since``, oldest first, as
+    ``{"changes": [...], "next_since": <seq>}``. Each change has ``seq``,
+    ``action`` (create, update or delete), ``courseSubject``, ``courseID`` and
+    ``course`` (the course after the change; null for deletes). Pass
+    ``next_since`` as the next request's ``since``.
+
+    Query Parameters:
+        - since: Last ``seq`` already processed (default 0, the start of the log)
+        - limit: Maximum number of changes per response (capped at COURSES_CHANGES_MAX_LIMIT)
+        - wait: Long-poll; if there are no changes yet, wait up to this many
+          seconds (capped at COURSES_CHANGES_MAX_WAIT) for one
+
+    With ``Accept: text/event-stream`` (or ``?format=sse``) the changes are
+    streamed as Server-Sent Events instead; ``Last-Event-ID`` overrides ``since``.
+
+    Long-poll readers and, under WSGI, SSE readers each hold a worker thread,
+    so at most COURSES_CHANGES_MAX_WAITERS waiting readers run per process;
+    others get 503 with Retry-After. Under ASGI the stream waits on the event
+    loop instead.
+    """
+    try:
+        since = _parse_since(request.headers.get('Last-Event-ID') or request.GET.get('since', ''))
+        limit = _parse_positive(request.GET.get('limit', ''), 'limit', settings.COURSES_CHANGES_MAX_LIMIT)
+        wait = _parse_wait(request.GET.get('wait', ''))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    streaming = request.accepted_renderer.format == EventStreamRenderer.format
+    if not (wait or streaming):
+        page = changes.changes_since(since, limit)
+        return Response({'changes': page, 'next_since': page[-1]['seq'] if page else since})
+
+    # Waiting readers hold a worker thread; past the cap, send them back later
+    if not changes.acquire_waiter():
+        return Response({'error': 'Too many clients are waiting for changes; retry later'},
+                        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                        headers={'Retry-After': str(math.ceil(settings.COURSES_CHANGES_POLL_INTERVAL))})
+
+    if streaming:
+        # The stream releases the slot when it ends or the server closes it.
+        # ASGI servers get an async iterator: Django would buffer a sync one
+        # until it is exhausted.
+        events = changes.aiter_events if _served_by_asgi(request) else changes.iter_events
+        response = StreamingHttpResponse(events(since, limit), content_type=EventStreamRenderer.media_type)
+        response['Cache-Control'] = 'no-cache'
+        # Ask nginx-style proxies not to buffer the stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    try:
+        page = changes.wait_for_changes(since, limit, wait)
+    finally:
+        changes.release_waiter()
+    return Response({'changes': page, 'next_since': page[-1]['seq'] if page else since})
+
+def _served_by_asgi(request):
+    return isinstance(request._request, ASGIRequest)
+
+def _parse_since(raw_since):
+    if not raw_since:
+        return 0
+    try:
+        since = int(raw_since)
+    except ValueError as exc:
+        raise ValueError('since must be an integer') from exc
+    if since < 0:
+        raise ValueError('since must not be negative')
+    return since
+
+def _parse_positive(raw_value, name, maximum):
+    if not raw_value:
+        return maximum
+    try:
+        value = int(raw_value)
+    except ValueError as exc:
+        raise ValueError(f'{name} must be an integer') from exc
+    if value < 1:
+        raise ValueError(f'{name} must be positive')
+    return min(value, maximum)
+
+def _parse_wait(raw_wait):
+    if not raw_wait:
+        return 0
+    try:
+        wait = float(raw_wait)
+    except ValueError as exc:
+        raise ValueError('wait must be a number of seconds') from exc
+    if not wait >= 0:
+        raise ValueError('wait must not be negative')
+    return min(wait, settings.COURSES_CHANGES_MAX_WAIT)
+
+@api_view(['POST'])
+@permission_classes([IsStudent])
+@throttle_classes([ReadThrottle])
+def lookupCourses(request):
+    """
+    Resolve a batch of courses by key in one request.
+
+    **POST**: Returns the requested courses in request order, plus the keys
+    that matched no course.
+
+    Request Body:
+        - courses: list of ``{"courseSubject": ..., "courseID": ...}`` objects
+          or ``[courseSubject, courseID]`` pairs (at most COURSES_LOOKUP_MAX_KEYS)
+
+    Query Parameters:
+        - fields: Comma-separated course fields to return (default: all fields)
+
+    Returns ``results`` and ``missing``; courseSubject matches case-insensitively.
+    """
+    try:
+        fields = parse_fields(request.GET.get('fields', ''))
+        keys = lookup.parse_keys(request.data.get('courses') if isinstance(request.data, dict) else None)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    results, missing = lookup.lookup_courses(keys, fields)
+    return Response({'results': results, 'missing': missing})
 
 @api_view(['POST'])
 @permission_classes([IsStaff])
@@ -80,7 +514,8 @@ def createCourse(request):
     """
     Create a new course and its associated discussion.
 
-    **POST**: Creates a new course. Also creates a discussion thread for the course in the discussions service.
+    **POST**: Creates a new course. A discussion thread for the course is created in the
+    discussions service in the background; the response does not wait for it.
 
     Request Body:
         - courseSubject: string
@@ -93,20 +528,8 @@ def createCourse(request):
     """
     serializer = CourseSerializer(data=request.data)
     if serializer.is_valid():
-        course = serializer.save(creator_id=request.user.id)
-        # Use correct base URL for discussions service
-        discussion_service_url = f"{settings.DISCUSSIONS_API_BASE_URL}course-discussions/"
-        discussion_data = {
-            "course_id": str(course.courseID),
-            "course_subject": course.courseSubject,
-            "title": f"Discussion for {course.title}",
-            "body": f"This is the general discussion thread for {course.courseSubject} {course.courseID}: {course.title}.",
-            "author": "System"
-        }
-        try:
-            requests.post(discussion_service_url, json=discussion_data)
-        except requests.exceptions.RequestException as e:
-            print(f"Failed to create discussion: {e}")
+        # The discussion thread is created asynchronously via the outbox
+        catalog.create_course(serializer, request.user.id)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -116,7 +539,7 @@ def deleteCourse(request, courseSubject, courseID):
     """
     Delete a course and its associated discussion.
 
-    **DELETE**: Deletes the specified course and its discussion thread.
+    **DELETE**: Deletes the specified course. Its discussion thread is deleted in the background.
 
     Path Parameters:
         - courseSubject: string (case-insensitive)
@@ -124,18 +547,271 @@ def deleteCourse(request, courseSubject, courseID):
 
     Returns 204 No Content on success, or 404 if the course does not exist.
     """
-    qs = Course.objects.filter(courseSubject__iexact=courseSubject, courseID=courseID)
     try:
-        course = qs.get()
+        course = _get_course(courseSubject, courseID)
     except Course.DoesNotExist:
         return Response({'error': 'Course not found'}, status=status.HTTP_404_NOT_FOUND)
-    # Use correct base URL for discussions service
-    discussion_service_url = f"{settings.DISCUSSIONS_API_BASE_URL}course-discussions/"
-    url = f"{discussion_service_url}{course.courseSubject}/{course.courseID}/"
-    try:
-        requests.delete(url)
-    except requests.exceptions.RequestException as e:
-        print(f"Failed to delete discussion: {e}")
-    course.delete()
+    catalog.delete_course(course)
     return Response(status=status.HTTP_204_NO_CONTENT)
 
+# getCourses filters accepted by bulkDeleteCourses
+BULK_DELETE_FILTERS = ('courseSubject', 'courseID', 'title', 'instructor', 'days', 'starts_after', 'ends_before')
+# String filters that bulkDeleteCourses matches exactly (case-insensitive) rather than as substrings
+BULK_DELETE_EXACT_FILTERS = ('courseSubject', 'title', 'instructor')
+
+@api_view(['POST'])
+@permission_classes([IsStaff])
+def bulkDeleteCourses(request):
+    """
+    Delete many courses in one request.
+
+    **POST**: Deletes the courses named by ``courses`` or matching ``filter``
+    with one set-based DELETE in a single transaction. Their discussion
+    threads are deleted in the background by the outbox dispatcher.
+
+    Request Body (one of):
+        - courses: list of ``{"courseSubject": ..., "courseID": ...}`` objects
+          or ``[courseSubject, courseID]`` pairs (at most COURSES_BULK_DELETE_MAX_COURSES)
+        - filter: object of getCourses filters (courseSubject, courseID, title,
+          instructor, days, starts_after, ends_before); at least one is required.
+          courseSubject, title and instructor must match the whole value
+          (case-insensitive), unlike in getCourses, so a filter never deletes
+          courses it only partially names
+
+    Returns ``deleted`` (the count) and ``results``, one
+    ``{"courseSubject", "courseID", "status"}`` entry per course with status
+    ``deleted`` or ``not_found`` (key lists only, in request order).
+    Returns 400 if the filter matches more than COURSES_BULK_DELETE_MAX_COURSES courses.
+    """
+    data = request.data if isinstance(request.data, dict) else {}
+    max_courses = settings.COURSES_BULK_DELETE_MAX_COURSES
+    keys = None
+    try:
+        if ('courses' in data) == ('filter' in data):
+            raise ValueError('Give either courses or filter')
+        if 'courses' in data:
+            keys = lookup.parse_keys(data['courses'], max_keys=max_courses)
+            courses = lookup.filter_keys(Course.objects.all(), keys)
+        else:
+            raw_filter = data['filter']
+            if not isinstance(raw_filter, dict) or any(name not in BULK_DELETE_FILTERS for name in raw_filter):
+                raise ValueError(f"filter must be an object with keys among {', '.join(BULK_DELETE_FILTERS)}")
+            params = {name: str(value) for name, value in raw_filter.items() if value not in (None, '')}
+            if not params:
+                raise ValueError('filter must not be empty')
+            courses = _bulk_delete_filter(params)
+        deleted = catalog.delete_courses(courses, limit=max_courses)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    if keys is None:
+        results = [{'courseSubject': course.courseSubject, 'courseID': course.courseID, 'status': 'deleted'}
+                   for course in deleted]
+    else:
+        by_key = {(course.courseSubject.lower(), course.courseID): course for course in deleted}
+        results = []
+        for courseSubject, courseID in keys:
+            course = by_key.get((courseSubject.lower(), courseID))
+            results.append({'courseSubject': course.courseSubject if course else courseSubject,
+                            'courseID': courseID, 'status': 'deleted' if course else 'not_found'})
+    return Response({'deleted': len(deleted), 'results': results})
+
+def _bulk_delete_filter(params):
+    """
+    Return the courses matching a bulkDeleteCourses ``filter``: the getCourses
+    filters, with exact case-insensitive matches for the string fields.
+    """
+    courses = _filter_courses({name: value for name, value in params.items() if name not in BULK_DELETE_EXACT_FILTERS})
+    for field in BULK_DELETE_EXACT_FILTERS:
+        if field in params:
+            alias = f'{field}_lower'
+            courses = courses.alias(**{alias: Lower(field)}).filter(**{alias: params[field].lower()})
+    return courses
+
+def _get_course(courseSubject, courseID):
+    """
+    Fetch a course by its case-insensitive subject and ID. Raises ``Course.DoesNotExist``.
+    """
+    return Course.objects.alias(courseSubject_lower=Lower('courseSubject')).get(
+        courseSubject_lower=courseSubject.lower(), courseID=courseID)
+
+def _course_etag(course):
+    return '"%d"' % course.version
+
+@api_view(['GET', 'PUT', 'PATCH'])
+@permission_classes([IsStudent, IsOwnerOrAdmin])
+def courseDetail(request, courseSubject, courseID):
+    """
+    Retrieve or update a single course.
+
+    **GET**: Returns the course with an ``ETag`` holding its version;
+    ``If-None-Match`` with the current ETag yields 304 Not Modified.
+
+    **PUT** / **PATCH**: Replaces / partially updates the course (course owner or ADMIN).
+    The request must name the version it was based on, either as an
+    ``If-Match: "<version>"`` header (the ETag from GET) or a ``version``
+    field in the body; otherwise 428 Precondition Required. If the course has
+    changed since, the update is rejected with 412 Precondition Failed and
+    the client should re-fetch. Only changed columns are written; the
+    discussion thread is only updated when courseSubject, courseID or title change.
+
+    Path Parameters:
+        - courseSubject: string (case-insensitive)
+        - courseID: integer
+
+    Returns the course data, or 404 if the course does not exist.
+    """
+    try:
+        course = _get_course(courseSubject, courseID)
+    except Course.DoesNotExist:
+        return Response({'error': 'Course not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    if request.method == 'GET':
+        headers = {'ETag': _course_etag(course)}
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match and _course_etag(course) in parse_etags(if_none_match):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(CourseSerializer(course).data, headers=headers)
+
+    # Function views have no get_object(), so run the object permission check
+    # through the wrapping APIView to get DRF's usual 403 response.
+    request.parser_context['view'].check_object_permissions(request, course)
+
+    expected_version, error = _expected_version(request, course)
+    if error:
+        return error
+
+    serializer = CourseSerializer(course, data=request.data, partial=request.method == 'PATCH')
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    new_values = {field: value for field, value in serializer.validated_data.items()
+               if getattr(course, field) != value}
+
+    if new_values:
+        try:
+            updated = catalog.update_course(course, new_values, expected_version)
+        except IntegrityError:
+            return Response({'error': 'A course with this courseSubject and courseID already exists'},
+                            status=status.HTTP_409_CONFLICT)
+        if updated is None:
+            return Response({'error': 'Course was modified by another request; fetch it again and retry'},
+                            status=status.HTTP_412_PRECONDITION_FAILED)
+        course = updated
+    return Response(CourseSerializer(course).data, headers={'ETag': _course_etag(course)})
+
+@api_view(['GET'])
+@permission_classes([IsStudent])
+def coursePrerequisites(request, courseSubject, courseID):
+    """
+    List every course required, directly or transitively, by a course.
+
+    **GET**: Returns ``courseSubject``, ``courseID``, ``title`` and ``depth``
+    (1 for direct prerequisites) per prerequisite, nearest first. ``title`` is
+    null for prerequisites that are not in the catalog.
+
+    Answered from the materialized prerequisite closure in one query.
+    Returns 404 if the course does not exist.
+    """
+    titles = Course.objects.alias(subject_upper=Upper('courseSubject')).filter(
+        courseID=OuterRef('prerequisite_id'), subject_upper=OuterRef('prerequisite_subject')).values('title')
+    rows = list(
+        CoursePrerequisiteClosure.objects
+        .alias(subject_lower=Lower('course__courseSubject'))
+        .filter(course_id=courseID, subject_lower=courseSubject.lower())
+        .annotate(title=Subquery(titles[:1]))
+        .order_by('depth', 'prerequisite_subject', 'prerequisite_id')
+        .values('prerequisite_subject', 'prerequisite_id', 'title', 'depth')
+    )
+    if not rows and not _course_exists(courseSubject, courseID):
+        return Response({'error': 'Course not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response([{'courseSubject': row['prerequisite_subject'], 'courseID': row['prerequisite_id'],
+                      'title': row['title'], 'depth': row['depth']} for row in rows])
+
+@api_view(['GET'])
+@permission_classes([IsStudent])
+def courseUnlocks(request, courseSubject, courseID):
+    """
+    List every course that requires a course, directly or transitively.
+
+    **GET**: Returns ``courseSubject``, ``courseID``, ``title`` and ``depth``
+    (1 when the course is a direct prerequisite) per dependent course, nearest first.
+
+    Answered from the materialized prerequisite closure in one query.
+    Returns 404 if the course does not exist.
+    """
+    rows = list(
+        CoursePrerequisiteClosure.objects
+        .filter(prerequisite_id=courseID, prerequisite_subject=courseSubject.upper())
+        .order_by('depth', 'course__courseSubject', 'course_id')
+        .values('course__courseSubject', 'course_id', 'course__title', 'depth')
+    )
+    if not rows and not _course_exists(courseSubject, courseID):
+        return Response({'error': 'Course not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response([{'courseSubject': row['course__courseSubject'], 'courseID': row['course_id'],
+                      'title': row['course__title'], 'depth': row['depth']} for row in rows])
+
+def _course_exists(courseSubject, courseID):
+    return Course.objects.alias(courseSubject_lower=Lower('courseSubject')).filter(
+        courseSubject_lower=courseSubject.lower(), courseID=courseID).exists()
+
+def _expected_version(request, course):
+    """
+    Return ``(version, error_response)`` for the update precondition of ``request``.
+
+    A precondition that already fails against ``course`` is rejected here;
+    the conditional UPDATE catches changes made after ``course`` was read.
+    """
+    if_match = request.headers.get('If-Match')
+    if if_match:
+        etags = parse_etags(if_match)
+        if '*' in etags or _course_etag(course) in etags:
+            return course.version, None
+        return None, Response({'error': 'Course was modified; fetch it again and retry'},
+                              status=status.HTTP_412_PRECONDITION_FAILED, headers={'ETag': _course_etag(course)})
+    if 'version' in request.data:
+        version = request.data['version']
+        if not isinstance(version, int) or isinstance(version, bool):
+            return None, Response({'version': ['A valid integer is required.']}, status=status.HTTP_400_BAD_REQUEST)
+        if version != course.version:
+            return None, Response({'error': 'Course was modified; fetch it again and retry'},
+                                  status=status.HTTP_412_PRECONDITION_FAILED, headers={'ETag': _course_etag(course)})
+        return version, None
+    return None, Response({'error': 'Updates require an If-Match header or a version field'},
+                          status=status.HTTP_428_PRECONDITION_REQUIRED)
+
+# Content types accepted by bulkImportCourses, mapped to import formats
+IMPORT_CONTENT_TYPES = {
+    'application/x-ndjson': importer.FORMAT_JSONL,
+    'application/jsonl': importer.FORMAT_JSONL,
+    'application/json-lines': importer.FORMAT_JSONL,
+    'text/csv': importer.FORMAT_CSV,
+}
+
+@api_view(['POST'])
+@permission_classes([IsStaff])
+def bulkImportCourses(request):
+    """
+    Import many courses in one request.
+
+    **POST**: Streams the request body and creates every valid course. Discussion
+    threads for the new courses are queued in the outbox in one batch.
+
+    Request Body:
+        - JSON Lines (Content-Type ``application/x-ndjson``): one course object per line
+        - CSV (Content-Type ``text/csv``): a header row with the course field names
+
+    Returns 201 Created with ``created``, ``error_count`` and per-line ``errors``
+    if at least one course was created, otherwise 400 with the same report.
+    Lines that are not valid UTF-8 are reported like any other invalid row.
+    """
+    content_type = request.content_type.split(';')[0].strip().lower()
+    fmt = IMPORT_CONTENT_TYPES.get(content_type)
+    if fmt is None:
+        return Response({'error': f"Unsupported Content-Type; use one of {', '.join(IMPORT_CONTENT_TYPES)}"},
+                        status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+    stream = request.stream
+    lines = importer.decode_lines(iter(stream.readline, b'')) if stream is not None else []
+    report = importer.import_courses(lines, fmt, creator_id=request.user.id)
+    report_status = status.HTTP_201_CREATED if report['created'] else status.HTTP_400_BAD_REQUEST
+    return Response(report, status=report_status)
+
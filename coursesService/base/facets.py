@@ -0,0 +1,117 @@
+from collections import Counter
+
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+
+from base.models import Course, CourseFacetCount
+
+# Catalog facet counts (courses per subject, credits, instruction mode and
+# instructor).
+#
+# CourseFacetCount holds one row per (courseSubject, facet, value). Every
+# write path adjusts the affected rows in the same transaction as the course
+# write, so reading the counts never touches the Course table.
+
+FACETS = ('courseSubject', 'credits', 'instruction_mode', 'instructor')
+
+# Facets whose values are integers; CourseFacetCount stores every value as text
+INTEGER_FACETS = ('credits',)
+
+
+def facet_values(course):
+    """Return the facet fields of ``course`` (a Course or a dict of field values)."""
+    if isinstance(course, dict):
+        return {facet: course[facet] for facet in FACETS}
+    return {facet: getattr(course, facet) for facet in FACETS}
+
+
+# Rows per upsert statement (4 parameters each, within SQLite's variable limit)
+UPSERT_BATCH_SIZE = 200
+
+
+def record(added=(), removed=()):
+    """
+    Count the courses in ``added`` and uncount those in ``removed``.
+
+    Both are iterables of :func:`facet_values` dicts. Call inside the
+    transaction that writes the courses. The deltas are applied with one
+    additive upsert (``INSERT ... ON CONFLICT DO UPDATE``) per batch of
+    affected rows, so concurrent writers never lose counts and no rows are
+    read first; summary rows that drop to zero are deleted.
+    """
+    deltas = Counter()
+    for courses, sign in ((added, 1), (removed, -1)):
+        for values in courses:
+            subject = values['courseSubject']
+            for facet in FACETS:
+                deltas[(subject, facet, str(values[facet]))] += sign
+    rows = [(*key, delta) for key, delta in deltas.items() if delta]
+    if not rows:
+        return
+
+    quote = connection.ops.quote_name
+    table = quote(CourseFacetCount._meta.db_table)
+    subject, count = quote('courseSubject'), quote('count')
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        batch = rows[start:start + UPSERT_BATCH_SIZE]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} ({subject}, facet, value, {count}) "
+                f"VALUES {', '.join(['(%s, %s, %s, %s)'] * len(batch))} "
+                f"ON CONFLICT ({subject}, facet, value) "
+                f"DO UPDATE SET {count} = {table}.{count} + excluded.{count}",
+                [param for row in batch for param in row],
+            )
+    if any(row[3] < 0 for row in rows):
+        CourseFacetCount.objects.filter(
+            courseSubject__in={row[0] for row in rows if row[3] < 0}, count__lte=0).delete()
+
+
+def summary_counts(rows):
+    """
+    Return the facet counts summed over ``rows`` (a CourseFacetCount queryset).
+
+    The result maps each facet to a list of ``{'value', 'count'}`` entries,
+    most frequent first.
+    """
+    rows = (rows.filter(count__gt=0).values('facet', 'value')
+            .annotate(total=Sum('count')).order_by('facet', '-total', 'value'))
+    counts = {facet: [] for facet in FACETS}
+    for row in rows:
+        value = int(row['value']) if row['facet'] in INTEGER_FACETS else row['value']
+        counts[row['facet']].append({'value': value, 'count': row['total']})
+    return counts
+
+
+def course_counts(courses):
+    """
+    Return the facet counts of ``courses`` (a Course queryset), in the format of :func:`summary_counts`.
+
+    This aggregates the courses themselves; use it only for filters the
+    summary table cannot answer.
+    """
+    counts = {}
+    for facet in FACETS:
+        rows = courses.order_by().values(facet).annotate(total=Count('pk')).order_by('-total', facet)
+        counts[facet] = [{'value': row[facet], 'count': row['total']} for row in rows]
+    return counts
+
+
+def rebuild(course_model=None, facet_model=None):
+    """
+    Recompute every facet count from the Course table.
+
+    The models can be passed in so migrations can call this with their
+    historical models.
+    """
+    course_model = course_model or Course
+    facet_model = facet_model or CourseFacetCount
+    with transaction.atomic():
+        facet_model.objects.all().delete()
+        summary = []
+        for facet in FACETS:
+            rows = (course_model.objects.order_by().values('courseSubject', facet)
+                    .annotate(total=Count('pk')))
+            summary.extend(facet_model(courseSubject=row['courseSubject'], facet=facet,
+                                       value=str(row[facet]), count=row['total']) for row in rows)
+        facet_model.objects.bulk_create(summary, batch_size=1000)
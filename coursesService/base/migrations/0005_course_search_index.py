@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from base.search import drop_search_index, install_search_index
+
+
+def install(apps, schema_editor):
+    install_search_index(schema_editor)
+
+
+def uninstall(apps, schema_editor):
+    drop_search_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0004_alter_course_options_course_creator_id_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:27
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0006_discussionoutbox'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='course',
+            unique_together={('courseSubject', 'courseID')},
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(django.db.models.functions.text.Lower('courseSubject'), name='base_course_subject_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(django.db.models.functions.text.Lower('instructor'), name='base_course_instr_lower_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:46
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+from base.facets import rebuild
+
+
+def backfill_facet_counts(apps, schema_editor):
+    rebuild(apps.get_model('base', 'Course'), apps.get_model('base', 'CourseFacetCount'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0008_course_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseFacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('courseSubject', models.CharField(max_length=100)),
+                ('facet', models.CharField(max_length=20)),
+                ('value', models.CharField(max_length=100)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(django.db.models.functions.text.Lower('courseSubject'), name='base_facet_subject_lower_idx')],
+                'unique_together': {('courseSubject', 'facet', 'value')},
+            },
+        ),
+        migrations.RunPython(backfill_facet_counts, migrations.RunPython.noop),
+    ]
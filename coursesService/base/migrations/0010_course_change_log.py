@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0009_course_facet_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseChange',
+            fields=[
+                ('seq', models.BigAutoField(primary_key=True, serialize=False)),
+                ('action', models.CharField(choices=[('create', 'Create'), ('update', 'Update'), ('delete', 'Delete')], max_length=20)),
+                ('courseSubject', models.CharField(max_length=100)),
+                ('courseID', models.IntegerField()),
+                ('course', models.JSONField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['seq'],
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:50
+
+from django.db import migrations, models
+
+from base.schedule import parse_schedule
+from base.search import install_search_index
+
+
+def reinstall_search_index(apps, schema_editor):
+    # Adding columns rebuilds base_course on SQLite, which drops the full-text triggers.
+    install_search_index(schema_editor)
+
+
+def backfill_schedule_slots(apps, schema_editor):
+    Course = apps.get_model('base', 'Course')
+    courses = []
+    for course in Course.objects.only('courseID', 'schedule').iterator(chunk_size=2000):
+        course.schedule_days, course.schedule_start, course.schedule_end = parse_schedule(course.schedule)
+        courses.append(course)
+    Course.objects.bulk_update(courses, ['schedule_days', 'schedule_start', 'schedule_end'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0010_course_change_log'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='schedule_days',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='schedule_end',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='schedule_start',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['schedule_days', 'schedule_start'], name='base_course_schedule_idx'),
+        ),
+        migrations.RunPython(reinstall_search_index, migrations.RunPython.noop),
+        migrations.RunPython(backfill_schedule_slots, migrations.RunPython.noop),
+    ]
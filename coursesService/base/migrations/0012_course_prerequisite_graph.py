@@ -0,0 +1,48 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from base.prerequisites import rebuild
+
+
+def backfill_prerequisites(apps, schema_editor):
+    rebuild(apps.get_model('base', 'Course'), apps.get_model('base', 'CoursePrerequisite'),
+            apps.get_model('base', 'CoursePrerequisiteClosure'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0011_course_schedule_slots'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CoursePrerequisite',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prerequisite_subject', models.CharField(max_length=100)),
+                ('prerequisite_id', models.IntegerField()),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='prerequisite_edges', to='base.course')),
+            ],
+            options={
+                'unique_together': {('course', 'prerequisite_subject', 'prerequisite_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='CoursePrerequisiteClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prerequisite_subject', models.CharField(max_length=100)),
+                ('prerequisite_id', models.IntegerField()),
+                ('depth', models.PositiveSmallIntegerField()),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='prerequisite_closure', to='base.course')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['prerequisite_id', 'prerequisite_subject'], name='base_prereq_closure_rev_idx')],
+                'unique_together': {('course', 'prerequisite_subject', 'prerequisite_id')},
+            },
+        ),
+        migrations.RunPython(backfill_prerequisites, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,8 @@
 from django.db import models
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from base.schedule import parse_schedule
 
 # Create your models here.
 
@@ -16,6 +20,12 @@ class Course(models.Model):
         requirements (TextField): Prerequisites or requirements.
         description (TextField): Course description.
         instruction_mode (CharField): Mode of instruction (e.g., In Person, Online).
+        version (PositiveIntegerField): Incremented on every update; used for optimistic concurrency.
+        schedule_days (PositiveSmallIntegerField): Bitmask of meeting days parsed from schedule (Monday = 1).
+        schedule_start (PositiveSmallIntegerField): Meeting start, in minutes after midnight.
+        schedule_end (PositiveSmallIntegerField): Meeting end, in minutes after midnight.
+    The schedule_* fields are derived from schedule by parse_schedule() and are
+    null when the schedule cannot be parsed (e.g. TBA).
     Note: courseID must be provided and unique for each course.
     """
     courseID = models.IntegerField(primary_key=True)
@@ -29,6 +39,21 @@ class Course(models.Model):
     requirements = models.TextField()
     description = models.TextField()
     instruction_mode = models.CharField(max_length=50)
+    version = models.PositiveIntegerField(default=1)
+    schedule_days = models.PositiveSmallIntegerField(null=True, blank=True)
+    schedule_start = models.PositiveSmallIntegerField(null=True, blank=True)
+    schedule_end = models.PositiveSmallIntegerField(null=True, blank=True)
+
+    def parse_schedule(self):
+        """Set the schedule_* fields from schedule. Called by save(); bulk writes must call it themselves."""
+        self.schedule_days, self.schedule_start, self.schedule_end = parse_schedule(self.schedule)
+
+    def save(self, *args, **kwargs):
+        self.parse_schedule()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'schedule' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'schedule_days', 'schedule_start', 'schedule_end'}
+        super().save(*args, **kwargs)
 
     def __repr__(self):
         """Return a readable string representation of the course object."""
@@ -39,4 +64,198 @@ class Course(models.Model):
     class Meta:
         # Default ordering when querying Course objects: first by subject, then by id
         ordering = ["courseSubject", "courseID"]
-        unique_together = ("courseSubject", "courseID")
\ No newline at end of file
+        # Also serves as the index behind the default ordering and cursor pagination
+        unique_together = ("courseSubject", "courseID")
+        indexes = [
+            # Case-folded lookups used by the courseSubject/instructor filters and deleteCourse
+            models.Index(Lower("courseSubject"), name="base_course_subject_lower_idx"),
+            models.Index(Lower("instructor"), name="base_course_instr_lower_idx"),
+            # days= and starts_after= filters
+            models.Index(fields=["schedule_days", "schedule_start"], name="base_course_schedule_idx"),
+        ]
+
+
+class DiscussionOutbox(models.Model):
+    """
+    A pending side effect on the discussions service (transactional outbox).
+
+    Rows are written in the same database transaction as the Course change
+    that caused them, so a side effect is recorded if and only if the write
+    commits. A background dispatcher (see ``api.outbox``) delivers them later
+    with retries, so API responses never wait on the discussions service.
+    Fields:
+        action (CharField): What to do in the discussions service (create, update or delete a thread).
+        course_subject (CharField): Subject of the course the thread belongs to.
+        course_id (IntegerField): ID of the course the thread belongs to.
+        payload (JSONField): Request body to send, if any.
+        status (CharField): pending, delivered or failed.
+        attempts (PositiveIntegerField): Number of delivery attempts so far.
+        next_attempt_at (DateTimeField): Earliest time of the next delivery attempt.
+        last_error (TextField): Error from the most recent failed attempt.
+        created_at (DateTimeField): When the side effect was recorded.
+        delivered_at (DateTimeField): When the side effect was delivered.
+    """
+    ACTION_CREATE = "create"
+    ACTION_UPDATE = "update"
+    ACTION_DELETE = "delete"
+    ACTION_CHOICES = [
+        (ACTION_CREATE, "Create discussion"),
+        (ACTION_UPDATE, "Update discussion"),
+        (ACTION_DELETE, "Delete discussion"),
+    ]
+
+    STATUS_PENDING = "pending"
+    STATUS_DELIVERED = "delivered"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_DELIVERED, "Delivered"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    action = models.CharField(max_length=20, choices=ACTION_CHOICES)
+    course_subject = models.CharField(max_length=100)
+    course_id = models.IntegerField()
+    payload = models.JSONField(null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    def __repr__(self):
+        """Return a readable string representation of the outbox entry."""
+        return (f"DiscussionOutbox({self.pk}, {self.action}, {self.course_subject}, "
+                f"{self.course_id}, {self.status}, attempts={self.attempts})")
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="base_outbox_due_idx"),
+        ]
+
+
+class CourseFacetCount(models.Model):
+    """
+    Number of courses per facet value, kept per subject.
+
+    A summary of the Course table maintained by ``base.facets`` on every course
+    write, so catalog facet counts are read without scanning courses. Keeping
+    the counts per subject also serves the courseSubject filter from this table.
+    Fields:
+        courseSubject (CharField): Subject of the counted courses.
+        facet (CharField): Course field being counted (courseSubject, credits, instruction_mode or instructor).
+        value (CharField): Value of that field, as a string.
+        count (IntegerField): Number of courses of this subject with this value.
+    """
+    courseSubject = models.CharField(max_length=100)
+    facet = models.CharField(max_length=20)
+    value = models.CharField(max_length=100)
+    count = models.IntegerField(default=0)
+
+    def __repr__(self):
+        """Return a readable string representation of the facet count."""
+        return f"CourseFacetCount({self.courseSubject}, {self.facet}, {self.value}, {self.count})"
+
+    class Meta:
+        unique_together = ("courseSubject", "facet", "value")
+        indexes = [
+            models.Index(Lower("courseSubject"), name="base_facet_subject_lower_idx"),
+        ]
+
+
+class CourseChange(models.Model):
+    """
+    One entry of the catalog change log, read by consumers of /api/courses/changes/.
+
+    Entries are appended in the same transaction as the course write by every
+    write path (see ``api.changes``); ``seq`` increases monotonically, so a
+    consumer only needs to remember the last ``seq`` it processed. A change of
+    a course's key is logged as a delete of the old key and a create of the new one.
+    Fields:
+        seq (BigAutoField): Position in the change log.
+        action (CharField): create, update or delete.
+        courseSubject (CharField): Subject of the changed course.
+        courseID (IntegerField): ID of the changed course.
+        course (JSONField): The course after the change; null for deletes.
+        created_at (DateTimeField): When the change was recorded.
+    """
+    ACTION_CREATE = "create"
+    ACTION_UPDATE = "update"
+    ACTION_DELETE = "delete"
+    ACTION_CHOICES = [
+        (ACTION_CREATE, "Create"),
+        (ACTION_UPDATE, "Update"),
+        (ACTION_DELETE, "Delete"),
+    ]
+
+    seq = models.BigAutoField(primary_key=True)
+    action = models.CharField(max_length=20, choices=ACTION_CHOICES)
+    courseSubject = models.CharField(max_length=100)
+    courseID = models.IntegerField()
+    course = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __repr__(self):
+        """Return a readable string representation of the change."""
+        return f"CourseChange({self.seq}, {self.action}, {self.courseSubject}, {self.courseID})"
+
+    class Meta:
+        ordering = ["seq"]
+
+
+class CoursePrerequisite(models.Model):
+    """
+    A course named in another course's requirements (an edge of the prerequisite graph).
+
+    Edges are parsed from Course.requirements by ``base.prerequisites`` on every
+    write. The prerequisite is stored by key, so it may name a course that is
+    not (yet) in the catalog.
+    Fields:
+        course (ForeignKey): The course whose requirements name the prerequisite.
+        prerequisite_subject (CharField): Subject of the prerequisite, upper-cased.
+        prerequisite_id (IntegerField): Course ID of the prerequisite.
+    """
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="prerequisite_edges")
+    prerequisite_subject = models.CharField(max_length=100)
+    prerequisite_id = models.IntegerField()
+
+    def __repr__(self):
+        """Return a readable string representation of the edge."""
+        return f"CoursePrerequisite({self.course_id} -> {self.prerequisite_subject} {self.prerequisite_id})"
+
+    class Meta:
+        unique_together = ("course", "prerequisite_subject", "prerequisite_id")
+
+
+class CoursePrerequisiteClosure(models.Model):
+    """
+    Transitive closure of the prerequisite graph: one row per course and
+    every course it requires directly or indirectly.
+
+    Maintained by ``base.prerequisites`` together with CoursePrerequisite, so
+    both "all prerequisites of X" and "everything X unlocks" are single
+    indexed lookups.
+    Fields:
+        course (ForeignKey): The dependent course.
+        prerequisite_subject (CharField): Subject of the (transitive) prerequisite, upper-cased.
+        prerequisite_id (IntegerField): Course ID of the (transitive) prerequisite.
+        depth (PositiveSmallIntegerField): Length of the shortest requirement chain (1 = direct).
+    """
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="prerequisite_closure")
+    prerequisite_subject = models.CharField(max_length=100)
+    prerequisite_id = models.IntegerField()
+    depth = models.PositiveSmallIntegerField()
+
+    def __repr__(self):
+        """Return a readable string representation of the closure row."""
+        return (f"CoursePrerequisiteClosure({self.course_id} -> {self.prerequisite_subject} "
+                f"{self.prerequisite_id}, depth={self.depth})")
+
+    class Meta:
+        unique_together = ("course", "prerequisite_subject", "prerequisite_id")
+        indexes = [
+            # "What does X unlock" lookups
+            models.Index(fields=["prerequisite_id", "prerequisite_subject"], name="base_prereq_closure_rev_idx"),
+        ]
@@ -0,0 +1,171 @@
+import re
+from collections import deque
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Q
+
+from base.models import Course, CoursePrerequisite, CoursePrerequisiteClosure
+
+# Prerequisite graph parsed from Course.requirements.
+#
+# Every course named in a course's requirements ("COMPSCI 187 and MATH 131",
+# "STATS 240, 241") becomes a CoursePrerequisite edge. The transitive closure
+# of those edges is materialized in CoursePrerequisiteClosure, so reads never
+# traverse the graph. Nodes are course keys (upper-cased subject, courseID):
+# the closure only depends on the edges, not on which courses exist, so
+# creating a course that others already name needs no special casing.
+#
+# On a write, only the courses whose closure can change are recomputed: the
+# written courses and every course that (transitively) requires one of their
+# old or new keys. "and"/"or" are not distinguished; every named course counts.
+
+# A subject followed by one or more course numbers: "COMPSCI 187", "STATS 240, 241 or 242"
+_REFERENCE_RE = re.compile(r'\b([A-Z][A-Z&]+)\s*(\d+\b(?:\s*(?:,|/|and|or)\s*\d+\b)*)')
+_NUMBER_RE = re.compile(r'\d+')
+
+BULK_BATCH_SIZE = 1000
+
+
+def parse_requirements(requirements):
+    """Return the ``(SUBJECT, courseID)`` keys named in a requirements string, in order of appearance."""
+    keys = []
+    for subject, numbers in _REFERENCE_RE.findall(requirements or ''):
+        for number in _NUMBER_RE.findall(numbers):
+            key = (subject.upper(), int(number))
+            if key not in keys:
+                keys.append(key)
+    return keys
+
+
+def course_key(course):
+    """Return the graph node of ``course`` (a Course)."""
+    return course.courseSubject.upper(), course.courseID
+
+
+def refresh(courses=(), removed_keys=(), removed_ids=(), created=False):
+    """
+    Update the graph after a write; call inside the write's transaction.
+
+    ``courses`` are created or updated courses (their edges are re-parsed;
+    pass ``created=True`` if they are all new, to skip clearing their old
+    rows), ``removed_keys`` are keys that no longer name a course (deleted,
+    or the old key of a course whose subject or ID changed) and
+    ``removed_ids`` are old courseIDs whose rows must be dropped because the
+    course's ID changed.
+    """
+    courses = list(courses)
+    changed_keys = {course_key(course) for course in courses} | set(removed_keys)
+    if not changed_keys:
+        return
+    parsed = {course_key(course): parse_requirements(course.requirements) for course in courses}
+    stale_ids = [*([] if created else [course.courseID for course in courses]), *removed_ids]
+    if stale_ids:
+        CoursePrerequisite.objects.filter(course_id__in=stale_ids).delete()
+    CoursePrerequisite.objects.bulk_create([
+        CoursePrerequisite(course_id=courseID, prerequisite_subject=subject, prerequisite_id=number)
+        for (_, courseID), prerequisites in parsed.items() for subject, number in prerequisites
+    ], batch_size=BULK_BATCH_SIZE)
+
+    # Courses whose closure may change: the written ones and everything requiring a changed key
+    dependents = set()
+    for keys in _batches(list(changed_keys)):
+        dependents.update(CoursePrerequisiteClosure.objects.filter(_key_filter(keys)).values_list('course_id', flat=True))
+    dependents.difference_update(removed_ids)
+    dependents.difference_update(courseID for _, courseID in parsed)
+    _recompute(parsed, dependents, stale_ids)
+
+
+def rebuild(course_model=None, edge_model=None, closure_model=None):
+    """
+    Recompute every edge and the whole closure from Course.requirements.
+
+    The models can be passed in so migrations can call this with their
+    historical models.
+    """
+    course_model = course_model or Course
+    edge_model = edge_model or CoursePrerequisite
+    closure_model = closure_model or CoursePrerequisiteClosure
+    with transaction.atomic():
+        closure_model.objects.all().delete()
+        edge_model.objects.all().delete()
+        adjacency = {}
+        edges = []
+        for courseID, subject, requirements in course_model.objects.values_list(
+                'courseID', 'courseSubject', 'requirements').iterator(chunk_size=2000):
+            prerequisites = parse_requirements(requirements)
+            adjacency[(subject.upper(), courseID)] = prerequisites
+            edges.extend(edge_model(course_id=courseID, prerequisite_subject=prerequisite_subject,
+                                    prerequisite_id=prerequisite_id)
+                         for prerequisite_subject, prerequisite_id in prerequisites)
+        edge_model.objects.bulk_create(edges, batch_size=BULK_BATCH_SIZE)
+        rows = (closure_model(course_id=key[1], prerequisite_subject=subject, prerequisite_id=number, depth=depth)
+                for key in adjacency for (subject, number), depth in _walk(key, adjacency.get))
+        # bulk_create() would materialize the whole closure; insert it in slices instead
+        while batch := list(islice(rows, BULK_BATCH_SIZE)):
+            closure_model.objects.bulk_create(batch)
+
+
+def _batches(items, size=BULK_BATCH_SIZE // 2):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _key_filter(keys):
+    query = Q()
+    for subject, number in keys:
+        query |= Q(prerequisite_subject=subject, prerequisite_id=number)
+    return query
+
+
+def _walk(start, prerequisites_of):
+    """Yield ``(key, depth)`` for every node reachable from ``start`` (breadth first, shortest depth)."""
+    depths = {start: 0}
+    queue = deque([start])
+    while queue:
+        key = queue.popleft()
+        for prerequisite in prerequisites_of(key) or ():
+            if prerequisite not in depths:
+                depths[prerequisite] = depths[key] + 1
+                queue.append(prerequisite)
+                yield prerequisite, depths[prerequisite]
+
+
+def _recompute(known, course_ids, stale_ids):
+    """
+    Replace the closure rows of the courses in ``known`` (course key to its
+    parsed prerequisites) and of ``course_ids`` by walking the edge table.
+    """
+    stale = {*course_ids, *stale_ids}
+    if stale:
+        CoursePrerequisiteClosure.objects.filter(course_id__in=stale).delete()
+    starts = set(known)
+    if course_ids:
+        starts.update((subject.upper(), courseID) for courseID, subject in
+                      Course.objects.filter(courseID__in=course_ids).values_list('courseID', 'courseSubject'))
+    adjacency = dict(known)
+
+    def load(keys):
+        # One query per level of the graph, shared by every walk
+        for key in keys:
+            adjacency[key] = []
+        for ids in _batches([number for _, number in keys]):
+            for subject, courseID, prerequisite_subject, prerequisite_id in CoursePrerequisite.objects.filter(
+                    course_id__in=ids).values_list('course__courseSubject', 'course_id',
+                                                   'prerequisite_subject', 'prerequisite_id'):
+                key = (subject.upper(), courseID)
+                if key in keys:
+                    adjacency[key].append((prerequisite_subject, prerequisite_id))
+
+    frontier = {key for key in starts if key not in adjacency}
+    frontier.update(prerequisite for key in known for prerequisite in known[key] if prerequisite not in adjacency)
+    while frontier:
+        load(frontier)
+        frontier = {prerequisite for key in frontier for prerequisite in adjacency[key]
+                    if prerequisite not in adjacency}
+
+    rows = (CoursePrerequisiteClosure(course_id=start[1], prerequisite_subject=subject, prerequisite_id=number,
+                                      depth=depth)
+            for start in starts for (subject, number), depth in _walk(start, adjacency.get))
+    while batch := list(islice(rows, BULK_BATCH_SIZE)):
+        CoursePrerequisiteClosure.objects.bulk_create(batch)
@@ -0,0 +1,130 @@
+import heapq
+import re
+
+# Parsing of Course.schedule strings and time-slot conflict detection.
+#
+# Schedules such as "MWF 10:00-10:50", "TTh 11:00-12:15" or
+# "MoWe 5:30PM - 6:45PM" are parsed into a bitmask of meeting days and the
+# start and end of the meeting in minutes after midnight, stored on Course so
+# day and time filters run in the database. Unparseable schedules ("TBA")
+# leave the columns null.
+
+MONDAY, TUESDAY, WEDNESDAY, THURSDAY, FRIDAY, SATURDAY, SUNDAY = (1 << day for day in range(7))
+ALL_DAYS = (1 << 7) - 1
+
+# Day abbreviations, longest first so "Th" wins over "T"
+DAY_TOKENS = {
+    'mo': MONDAY, 'tu': TUESDAY, 'we': WEDNESDAY, 'th': THURSDAY, 'fr': FRIDAY, 'sa': SATURDAY, 'su': SUNDAY,
+    'm': MONDAY, 't': TUESDAY, 'w': WEDNESDAY, 'r': THURSDAY, 'f': FRIDAY, 's': SATURDAY, 'u': SUNDAY,
+}
+DAY_NAMES = ((MONDAY, 'Mo'), (TUESDAY, 'Tu'), (WEDNESDAY, 'We'), (THURSDAY, 'Th'),
+             (FRIDAY, 'Fr'), (SATURDAY, 'Sa'), (SUNDAY, 'Su'))
+
+_DAY_RE = re.compile('|'.join(sorted(DAY_TOKENS, key=len, reverse=True)), re.IGNORECASE)
+_TIME = r'(\d{1,2}):(\d{2})\s*([AaPp][Mm])?'
+_SCHEDULE_RE = re.compile(rf'^\s*([A-Za-z]+)\s+{_TIME}\s*-\s*{_TIME}\s*$')
+_CLOCK_RE = re.compile(rf'^\s*{_TIME}\s*$')
+
+
+def parse_days(raw_days):
+    """
+    Parse day abbreviations such as ``"MWF"``, ``"TTh"`` or ``"MoWe"`` into a bitmask.
+
+    Raises ``ValueError`` if ``raw_days`` is not made up of day abbreviations.
+    """
+    mask, position = 0, 0
+    compact = raw_days.replace(' ', '').replace(',', '')
+    while position < len(compact):
+        match = _DAY_RE.match(compact, position)
+        if match is None:
+            raise ValueError(f'Unknown days: {raw_days}')
+        mask |= DAY_TOKENS[match.group().lower()]
+        position = match.end()
+    if not mask:
+        raise ValueError('days must name at least one day')
+    return mask
+
+
+def format_days(mask):
+    """Return the abbreviations of the days in ``mask``, e.g. ``"MoWeFr"``."""
+    return ''.join(name for day, name in DAY_NAMES if mask & day)
+
+
+def _minutes(hours, minutes, meridiem):
+    hours, minutes = int(hours), int(minutes)
+    if minutes > 59:
+        raise ValueError('Invalid time')
+    if meridiem:
+        if not 1 <= hours <= 12:
+            raise ValueError('Invalid time')
+        hours = hours % 12 + (12 if meridiem.lower() == 'pm' else 0)
+    elif hours > 23:
+        raise ValueError('Invalid time')
+    return hours * 60 + minutes
+
+
+def parse_clock(raw_time):
+    """Parse ``"HH:MM"`` (24-hour) or ``"H:MMAM"``/``"H:MMPM"`` into minutes after midnight."""
+    match = _CLOCK_RE.match(raw_time)
+    if match is None:
+        raise ValueError(f'Invalid time: {raw_time}')
+    return _minutes(*match.groups())
+
+
+def format_clock(minutes):
+    """Return ``minutes`` after midnight as ``"HH:MM"``."""
+    return f'{minutes // 60:02d}:{minutes % 60:02d}'
+
+
+def parse_schedule(schedule):
+    """
+    Parse a schedule string into ``(days, start, end)``.
+
+    ``days`` is a bitmask of meeting days and ``start``/``end`` are minutes
+    after midnight. Returns ``(None, None, None)`` if the schedule is not a
+    single "<days> <start>-<end>" meeting pattern. A start time without AM/PM
+    takes the end time's, unless that would put it after the end.
+    """
+    match = _SCHEDULE_RE.match(schedule or '')
+    if match is None:
+        return None, None, None
+    raw_days, start_h, start_m, start_meridiem, end_h, end_m, end_meridiem = match.groups()
+    try:
+        days = parse_days(raw_days)
+        end = _minutes(end_h, end_m, end_meridiem)
+        start = _minutes(start_h, start_m, start_meridiem or end_meridiem)
+        if start > end and not start_meridiem and end_meridiem:
+            start = _minutes(start_h, start_m, 'am')
+    except ValueError:
+        return None, None, None
+    if start >= end:
+        return None, None, None
+    return days, start, end
+
+
+def find_conflicts(meetings):
+    """
+    Find every pair of overlapping meetings.
+
+    ``meetings`` is a list of ``(key, days, start, end)`` tuples. Returns a
+    list of ``(key_a, key_b, days, start, end)`` tuples, one per conflicting
+    pair, where ``days`` are the shared days and ``start``/``end`` the
+    overlapping window. Each day is swept once in start order, keeping the
+    meetings still in progress in a heap ordered by end time, so the cost is
+    O(n log n) plus the number of conflicts rather than O(n^2).
+    """
+    overlaps = {}
+    for day, _ in DAY_NAMES:
+        todays = sorted((start, end, index) for index, (_, days, start, end) in enumerate(meetings) if days & day)
+        active = []  # (end, index) of meetings that have started and not ended
+        for start, end, index in todays:
+            while active and active[0][0] <= start:
+                heapq.heappop(active)
+            for other_end, other in active:
+                pair = (min(other, index), max(other, index))
+                window = (start, min(end, other_end))
+                days, _ = overlaps.get(pair, (0, None))
+                overlaps[pair] = (days | day, window)
+            heapq.heappush(active, (end, index))
+    return [(meetings[a][0], meetings[b][0], days, start, end)
+            for (a, b), (days, (start, end)) in sorted(overlaps.items())]
@@ -0,0 +1,132 @@
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+# Full-text search over Course.title, description, instructor and requirements.
+#
+# SQLite uses an FTS5 external-content table kept in sync with base_course by
+# triggers; PostgreSQL uses a GIN index over a weighted tsvector expression.
+# Both live entirely in the database, so every write path (views, bulk
+# inserts, the admin, loaddata) keeps the index current.
+
+SQLITE_FTS_TABLE = 'base_course_fts'
+
+# Relative column weights for ranking: title > instructor > description/requirements.
+SQLITE_BM25 = f"bm25({SQLITE_FTS_TABLE}, 10.0, 1.0, 5.0, 1.0)"
+
+SQLITE_INSTALL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5(
+        title, description, instructor, requirements,
+        content='base_course', content_rowid='courseID',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS base_course_fts_ai AFTER INSERT ON base_course BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, title, description, instructor, requirements)
+        VALUES (new."courseID", new.title, new.description, new.instructor, new.requirements);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS base_course_fts_ad AFTER DELETE ON base_course BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, title, description, instructor, requirements)
+        VALUES ('delete', old."courseID", old.title, old.description, old.instructor, old.requirements);
+    END""",
+    # Only updates of indexed columns (or the rowid) touch the index.
+    f"""CREATE TRIGGER IF NOT EXISTS base_course_fts_au
+        AFTER UPDATE OF "courseID", title, description, instructor, requirements ON base_course BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, title, description, instructor, requirements)
+        VALUES ('delete', old."courseID", old.title, old.description, old.instructor, old.requirements);
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, title, description, instructor, requirements)
+        VALUES (new."courseID", new.title, new.description, new.instructor, new.requirements);
+    END""",
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')",
+]
+
+SQLITE_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS base_course_fts_ai",
+    "DROP TRIGGER IF EXISTS base_course_fts_ad",
+    "DROP TRIGGER IF EXISTS base_course_fts_au",
+    f"DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}",
+]
+
+POSTGRES_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(instructor, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce(requirements, '')), 'D')"
+)
+
+POSTGRES_INSTALL = [
+    f"CREATE INDEX IF NOT EXISTS base_course_search_idx ON base_course USING GIN (({POSTGRES_DOCUMENT}))",
+]
+
+POSTGRES_UNINSTALL = [
+    "DROP INDEX IF EXISTS base_course_search_idx",
+]
+
+
+def install_search_index(schema_editor):
+    """
+    Create the full-text index for the current database vendor.
+
+    Safe to run repeatedly; migrations that rebuild ``base_course`` on SQLite
+    (which drops its triggers) call it again afterwards.
+    """
+    vendor = schema_editor.connection.vendor
+    statements = {'sqlite': SQLITE_INSTALL, 'postgresql': POSTGRES_INSTALL}.get(vendor, [])
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def drop_search_index(schema_editor):
+    """Remove the full-text index created by :func:`install_search_index`."""
+    vendor = schema_editor.connection.vendor
+    statements = {'sqlite': SQLITE_UNINSTALL, 'postgresql': POSTGRES_UNINSTALL}.get(vendor, [])
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def _sqlite_match_expression(query):
+    """
+    Turn free-form user input into a safe FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term, so FTS5 operators and syntax
+    characters in the input are never interpreted.
+    """
+    terms = re.findall(r'\w+', query)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_courses(courses, query):
+    """
+    Restrict ``courses`` to those matching ``query`` and order them by relevance.
+
+    The returned queryset is annotated with ``search_rank`` (higher is better)
+    and ordered by rank, then courseSubject and courseID.
+    """
+    vendor = connection.vendor
+    if vendor == 'sqlite':
+        match = _sqlite_match_expression(query)
+        if not match:
+            return courses.none()
+        table = connection.ops.quote_name(courses.model._meta.db_table)
+        courses = courses.filter(
+            courseID__in=RawSQL(f"SELECT rowid FROM {SQLITE_FTS_TABLE} WHERE {SQLITE_FTS_TABLE} MATCH %s", [match])
+        ).annotate(search_rank=RawSQL(
+            f"SELECT -{SQLITE_BM25} FROM {SQLITE_FTS_TABLE} "
+            f"WHERE {SQLITE_FTS_TABLE} MATCH %s AND rowid = {table}.\"courseID\"",
+            [match], output_field=FloatField(),
+        ))
+    elif vendor == 'postgresql':
+        courses = courses.filter(
+            RawSQL(f"({POSTGRES_DOCUMENT}) @@ websearch_to_tsquery('english', %s)", [query], output_field=BooleanField())
+        ).annotate(search_rank=RawSQL(
+            f"ts_rank(({POSTGRES_DOCUMENT}), websearch_to_tsquery('english', %s))",
+            [query], output_field=FloatField(),
+        ))
+    else:
+        # No native full-text support: fall back to substring matching.
+        courses = courses.filter(
+            Q(title__icontains=query) | Q(description__icontains=query)
+            | Q(instructor__icontains=query) | Q(requirements__icontains=query)
+        ).annotate(search_rank=Value(0.0, output_field=FloatField()))
+    return courses.order_by('-search_rank', 'courseSubject', 'courseID')
@@ -1,9 +1,38 @@
 from django.test import TestCase
 from rest_framework.test import APIClient
 from rest_framework import status
-from base.models import Course
+from base.models import Course, CourseChange, CourseFacetCount, DiscussionOutbox
+from base import facets
+from base.search import search_courses
 from unittest.mock import patch
-from django.test import override_settings
+from django.test import override_settings, RequestFactory
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from unittest import skipUnless
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from datetime import datetime, timezone as dt_timezone
+from asgiref.sync import sync_to_async
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import gzip
+import json
+import threading
+from api.outbox import OutboxDispatcher, enqueue_discussion_create, enqueue_discussion_delete, enqueue_discussion_update
+from django.core.management import call_command
+import io
+import tempfile
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework.exceptions import AuthenticationFailed
+from coursesService.authentication import ExternalJWTAuthentication, ExternalJWTUser, Role, TokenCache
+import time
+from api.views import _filter_courses
+from api.discussions import CircuitBreaker, CircuitOpenError, DiscussionsClient
+from coursesService import metrics
+from api.permissions import IsAdmin, IsStaff, IsStudent
+from api import changes, snapshot, throttling
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.request import Request
 
 @override_settings(DISCUSSIONS_API_BASE_URL="http://testserver/api/discussions/")
 class CourseAPITestCase(TestCase):
@@ -17,9 +46,14 @@ class CourseAPITestCase(TestCase):
         self.student_headers = {'HTTP_AUTHORIZATION': 'bearer student'}
         self.staff_headers = {'HTTP_AUTHORIZATION': 'bearer staff'}
         self.admin_headers = {'HTTP_AUTHORIZATION': 'bearer admin'}
+        self.other_staff_headers = {'HTTP_AUTHORIZATION': 'bearer other-staff'}
         # Patch authentication to simulate user roles
         self.patcher = patch('coursesService.authentication.ExternalJWTAuthentication.authenticate', side_effect=self.fake_auth)
         self.patcher.start()
+        # Start every test with an empty response cache, catalog snapshot and rate limits
+        cache.clear()
+        snapshot.clear()
+        throttling.get_store().clear()
         # Prepopulate with two courses
         self.course1 = Course.objects.create(
             courseID=1,
@@ -47,12 +81,14 @@ class CourseAPITestCase(TestCase):
             'student': {'id': 1, 'role': 'STUDENT', 'is_authenticated': True},
             'staff': {'id': 2, 'role': 'STAFF', 'is_authenticated': True},
             'admin': {'id': 3, 'role': 'ADMIN', 'is_authenticated': True},
+            'other-staff': {'id': 4, 'role': 'STAFF', 'is_authenticated': True},
         }
         user_info = roles.get(token, {'id': 0, 'role': 'STUDENT', 'is_authenticated': True})
         class DummyUser:
             def __init__(self, info):
                 self.id = info['id']
                 self.role = info['role']
+                self.roles = Role.parse(info['role'])
                 self.is_authenticated = info['is_authenticated']
         return (DummyUser(user_info), {})
 
@@ -78,8 +114,8 @@ class CourseAPITestCase(TestCase):
         # Testing assertion
         response = self.client.get('/api/courses/', **self.student_headers)
         self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: Should return 200 OK.")
-        self.assertEqual(len(response.data), 2, "Testing: Should return 2 courses.")
-        subjects = [course['courseSubject'] for course in response.data]
+        self.assertEqual(len(response.json()), 2, "Testing: Should return 2 courses.")
+        subjects = [course['courseSubject'] for course in response.json()]
         self.assertEqual(subjects, sorted(subjects), "Testing: Courses should be sorted.")
         # Postcondition assertion
         self.assertEqual(Course.objects.count(), 2, "Postcondition: No courses should be changed.")
@@ -112,6 +148,40 @@ class CourseAPITestCase(TestCase):
         # Postcondition assertion
         self.assertEqual(Course.objects.count(), 2, "Postcondition: No courses should be changed.")
 
+    def test_filter_substring_and_opt_in_prefix(self):
+        """
+        Test courseSubject and instructor match anywhere in the name, and the _prefix filters only at its start.
+        """
+        # Precondition assertion
+        self.assertEqual(Course.objects.count(), 2, "Precondition: 2 courses exist.")
+        # Testing assertion
+        for query, expected in (('instructor=ones', ['Jones']), ('courseSubject=sci', ['COMPSCI']),
+                                ('instructor_prefix=jo', ['Jones']), ('instructor_prefix=ones', []),
+                                ('courseSubject_prefix=comp', ['COMPSCI']), ('courseSubject_prefix=sci', [])):
+            response = self.client.get(f'/api/courses/?{query}&fields=instructor,courseSubject', **self.student_headers)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, f"Testing: {query} should return 200 OK.")
+            self.assertEqual([value for course in response.json() for value in course.values() if value in expected],
+                             expected, f"Testing: {query} should match {expected}.")
+        # Postcondition assertion
+        self.assertEqual(Course.objects.count(), 2, "Postcondition: No courses should be changed.")
+
+    def test_filter_prefix_at_code_point_limits(self):
+        """
+        Test prefix filters ending in U+D7FF or U+10FFFF return matches instead of failing.
+        """
+        Course.objects.filter(pk=self.course2.pk).update(instructor="Jones\ud7ff\U0010ffff")
+        # Precondition assertion
+        self.assertEqual(Course.objects.count(), 2, "Precondition: 2 courses exist.")
+        # Testing assertion
+        for field, prefix, expected in (('instructor_prefix', "Jones\ud7ff", 1),
+                                        ('instructor_prefix', "jones\ud7ff\U0010ffff", 1),
+                                        ('courseSubject_prefix', "\U0010ffff", 0)):
+            response = self.client.get('/api/courses/', {field: prefix}, **self.student_headers)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, f"Testing: {prefix!r} should not fail.")
+            self.assertEqual(len(response.json()), expected, f"Testing: {prefix!r} should match the courses it prefixes.")
+        # Postcondition assertion
+        self.assertEqual(Course.objects.count(), 2, "Postcondition: No courses should be changed.")
+
     def test_filter_by_title_partial(self):
         """
         Test filtering by partial title.
@@ -139,8 +209,693 @@ class CourseAPITestCase(TestCase):
         # Postcondition assertion
         self.assertEqual(Course.objects.count(), 2, "Postcondition: No courses should be changed.")
 
-    @patch('api.views.requests.post')
-    def test_create_course(self, mock_post):
+    def test_paginate_courses_with_cursor(self):
+        """
+        Test walking the course list one page at a time with limit and cursor.
+        """
+        # Precondition assertion
+        self.assertEqual(Course.objects.count(), 2, "Precondition: 2 courses exist.")
+        # Testing assertion
+        response = self.client.get('/api/courses/?limit=1', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: Should return 200 OK.")
+        self.assertEqual(len(response.data['results']), 1, "Testing: First page should hold 1 course.")
+        self.assertEqual(response.data['results'][0]['courseSubject'], 'BIOLOGY', "Testing: First page should start with BIOLOGY.")
+        self.assertIsNotNone(response.data['next_cursor'], "Testing: First page should have a next cursor.")
+        response = self.client.get(f"/api/courses/?limit=1&cursor={response.data['next_cursor']}", **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: Should return 200 OK.")
+        self.assertEqual(response.data['results'][0]['courseSubject'], 'COMPSCI', "Testing: Second page should hold COMPSCI.")
+        self.assertIsNone(response.data['next_cursor'], "Testing: Last page should have no next cursor.")
+        # Postcondition assertion
+        self.assertEqual(Course.objects.count(), 2, "Postcondition: No courses should be changed.")
+
+    def test_paginate_courses_invalid_cursor(self):
+        """
+        Test that a malformed cursor is rejected.
+        """
+        # Precondition assertion
+        self.assertEqual(Course.objects.count(), 2, "Precondition: 2 courses exist.")
+        # Testing assertion
+        response = self.client.get('/api/courses/?cursor=not-a-cursor', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, "Testing: Should return 400 Bad Request.")
+        # Postcondition assertion
+        self.assertEqual(Course.objects.count(), 2, "Postcondition: No courses should be changed.")
+
+    def test_list_courses_sparse_fields(self):
+        """
+        Test that ?fields= returns only the requested fields, also across pages.
+        """
+        # Precondition assertion
+        full = self.client.get('/api/courses/', **self.student_headers).json()
+        self.assertIn('description', full[0], "Precondition: Full listing includes description.")
+        # Testing assertion
+        response = self.client.get('/api/courses/?fields=title,courseID', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: Should return 200 OK.")
+        self.assertEqual(response.data, [{'courseID': 2, 'title': 'Genetics'}, {'courseID': 1, 'title': 'Intro to CS'}],
+                         "Testing: Only the requested fields should be returned, in listing order.")
+        response = self.client.get('/api/courses/?fields=title&limit=1', **self.student_headers)
+        self.assertEqual(response.data['results'], [{'title': 'Genetics'}], "Testing: Pages should be trimmed too.")
+        response = self.client.get(f"/api/courses/?fields=title&limit=1&cursor={response.data['next_cursor']}", **self.student_headers)
+        self.assertEqual(response.data['results'], [{'title': 'Intro to CS'}], "Testing: Cursor should still work.")
+        response = self.client.get('/api/courses/?fields=title,password', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, "Testing: Unknown fields should be rejected.")
+        # Postcondition assertion
+        self.assertEqual(response.data, {'error': 'Unknown fields: password'}, "Postcondition: Error should name the field.")
+
+    def test_filter_by_schedule(self):
+        """
+        Test the days, starts_after and ends_before filters on parsed schedules.
+        """
+        # Precondition assertion
+        self.assertEqual((self.course1.schedule_days, self.course1.schedule_start, self.course1.schedule_end),
+                         (21, 600, 650), "Precondition: MWF 10:00-10:50 should be parsed on save.")
+        # Testing assertion
+        def ids(query):
+            response = self.client.get(f'/api/courses/?{query}&fields=courseID', **self.student_headers)
+            return sorted(row['courseID'] for row in response.data)
+        self.assertEqual(ids('days=MWF'), [1], "Testing: Only courses meeting within MWF.")
+        self.assertEqual(ids('days=MoTuWeThFr'), [1, 2], "Testing: Every weekday course fits.")
+        self.assertEqual(ids('days=MW'), [], "Testing: A Friday meeting falls outside MW.")
+        self.assertEqual(ids('starts_after=10:30'), [2], "Testing: Start time filter.")
+        self.assertEqual(ids('ends_before=11:00AM&courseSubject=COMPSCI'), [1], "Testing: End time filter combines with others.")
+        self.client.patch('/api/courses/BIOLOGY/2/', {'schedule': 'MW 8:00-8:50', 'version': 1}, format='json',
+                          **self.admin_headers)
+        self.assertEqual(ids('days=MWF&ends_before=9:00'), [2], "Testing: Updates should re-parse the schedule.")
+        response = self.client.get('/api/courses/?days=XYZ', **self.student_headers)
+        # Postcondition assertion
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, "Postcondition: Unknown days should be rejected.")
+
+    def test_course_conflicts(self):
+        """
+        Test the conflict check reports overlapping pairs, unscheduled courses and misses.
+        """
+        Course.objects.create(courseID=3, courseSubject="MATH", title="Calculus", instructor="Lee", credits=4,
+                              schedule="MoWe 10:30AM - 11:45AM", room="M1", requirements="None",
+                              description="Limits", instruction_mode="In Person")
+        Course.objects.create(courseID=4, courseSubject="MATH", title="Seminar", instructor="Lee", credits=1,
+                              schedule="TBA", room="M2", requirements="None",
+                              description="Talks", instruction_mode="In Person")
+        # Precondition assertion
+        self.assertEqual(Course.objects.filter(schedule_days__isnull=True).count(), 1, "Precondition: TBA is unparsed.")
+        # Testing assertion
+        response = self.client.post('/api/courses/conflicts/', {'courses': [
+            ['COMPSCI', 1], ['BIOLOGY', 2], ['MATH', 3], ['MATH', 4], ['MATH', 9]]}, format='json', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: Should return 200 OK.")
+        self.assertEqual(response.data['conflicts'], [{
+            'courses': [{'courseSubject': 'COMPSCI', 'courseID': 1}, {'courseSubject': 'MATH', 'courseID': 3}],
+            'days': 'MoWe', 'start': '10:30', 'end': '10:50'}], "Testing: Only the MW 10:30-10:50 overlap conflicts.")
+        self.assertEqual(response.data['unscheduled'], [{'courseSubject': 'MATH', 'courseID': 4, 'schedule': 'TBA'}],
+                         "Testing: TBA courses should be reported as unscheduled.")
+        # Postcondition assertion
+        self.assertEqual(response.data['missing'], [{'courseSubject': 'MATH', 'courseID': 9}],
+                         "Postcondition: Unknown keys should be listed.")
+
+    def test_prerequisite_graph(self):
+        """
+        Test the prerequisite closure follows creates, updates and deletes.
+        """
+        def create(subject, courseID, requirements):
+            response = self.client.post('/api/courses/create/', {
+                'courseID': courseID, 'courseSubject': subject, 'title': f'{subject} {courseID}', 'instructor': 'Smith',
+                'credits': 3, 'schedule': 'TBA', 'room': 'R1', 'requirements': requirements,
+                'description': 'Graph', 'instruction_mode': 'Online'}, format='json', **self.staff_headers)
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+
+        def chain(path):
+            response = self.client.get(path, **self.student_headers)
+            return [(row['courseSubject'], row['courseID'], row['depth']) for row in response.data]
+
+        create('COMPSCI', 20, 'COMPSCI 1 and MATH 10, 11 or equivalent')
+        create('COMPSCI', 30, 'COMPSCI 20')
+        # Precondition assertion
+        with self.assertNumQueries(1):
+            prerequisites = chain('/api/courses/compsci/30/prerequisites/')
+        self.assertEqual(prerequisites,
+                         [('COMPSCI', 20, 1), ('COMPSCI', 1, 2), ('MATH', 10, 2), ('MATH', 11, 2)],
+                         "Precondition: Transitive prerequisites, nearest first.")
+        # Testing assertion
+        create('MATH', 10, 'PHYS 5')
+        self.assertEqual(chain('/api/courses/COMPSCI/30/prerequisites/')[-1], ('PHYS', 5, 3),
+                         "Testing: A new course extends the chains that already name it.")
+        self.assertEqual(chain('/api/courses/MATH/10/unlocks/'), [('COMPSCI', 20, 1), ('COMPSCI', 30, 2)],
+                         "Testing: Unlocks should list dependents transitively.")
+        response = self.client.get('/api/courses/COMPSCI/30/prerequisites/', **self.student_headers)
+        self.assertEqual({row['courseID']: row['title'] for row in response.data}[11], None,
+                         "Testing: Prerequisites outside the catalog have no title.")
+        self.client.patch('/api/courses/COMPSCI/20/', {'requirements': 'COMPSCI 1', 'version': 1}, format='json',
+                          **self.admin_headers)
+        self.assertEqual(chain('/api/courses/COMPSCI/30/prerequisites/'), [('COMPSCI', 20, 1), ('COMPSCI', 1, 2)],
+                         "Testing: Updating requirements should update dependents' closures.")
+        self.client.patch('/api/courses/COMPSCI/20/', {'courseID': 21, 'version': 2}, format='json', **self.admin_headers)
+        self.assertEqual(chain('/api/courses/COMPSCI/30/prerequisites/'), [('COMPSCI', 20, 1)],
+                         "Testing: Renumbering a course should cut the chains through its old key.")
+        self.assertEqual(chain('/api/courses/COMPSCI/1/unlocks/'), [('COMPSCI', 21, 1)],
+                         "Testing: The renumbered course keeps its own prerequisites.")
+        self.client.delete('/api/courses/COMPSCI/21/delete/', **self.staff_headers)
+        # Postcondition assertion
+        self.assertEqual(chain('/api/courses/COMPSCI/1/unlocks/'), [], "Postcondition: Deleting a course removes its edges.")
+        response = self.client.get('/api/courses/COMPSCI/99/unlocks/', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, "Postcondition: Unknown courses return 404.")
+
+    def test_course_facets(self):
+        """
+        Test facet counts come from the summary table and follow course writes.
+        """
+        # setUp writes through the ORM, which bypasses the catalog write paths
+        facets.rebuild()
+        # Precondition assertion
+        self.assertEqual(CourseFacetCount.objects.filter(facet='courseSubject').count(), 2,
+                         "Precondition: Both subjects are counted.")
+        # Testing assertion
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/courses/facets/', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: Should return 200 OK.")
+        self.assertFalse(any('"base_course"' in query['sql'] for query in queries.captured_queries),
+                         "Testing: Unfiltered counts should not read the Course table.")
+        self.assertEqual(response.data['credits'], [{'value': 3, 'count': 1}, {'value': 4, 'count': 1}],
+                         "Testing: Credits should be counted as integers.")
+        self.client.post('/api/courses/create/', {
+            'courseID': 3, 'courseSubject': 'COMPSCI', 'title': 'Algorithms', 'instructor': 'Smith',
+            'credits': 3, 'schedule': 'TTh 1:00-2:15', 'room': 'CS140', 'requirements': 'None',
+            'description': 'Graphs', 'instruction_mode': 'In Person'}, format='json', **self.staff_headers)
+        response = self.client.get('/api/courses/facets/?courseSubject=comp', **self.student_headers)
+        self.assertEqual(response.data['courseSubject'], [{'value': 'COMPSCI', 'count': 2}],
+                         "Testing: Subject filter should be served from the summary.")
+        self.assertEqual(response.data['instructor'], [{'value': 'Smith', 'count': 2}],
+                         "Testing: New course should be counted.")
+        self.client.delete('/api/courses/BIOLOGY/2/delete/', **self.staff_headers)
+        response = self.client.get('/api/courses/facets/', **self.student_headers)
+        self.assertEqual(response.data['instruction_mode'], [{'value': 'In Person', 'count': 2}],
+                         "Testing: Deleted course should be uncounted.")
+        response = self.client.get('/api/courses/facets/?q=graphs', **self.student_headers)
+        # Postcondition assertion
+        self.assertEqual(response.data['courseSubject'], [{'value': 'COMPSCI', 'count': 1}],
+                         "Postcondition: Other filters should count the matching courses.")
+
+    def test_lookup_courses_batch(self):
+        """
+        Test that a batch lookup returns courses in request order and lists misses.
+        """
+        body = {'courses': [{'courseSubject': 'compsci', 'courseID': 1}, ['BIOLOGY', 9], ['BIOLOGY', 2],
+                            {'courseSubject': 'BIOLOGY', 'courseID': 1}]}
+        # Precondition assertion
+        self.assertEqual(Course.objects.count(), 2, "Precondition: 2 courses exist.")
+        # Testing assertion
+        with self.assertNumQueries(1):
+            response = self.client.post('/api/courses/lookup/?fields=courseID,title', body, format='json',
+                                        **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: Should return 200 OK.")
+        self.assertEqual(response.data['results'], [{'courseID': 1, 'title': 'Intro to CS'},
+                                                    {'courseID': 2, 'title': 'Genetics'}],
+                         "Testing: Hits should come back in request order with only the requested fields.")
+        self.assertEqual(response.data['missing'], [{'courseSubject': 'BIOLOGY', 'courseID': 9},
+                                                    {'courseSubject': 'BIOLOGY', 'courseID': 1}],
+                         "Testing: Unknown keys and subject mismatches should be listed as missing.")
+        with override_settings(COURSES_LOOKUP_MAX_KEYS=3):
+            response = self.client.post('/api/courses/lookup/', body, format='json', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, "Testing: Oversized batches should be rejected.")
+        response = self.client.post('/api/courses/lookup/', {'courses': [['COMPSCI', '1']]}, format='json',
+                                    **self.student_headers)
+        # Postcondition assertion
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, "Postcondition: Malformed keys should be rejected.")
+
+    def test_bulk_delete_courses(self):
+        """
+        Test bulk delete by key list and by filter, with a per-key summary and queued thread cleanup.
+        """
+        for courseID in (3, 4):
+            Course.objects.create(
+                courseID=courseID,
+                courseSubject="HISTORY", title=f"History {courseID}", instructor="Brown",
+                credits=3, schedule="MWF 9:00-9:50", room="HIS1",
+                requirements="", description="Old semester", instruction_mode="In Person"
+            )
+        # Precondition assertion
+        self.assertEqual(Course.objects.count(), 4, "Precondition: 4 courses exist.")
+        response = self.client.post('/api/courses/bulk-delete/', {'courses': [['COMPSCI', 1]]}, format='json',
+                                    **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN, "Precondition: Students cannot bulk delete.")
+        # Testing assertion
+        body = {'courses': [['compsci', 1], ['BIOLOGY', 1], ['BIOLOGY', 9]]}
+        response = self.client.post('/api/courses/bulk-delete/', body, format='json', **self.staff_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: Should return 200 OK.")
+        self.assertEqual(response.data['deleted'], 1, "Testing: Only the matching course should be deleted.")
+        self.assertEqual([entry['status'] for entry in response.data['results']], ['deleted', 'not_found', 'not_found'],
+                         "Testing: Every key should get a status in request order.")
+        self.assertFalse(Course.objects.filter(courseID=1).exists(), "Testing: COMPSCI 1 should be deleted.")
+        with override_settings(COURSES_BULK_DELETE_MAX_COURSES=1):
+            response = self.client.post('/api/courses/bulk-delete/', {'filter': {'courseSubject': 'HISTORY'}},
+                                        format='json', **self.staff_headers)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, "Testing: Filters over the limit should be rejected.")
+        self.assertEqual(Course.objects.filter(courseSubject='HISTORY').count(), 2, "Testing: A rejected request should delete nothing.")
+        response = self.client.post('/api/courses/bulk-delete/', {'filter': {}}, format='json', **self.staff_headers)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, "Testing: An empty filter should be rejected.")
+        for partial in ({'courseSubject': 'hist'}, {'instructor': 'brow'}, {'title': 'history'}):
+            response = self.client.post('/api/courses/bulk-delete/', {'filter': partial}, format='json', **self.staff_headers)
+            self.assertEqual(response.data['deleted'], 0, f"Testing: {partial} names courses only partially and should delete nothing.")
+        response = self.client.post('/api/courses/bulk-delete/', {'filter': {'courseSubject': 'history', 'instructor': 'BROWN'}},
+                                    format='json', **self.staff_headers)
+        self.assertEqual(response.data['deleted'], 2, "Testing: The filter should delete both HISTORY courses.")
+        # Postcondition assertion
+        self.assertEqual(list(Course.objects.values_list('courseID', flat=True)), [2], "Postcondition: Only BIOLOGY 2 should remain.")
+        self.assertEqual(DiscussionOutbox.objects.filter(action=DiscussionOutbox.ACTION_DELETE).count(), 3,
+                         "Postcondition: Each deleted course should queue a thread deletion.")
+        response = self.client.get('/api/courses/changes/?since=0', **self.student_headers)
+        self.assertEqual([(change['action'], change['courseID']) for change in response.data['changes']],
+                         [('delete', 1), ('delete', 3), ('delete', 4)], "Postcondition: Deletions should be logged.")
+
+    def test_search_courses_ranked(self):
+        """
+        Test full-text search ranks title matches above description matches.
+        """
+        Course.objects.create(
+            courseID=3,
+            courseSubject="BIOLOGY", title="Ecology", instructor="Lee",
+            credits=3, schedule="MWF 9:00-9:50", room="BIO101",
+            requirements="", description="Population genetics and ecosystems", instruction_mode="In Person"
+        )
+        # Precondition assertion
+        self.assertEqual(Course.objects.count(), 3, "Precondition: 3 courses exist.")
+        # Testing assertion
+        response = self.client.get('/api/courses/?q=genetics', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: Should return 200 OK.")
+        titles = [course['title'] for course in response.data]
+        self.assertEqual(titles, ['Genetics', 'Ecology'], "Testing: Title match should rank first.")
+        response = self.client.get('/api/courses/?q=genes+basics', **self.student_headers)
+        self.assertEqual(len(response.data), 0, "Testing: All search terms must match.")
+        # Postcondition assertion
+        self.assertEqual(Course.objects.count(), 3, "Postcondition: No courses should be changed.")
+
+    def test_search_index_follows_writes(self):
+        """
+        Test the search index picks up created courses and drops deleted ones.
+        """
+        # Precondition assertion
+        response = self.client.get('/api/courses/?q=calculus', **self.student_headers)
+        self.assertEqual(len(response.data), 0, "Precondition: No course matches 'calculus'.")
+        # Testing assertion
+        new_course = {
+            "courseID": 999, "courseSubject": "MATH", "title": "Calculus", "instructor": "Taylor",
+            "credits": 4, "schedule": "MWF 9:00-9:50", "room": "MATH101",
+            "requirements": "None", "description": "Intro to Calculus", "instruction_mode": "In Person"
+        }
+        self.client.post('/api/courses/create/', new_course, format='json', **self.staff_headers)
+        response = self.client.get('/api/courses/?q=calc', **self.student_headers)
+        self.assertEqual([c['courseID'] for c in response.data], [999], "Testing: Created course should be searchable.")
+        self.client.delete('/api/courses/MATH/999/delete/', **self.staff_headers)
+        response = self.client.get('/api/courses/?q=calculus', **self.student_headers)
+        # Postcondition assertion
+        self.assertEqual(len(response.data), 0, "Postcondition: Deleted course should not be searchable.")
+
+    def test_list_courses_cached(self):
+        """
+        Test repeated listings are served from the cache, querying only the catalog version.
+        """
+        # Precondition assertion
+        response = self.client.get('/api/courses/?instructor=Smith', **self.student_headers)
+        self.assertEqual(len(response.data), 1, "Precondition: First request fills the cache.")
+        # Testing assertion
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/courses/?instructor=Smith&unused=1', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: Should return 200 OK.")
+        self.assertEqual(len(response.data), 1, "Testing: Cached response should hold 1 course.")
+        # Postcondition assertion
+        self.assertEqual(Course.objects.count(), 2, "Postcondition: No courses should be changed.")
+
+    def test_listing_cache_sees_writes_of_other_workers(self):
+        """
+        Test a write committed by another process invalidates this process's cached listings.
+        """
+        # Precondition assertion
+        response = self.client.get('/api/courses/?instructor=Smith', **self.student_headers)
+        self.assertEqual(len(response.data), 1, "Precondition: First request fills the cache.")
+        etag = response['ETag']
+        # Testing assertion
+        # Another worker's write: it commits a change-log entry but cannot touch this process's cache
+        with transaction.atomic():
+            course = Course.objects.create(courseID=77, courseSubject='MATH', title='Logic', instructor='Smith',
+                                           credits=3, schedule='MWF 9:00-9:50', room='LGRT', requirements='None',
+                                           description='Logic', instruction_mode='In Person')
+            changes.record_created([course])
+        response = self.client.get('/api/courses/?instructor=Smith', HTTP_IF_NONE_MATCH=etag, **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: The old ETag should no longer match.")
+        # Postcondition assertion
+        self.assertEqual(len(response.data), 2, "Postcondition: The listing should include the other worker's course.")
+
+    def test_list_courses_conditional_get(self):
+        """
+        Test a matching If-None-Match returns 304 Not Modified.
+        """
+        # Precondition assertion
+        response = self.client.get('/api/courses/', **self.student_headers)
+        self.assertIn('ETag', response, "Precondition: Listing should carry an ETag.")
+        self.assertIn('Last-Modified', response, "Precondition: Listing should carry Last-Modified.")
+        # Testing assertion
+        response = self.client.get('/api/courses/', HTTP_IF_NONE_MATCH=response['ETag'], **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED, "Testing: Should return 304 Not Modified.")
+        self.assertEqual(response.content, b'', "Testing: 304 response should have no body.")
+        # Postcondition assertion
+        self.assertEqual(Course.objects.count(), 2, "Postcondition: No courses should be changed.")
+
+    def test_if_modified_since_sees_write_in_same_second(self):
+        """
+        Test If-Modified-Since revalidation does not hide a write made in the same second as the fetch.
+        """
+        new_course = {
+            "courseID": 998, "courseSubject": "MATH", "title": "Algebra", "instructor": "Taylor",
+            "credits": 3, "schedule": "MWF 9:00-9:50", "room": "MATH101",
+            "requirements": "None", "description": "Intro to Algebra", "instruction_mode": "In Person"
+        }
+        url = '/api/courses/?courseSubject=MATH'
+        write_time = datetime.fromtimestamp(1_800_000_000.2, tz=dt_timezone.utc)
+        with patch('api.cache.time.time', return_value=1_800_000_000.2), \
+                patch('django.utils.timezone.now', return_value=write_time):
+            self.client.delete('/api/courses/COMPSCI/1/delete/', **self.staff_headers)
+            # Precondition assertion
+            response = self.client.get(url, **self.student_headers)
+            self.assertEqual(len(response.json()), 0, "Precondition: No MATH courses yet.")
+            last_modified = response['Last-Modified']
+            # Testing assertion
+            self.client.post('/api/courses/create/', new_course, format='json', **self.staff_headers)
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified, **self.student_headers)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: The same-second write should be seen.")
+            self.assertEqual(len(response.json()), 1, "Testing: Listing should include the new course.")
+        # Postcondition assertion
+        with patch('api.cache.time.time', return_value=1_800_000_005.0):
+            last_modified = self.client.get(url, **self.student_headers)['Last-Modified']
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified, **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED,
+                         "Postcondition: Once the second has passed, If-Modified-Since revalidates.")
+
+    def test_list_courses_compressed(self):
+        """
+        Test large listings are gzip-compressed on request with a per-encoding ETag that revalidates.
+        """
+        Course.objects.filter(courseID=1).update(description='Basics ' * 200)
+        # Precondition assertion
+        response = self.client.get('/api/courses/?courseSubject=BIOLOGY', HTTP_ACCEPT_ENCODING='gzip', **self.student_headers)
+        self.assertNotIn('Content-Encoding', response, "Precondition: Small responses should not be compressed.")
+        # Testing assertion
+        response = self.client.get('/api/courses/', HTTP_ACCEPT_ENCODING='gzip;q=0.5, identity', **self.student_headers)
+        self.assertEqual(response['Content-Encoding'], 'gzip', "Testing: Large listings should be gzipped.")
+        self.assertIn('Accept-Encoding', response['Vary'], "Testing: Responses should vary on Accept-Encoding.")
+        self.assertTrue(response['ETag'].endswith('-gzip"'), "Testing: The gzip variant should have its own strong ETag.")
+        self.assertEqual(json.loads(gzip.decompress(response.content))[0]['courseSubject'], 'BIOLOGY',
+                         "Testing: The body should decompress to the listing.")
+        etag = response['ETag']
+        response = self.client.get('/api/courses/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=etag,
+                                   **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED, "Testing: The gzip ETag should revalidate.")
+        self.assertEqual(response['ETag'], etag, "Testing: 304 should echo the variant's ETag.")
+        # Postcondition assertion
+        response = self.client.get('/api/courses/', HTTP_ACCEPT_ENCODING='gzip;q=0', **self.student_headers)
+        self.assertNotIn('Content-Encoding', response, "Postcondition: q=0 should disable compression.")
+
+    def test_catalog_snapshot(self):
+        """
+        Test the unfiltered listing is served from the versioned snapshot, shared through the cache and rebuilt after writes.
+        """
+        # Precondition assertion
+        response = self.client.get('/api/courses/', **self.student_headers)
+        self.assertEqual(response['ETag'], '"c0"', "Precondition: Without logged changes the snapshot is version 0.")
+        # Testing assertion
+        with override_settings(COURSES_SNAPSHOT_CACHE_ALIAS='default'):
+            new_course = {
+                "courseID": 999, "courseSubject": "MATH", "title": "Calculus", "instructor": "Taylor",
+                "credits": 4, "schedule": "MWF 9:00-9:50", "room": "MATH101",
+                "requirements": "None", "description": "Intro to Calculus " * 100, "instruction_mode": "In Person"
+            }
+            self.client.post('/api/courses/create/', new_course, format='json', **self.staff_headers)
+            response = self.client.get('/api/courses/', **self.student_headers)
+            etag = response['ETag']
+            self.assertNotEqual(etag, '"c0"', "Testing: A write should move the snapshot to a new version.")
+            self.assertEqual(len(response.json()), 3, "Testing: The new snapshot should include the new course.")
+            snapshot.clear()
+            with self.assertNumQueries(1):
+                response = self.client.get('/api/courses/', HTTP_ACCEPT_ENCODING='gzip', **self.student_headers)
+        self.assertEqual(response['Content-Encoding'], 'gzip', "Testing: The precompressed variant should be served.")
+        self.assertEqual(response['ETag'], etag[:-1] + '-gzip"', "Testing: The gzip variant should have its own ETag.")
+        self.assertEqual(len(json.loads(gzip.decompress(response.content))), 3,
+                         "Testing: Another process should load the snapshot from the shared cache, querying only the version.")
+        # Postcondition assertion
+        response = self.client.get('/api/courses/', HTTP_IF_NONE_MATCH=etag, **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED, "Postcondition: The snapshot ETag should revalidate.")
+
+    @override_settings(COURSES_THROTTLE_RATES={'read': '2/min', 'write': '1/min'})
+    def test_rate_limits_per_user_and_scope(self):
+        """
+        Test each user gets separate read and write token buckets and throttled requests get 429 with Retry-After.
+        """
+        # Precondition assertion
+        for _ in range(2):
+            response = self.client.get('/api/courses/', **self.staff_headers)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, "Precondition: Reads within the budget pass.")
+        # Testing assertion
+        response = self.client.get('/api/courses/', **self.staff_headers)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS, "Testing: The third read should be throttled.")
+        self.assertEqual(response['Retry-After'], '30', "Testing: Retry-After should be when the next token arrives.")
+        response = self.client.post('/api/courses/lookup/', {'courses': [['COMPSCI', 1]]}, format='json',
+                                    **self.staff_headers)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS, "Testing: Lookups should charge the read budget.")
+        response = self.client.delete('/api/courses/BIOLOGY/2/delete/', **self.staff_headers)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT, "Testing: Writes should have their own budget.")
+        response = self.client.delete('/api/courses/COMPSCI/1/delete/', **self.staff_headers)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS, "Testing: The second write should be throttled.")
+        # Postcondition assertion
+        response = self.client.get('/api/courses/', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Postcondition: Other users should keep their own budget.")
+        self.assertTrue(Course.objects.filter(courseID=1).exists(), "Postcondition: The throttled delete should not run.")
+
+    @override_settings(COURSES_THROTTLE_RATES={'read': '0/min', 'write': '1/min'},
+                       COURSES_THROTTLE_STORE='api.throttling.CacheBucketStore')
+    async def test_rate_limit_zero_rate_and_async_cache_store(self):
+        """
+        Test a zero rate blocks its scope with a one-period Retry-After, also in the async views with the cache store.
+        """
+        await sync_to_async(cache.clear)()
+        # Precondition assertion
+        self.assertTrue(throttling.get_store().blocking, "Precondition: The cache store is used.")
+        # Testing assertion
+        response = await sync_to_async(self.client.get)('/api/courses/', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS, "Testing: A zero rate should block reads.")
+        self.assertEqual(response['Retry-After'], '60', "Testing: Retry-After should be one period.")
+        response = await self.async_client.get('/api/async/courses/', headers={'Authorization': 'bearer student'})
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS, "Testing: Async reads should be blocked too.")
+        self.assertEqual(response['Retry-After'], '60', "Testing: Async Retry-After should match.")
+        # Postcondition assertion
+        response = await self.async_client.delete('/api/async/courses/biology/2/delete/', headers={'Authorization': 'bearer staff'})
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT, "Postcondition: Writes keep their own budget.")
+
+    def test_local_bucket_store_evicts_least_recently_used(self):
+        """
+        Test the in-memory bucket store stays bounded by dropping the least recently used bucket.
+        """
+        store = throttling.LocalBucketStore()
+        store.max_buckets = 2
+        # Precondition assertion
+        self.assertEqual(store.take('a', 1, 1 / 60), 0.0, "Precondition: A new bucket starts full.")
+        self.assertEqual(store.take('b', 1, 1 / 60), 0.0, "Precondition: A second bucket starts full.")
+        # Testing assertion
+        self.assertGreater(store.take('a', 1, 1 / 60), 0, "Testing: The used bucket is empty and becomes most recent.")
+        store.take('c', 1, 1 / 60)
+        self.assertEqual(list(store._buckets), ['a', 'c'], "Testing: The least recently used bucket should be dropped.")
+        # Postcondition assertion
+        self.assertGreater(store.take('a', 1, 1 / 60), 0, "Postcondition: Recently used buckets keep their state.")
+
+    def test_create_course_invalidates_cache(self):
+        """
+        Test creating a course invalidates cached listings and their ETag.
+        """
+        # Precondition assertion
+        response = self.client.get('/api/courses/', **self.student_headers)
+        self.assertEqual(len(response.json()), 2, "Precondition: Cached listing holds 2 courses.")
+        etag = response['ETag']
+        # Testing assertion
+        new_course = {
+            "courseID": 999, "courseSubject": "MATH", "title": "Calculus", "instructor": "Taylor",
+            "credits": 4, "schedule": "MWF 9:00-9:50", "room": "MATH101",
+            "requirements": "None", "description": "Intro to Calculus", "instruction_mode": "In Person"
+        }
+        self.client.post('/api/courses/create/', new_course, format='json', **self.staff_headers)
+        response = self.client.get('/api/courses/', HTTP_IF_NONE_MATCH=etag, **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: Stale ETag should not match.")
+        self.assertEqual(len(response.json()), 3, "Testing: Listing should include the new course.")
+        # Postcondition assertion
+        self.assertNotEqual(response['ETag'], etag, "Postcondition: ETag should change after a write.")
+
+    def test_bulk_import_jsonl(self):
+        """
+        Test bulk importing JSON Lines reports bad rows and imports the rest.
+        """
+        # Precondition assertion
+        self.assertEqual(Course.objects.count(), 2, "Precondition: 2 courses exist.")
+        rows = [
+            {"courseID": 10, "courseSubject": "MATH", "title": "Algebra", "instructor": "Taylor", "credits": 3,
+             "schedule": "MWF 9:00-9:50", "room": "M1", "requirements": "None", "description": "Basics", "instruction_mode": "Online"},
+            {"courseID": 11, "courseSubject": "MATH", "title": "Geometry"},
+            {"courseID": 1, "courseSubject": "COMPSCI", "title": "Duplicate", "instructor": "Smith", "credits": 3,
+             "schedule": "MWF 10:00-10:50", "room": "CS101", "requirements": "None", "description": "Basics", "instruction_mode": "In Person"},
+        ]
+        body = "\n".join(json.dumps(row) for row in rows) + "\nnot json\n"
+        # Testing assertion
+        response = self.client.post('/api/courses/bulk/', body, content_type='application/x-ndjson', **self.staff_headers)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, "Testing: Should return 201 Created.")
+        self.assertEqual(response.data['created'], 1, "Testing: One valid row should be imported.")
+        self.assertEqual([error['line'] for error in response.data['errors']], [2, 3, 4],
+                         "Testing: Invalid, duplicate and unparsable lines should be reported.")
+        # Postcondition assertion
+        self.assertEqual(Course.objects.count(), 3, "Postcondition: Should have 3 courses after import.")
+        self.assertTrue(DiscussionOutbox.objects.filter(course_id=10).exists(),
+                        "Postcondition: Discussion creation should be queued for the imported course.")
+
+    @override_settings(COURSES_IMPORT_BATCH_SIZE=2)
+    def test_bulk_import_undecodable_line_after_first_batch(self):
+        """
+        Test a line that is not UTF-8 after the first committed batch is reported per line.
+        """
+        # Precondition assertion
+        response = self.client.get('/api/courses/', **self.student_headers)
+        self.assertEqual(len(response.json()), 2, "Precondition: Cached listing holds 2 courses.")
+        etag = response['ETag']
+        rows = [json.dumps({"courseID": course_id, "courseSubject": "MATH", "title": f"Math {course_id}",
+                            "instructor": "Taylor", "credits": 3, "schedule": "MWF 9:00-9:50", "room": "M1",
+                            "requirements": "None", "description": "Basics", "instruction_mode": "Online"}).encode()
+                for course_id in (20, 21, 22)]
+        body = b"\n".join([rows[0], rows[1], b'{"title": "caf\xe9"}', rows[2]]) + b"\n"
+        # Testing assertion
+        with patch('api.outbox.wake_dispatcher') as wake:
+            response = self.client.post('/api/courses/bulk/', body, content_type='application/x-ndjson', **self.staff_headers)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, "Testing: Should return 201 Created.")
+        self.assertEqual(response.data['created'], 3, "Testing: Every decodable row should be imported.")
+        self.assertEqual(response.data['errors'], [{'line': 3, 'errors': {'non_field_errors': ["Line is not valid UTF-8"]}}],
+                         "Testing: The undecodable line should be reported.")
+        wake.assert_called_once()
+        # Postcondition assertion
+        response = self.client.get('/api/courses/', HTTP_IF_NONE_MATCH=etag, **self.student_headers)
+        self.assertEqual(len(response.json()), 5, "Postcondition: Listings should include the imported courses.")
+
+    def test_bulk_import_requires_staff(self):
+        """
+        Test students cannot bulk import courses.
+        """
+        # Precondition assertion
+        self.assertEqual(Course.objects.count(), 2, "Precondition: 2 courses exist.")
+        # Testing assertion
+        response = self.client.post('/api/courses/bulk/', '', content_type='text/csv', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN, "Testing: Should return 403 Forbidden.")
+        # Postcondition assertion
+        self.assertEqual(Course.objects.count(), 2, "Postcondition: No courses should be changed.")
+
+    def test_import_courses_command_csv(self):
+        """
+        Test the import_courses management command with a CSV file.
+        """
+        # Precondition assertion
+        self.assertEqual(Course.objects.count(), 2, "Precondition: 2 courses exist.")
+        header = "courseID,courseSubject,title,instructor,credits,schedule,room,requirements,description,instruction_mode\n"
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write(header)
+            for course_id in range(100, 105):
+                f.write(f"{course_id},HIST,History {course_id},Adams,3,TuTh 1:00-2:15,H1,None,Survey,In Person\n")
+        # Testing assertion
+        out = io.StringIO()
+        call_command('import_courses', f.name, '--batch-size', '2', stdout=out)
+        self.assertIn("Created 5 courses", out.getvalue(), "Testing: Command should report 5 created courses.")
+        # Postcondition assertion
+        self.assertEqual(Course.objects.filter(courseSubject="HIST").count(), 5, "Postcondition: 5 HIST courses exist.")
+
+    def test_export_courses_json_stream(self):
+        """
+        Test the streaming JSON export matches the regular listing.
+        """
+        # Precondition assertion
+        listing = self.client.get('/api/courses/', **self.student_headers).json()
+        self.assertEqual(len(listing), 2, "Precondition: 2 courses exist.")
+        # Testing assertion
+        response = self.client.get('/api/courses/export/', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: Should return 200 OK.")
+        self.assertTrue(response.streaming, "Testing: Export should be streamed.")
+        exported = json.loads(b''.join(response.streaming_content))
+        # Postcondition assertion
+        self.assertEqual(exported, json.loads(json.dumps(listing)), "Postcondition: Export should match the listing.")
+
+    async def test_export_courses_stream_under_asgi(self):
+        """
+        Test that ASGI requests get the export as an async stream.
+        """
+        # Precondition assertion
+        expected = await sync_to_async(lambda: b''.join(
+            self.client.get('/api/courses/export/?format=ndjson', **self.student_headers).streaming_content))()
+        self.assertEqual(len(expected.splitlines()), 2, "Precondition: 2 courses are exported.")
+        # Testing assertion
+        response = await self.async_client.get('/api/courses/export/', {'format': 'ndjson'},
+                                               headers={'Authorization': 'bearer student'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: Should return 200 OK.")
+        self.assertTrue(response.is_async, "Testing: Django should not buffer the export.")
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        # Postcondition assertion
+        self.assertEqual(body, expected, "Postcondition: ASGI and WSGI exports match.")
+
+    def test_export_courses_ndjson(self):
+        """
+        Test NDJSON export through both the export endpoint and getCourses.
+        """
+        # Precondition assertion
+        self.assertEqual(Course.objects.count(), 2, "Precondition: 2 courses exist.")
+        # Testing assertion
+        for url in ('/api/courses/export/?format=ndjson', '/api/courses/?format=ndjson&courseSubject=BIO'):
+            response = self.client.get(url, **self.student_headers)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: Should return 200 OK.")
+            self.assertEqual(response['Content-Type'], 'application/x-ndjson', "Testing: Should be NDJSON.")
+            lines = b''.join(response.streaming_content).decode().splitlines()
+            self.assertEqual(json.loads(lines[0])['courseSubject'], 'BIOLOGY', "Testing: Rows should be ordered.")
+        self.assertEqual(len(lines), 1, "Testing: Filters should apply to the stream.")
+        response = self.client.get('/api/courses/export/?format=ndjson&fields=courseSubject', **self.student_headers)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        # Postcondition assertion
+        self.assertEqual([json.loads(line) for line in lines], [{'courseSubject': 'BIOLOGY'}, {'courseSubject': 'COMPSCI'}],
+                         "Postcondition: Export should honour ?fields=.")
+
+    async def test_async_list_courses(self):
+        """
+        Test the async listing returns the same data as the DRF view.
+        """
+        # Precondition assertion
+        expected = await sync_to_async(lambda: self.client.get('/api/courses/?limit=1', **self.student_headers).data)()
+        self.assertEqual(len(expected['results']), 1, "Precondition: Sync listing returns one course per page.")
+        await sync_to_async(cache.clear)()
+        # Testing assertion
+        response = await self.async_client.get('/api/async/courses/', {'limit': 1}, headers={'Authorization': 'bearer student'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: Should return 200 OK.")
+        # Postcondition assertion
+        self.assertEqual(response.json(), json.loads(json.dumps(expected)), "Postcondition: Async and sync listings match.")
+
+    async def test_async_create_and_delete_course(self):
+        """
+        Test creating and deleting a course through the async views (STAFF only).
+        """
+        # Precondition assertion
+        self.assertEqual(await Course.objects.acount(), 2, "Precondition: 2 courses exist.")
+        new_course = {
+            "courseID": 999, "courseSubject": "MATH", "title": "Calculus", "instructor": "Taylor",
+            "credits": 4, "schedule": "MWF 9:00-9:50", "room": "MATH101",
+            "requirements": "None", "description": "Intro to Calculus", "instruction_mode": "In Person"
+        }
+        # Testing assertion
+        response = await self.async_client.post('/api/async/courses/create/', new_course, content_type='application/json',
+                                                headers={'Authorization': 'bearer student'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN, "Testing: Students cannot create courses.")
+        response = await self.async_client.post('/api/async/courses/create/', new_course, content_type='application/json',
+                                                headers={'Authorization': 'bearer staff'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, "Testing: Should return 201 Created.")
+        self.assertEqual(await Course.objects.acount(), 3, "Testing: Should have 3 courses after creation.")
+        response = await self.async_client.delete('/api/async/courses/math/999/delete/', headers={'Authorization': 'bearer staff'})
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT, "Testing: Should return 204 No Content.")
+        # Postcondition assertion
+        self.assertEqual(await Course.objects.acount(), 2, "Postcondition: Should have 2 courses after deletion.")
+        self.assertEqual(await DiscussionOutbox.objects.filter(course_id=999).acount(), 2,
+                         "Postcondition: Create and delete should both be queued in the outbox.")
+
+    def test_create_course(self):
         """
         Test creating a course (STAFF only).
         """
@@ -167,10 +922,11 @@ class CourseAPITestCase(TestCase):
         # Postcondition assertion
         created = Course.objects.get(title="Calculus")
         self.assertEqual(created.instructor, "Taylor", "Postcondition: Instructor should be Taylor.")
-        mock_post.assert_called()
+        self.assertTrue(
+            DiscussionOutbox.objects.filter(action=DiscussionOutbox.ACTION_CREATE, course_id=999).exists(),
+            "Postcondition: Discussion creation should be queued in the outbox.")
 
-    @patch('api.views.requests.delete')
-    def test_delete_course(self, mock_delete):
+    def test_delete_course(self):
         """
         Test deleting a course (STAFF only).
         """
@@ -184,7 +940,178 @@ class CourseAPITestCase(TestCase):
         # Postcondition assertion
         with self.assertRaises(Course.DoesNotExist):
             Course.objects.get(courseID=self.course1.courseID)
-        mock_delete.assert_called()
+        self.assertTrue(
+            DiscussionOutbox.objects.filter(action=DiscussionOutbox.ACTION_DELETE, course_id=self.course1.courseID).exists(),
+            "Postcondition: Discussion deletion should be queued in the outbox.")
+
+    def test_patch_course_with_if_match(self):
+        """
+        Test a conditional PATCH writes only the change, bumps the version and skips the discussions service.
+        """
+        url = '/api/courses/compsci/1/'
+        response = self.client.get(url, **self.student_headers)
+        # Precondition assertion
+        self.assertEqual(response['ETag'], '"1"', "Precondition: A new course is at version 1.")
+        # Testing assertion
+        response = self.client.patch(url, {'credits': 4}, format='json', HTTP_IF_MATCH='"1"', **self.admin_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: Should return 200 OK.")
+        self.assertEqual((response.data['credits'], response.data['version']), (4, 2), "Testing: Credits and version should change.")
+        self.assertEqual(response['ETag'], '"2"', "Testing: ETag should follow the version.")
+        response = self.client.patch(url, {'credits': 5}, format='json', HTTP_IF_MATCH='"1"', **self.admin_headers)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED, "Testing: A stale ETag should be rejected.")
+        response = self.client.patch(url, {'credits': 5}, format='json', **self.admin_headers)
+        self.assertEqual(response.status_code, status.HTTP_428_PRECONDITION_REQUIRED, "Testing: A precondition is required.")
+        # Postcondition assertion
+        self.course1.refresh_from_db()
+        self.assertEqual((self.course1.credits, self.course1.version), (4, 2), "Postcondition: Only the first update applied.")
+        self.assertFalse(DiscussionOutbox.objects.filter(action=DiscussionOutbox.ACTION_UPDATE).exists(),
+                         "Postcondition: A credits change should not touch the discussion thread.")
+
+    def test_put_course_owner_only_and_retitles_thread(self):
+        """
+        Test that only the owner (or an admin) may update, and a title change queues a thread update.
+        """
+        Course.objects.filter(pk=1).update(creator_id=2)
+        data = {'courseSubject': 'COMPSCI', 'courseID': 1, 'title': 'Intro to Computing', 'instructor': 'Smith',
+                'credits': 3, 'schedule': 'MWF 10:00-10:50', 'room': 'CS101', 'requirements': 'None',
+                'description': 'Basics', 'instruction_mode': 'In Person', 'version': 1}
+        # Precondition assertion
+        response = self.client.put('/api/courses/COMPSCI/1/', data, format='json', **self.other_staff_headers)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN, "Precondition: Staff who do not own the course cannot update.")
+        response = self.client.put('/api/courses/COMPSCI/1/', data, format='json', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN, "Precondition: Students cannot update.")
+        # Testing assertion
+        response = self.client.put('/api/courses/COMPSCI/1/', data, format='json', **self.staff_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: The owner can update.")
+        self.assertEqual(response.data['title'], 'Intro to Computing', "Testing: Title should change.")
+        # Postcondition assertion
+        entry = DiscussionOutbox.objects.get(action=DiscussionOutbox.ACTION_UPDATE)
+        self.assertEqual((entry.course_subject, entry.course_id), ('COMPSCI', 1), "Postcondition: Thread is addressed by its key.")
+        self.assertEqual(entry.payload['title'], 'Discussion for Intro to Computing', "Postcondition: Thread gets the new title.")
+        self.assertEqual(self.client.get('/api/courses/?q=computing', **self.student_headers).data[0]['courseID'], 1,
+                         "Postcondition: The search index should follow the new title.")
+
+    def test_course_changes_feed(self):
+        """
+        Test the change log records creates, updates and deletes and pages by seq.
+        """
+        # Precondition assertion
+        response = self.client.get('/api/courses/changes/', **self.student_headers)
+        self.assertEqual(response.data, {'changes': [], 'next_since': 0}, "Precondition: The log starts empty.")
+        # Testing assertion
+        self.client.patch('/api/courses/COMPSCI/1/', {'title': 'Intro to Computing', 'version': 1}, format='json',
+                          **self.admin_headers)
+        self.client.patch('/api/courses/COMPSCI/1/', {'courseID': 5, 'version': 2}, format='json', **self.admin_headers)
+        self.client.delete('/api/courses/BIOLOGY/2/delete/', **self.staff_headers)
+        response = self.client.get('/api/courses/changes/?since=0&limit=2', **self.student_headers)
+        self.assertEqual([(change['action'], change['courseID']) for change in response.data['changes']],
+                         [('update', 1), ('delete', 1)], "Testing: Changes should come back oldest first.")
+        self.assertEqual(response.data['changes'][0]['course']['title'], 'Intro to Computing',
+                         "Testing: Updates should carry the new course.")
+        response = self.client.get(f"/api/courses/changes/?since={response.data['next_since']}", **self.student_headers)
+        self.assertEqual([(change['action'], change['courseID']) for change in response.data['changes']],
+                         [('create', 5), ('delete', 2)], "Testing: A key change is logged as delete and create.")
+        next_since = response.data['next_since']
+        start = time.monotonic()
+        response = self.client.get(f'/api/courses/changes/?since={next_since}&wait=0.1', **self.student_headers)
+        self.assertEqual(response.data['changes'], [], "Testing: A long poll with no changes should time out empty.")
+        self.assertGreaterEqual(time.monotonic() - start, 0.1, "Testing: The long poll should wait.")
+        with override_settings(COURSES_CHANGES_SSE_MAX_DURATION=0.1, COURSES_CHANGES_SSE_HEARTBEAT=0.05):
+            response = self.client.get('/api/courses/changes/', HTTP_ACCEPT='text/event-stream',
+                                       HTTP_LAST_EVENT_ID=str(next_since - 1), **self.student_headers)
+            body = b''.join(response.streaming_content).decode()
+        # Postcondition assertion
+        self.assertEqual(response['Content-Type'], 'text/event-stream', "Postcondition: Should stream events.")
+        self.assertIn(f'id: {next_since}\nevent: delete\n', body, "Postcondition: Should resume after Last-Event-ID.")
+        self.assertEqual(body.count('id: '), 1, "Postcondition: Earlier changes should not be resent.")
+
+    @override_settings(COURSES_CHANGES_MAX_WAITERS=1, COURSES_CHANGES_SSE_MAX_DURATION=0.2,
+                       COURSES_CHANGES_SSE_HEARTBEAT=0.05)
+    async def test_course_changes_stream_under_asgi(self):
+        """
+        Test that ASGI requests get an async event stream that frees its slot when done.
+        """
+        await sync_to_async(self.client.delete)('/api/courses/BIOLOGY/2/delete/', **self.staff_headers)
+        # Precondition assertion
+        self.assertTrue(changes.acquire_waiter(), "Precondition: The only slot is free.")
+        changes.release_waiter()
+        # Testing assertion
+        response = await self.async_client.get('/api/courses/changes/', headers={'Accept': 'text/event-stream',
+                                                                                 'Authorization': 'bearer student'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: Should return 200 OK.")
+        self.assertTrue(response.is_async, "Testing: Django should not buffer the stream.")
+        body = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        self.assertIn('event: delete\n', body, "Testing: Changes should be streamed.")
+        self.assertIn(': keep-alive\n\n', body, "Testing: An idle stream should send keep-alives.")
+        # Postcondition assertion
+        self.assertTrue(changes.acquire_waiter(), "Postcondition: The finished stream frees its slot.")
+        changes.release_waiter()
+
+    @override_settings(COURSES_CHANGES_MAX_WAITERS=1)
+    def test_course_changes_caps_waiting_clients(self):
+        """
+        Test long-poll and SSE readers beyond the per-process cap get 503 with Retry-After.
+        """
+        stream = self.client.get('/api/courses/changes/', HTTP_ACCEPT='text/event-stream', **self.student_headers)
+        # Precondition assertion
+        self.assertEqual(stream.status_code, status.HTTP_200_OK, "Precondition: The first stream holds the only slot.")
+        # Testing assertion
+        response = self.client.get('/api/courses/changes/?wait=5', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE, "Testing: A second waiter is refused.")
+        self.assertEqual(response['Retry-After'], '1', "Testing: The refusal should say when to retry.")
+        response = self.client.get('/api/courses/changes/', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: Reads that do not wait are not capped.")
+        self.assertEqual(next(stream.streaming_content), b'retry: 1000\n\n', "Testing: The stream should start.")
+        stream.close()
+        # Postcondition assertion
+        response = self.client.get('/api/courses/changes/?wait=0.01', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Postcondition: Closing the stream frees its slot.")
+        response = self.client.get('/api/courses/changes/?wait=0.01', **self.student_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Postcondition: A finished long poll frees its slot.")
+
+    def test_request_metrics_and_server_timing(self):
+        """
+        Test that requests are timed into /metrics and carry a Server-Timing header.
+        """
+        metrics.registry.clear()
+        # Precondition assertion
+        self.assertNotIn('view="getCourses"', self.client.get('/metrics').content.decode(),
+                         "Precondition: No getCourses samples recorded yet.")
+        # Testing assertion
+        response = self.client.get('/api/courses/', **self.student_headers)
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="[1-9]\d* queries"',
+                         "Testing: Server-Timing should report the database queries.")
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, "Testing: Should return 200 OK.")
+        body = response.content.decode()
+        # Postcondition assertion
+        self.assertIn('courses_request_duration_seconds_count{method="GET",view="getCourses"} 1', body,
+                      "Postcondition: The request should be counted once.")
+        self.assertIn('courses_requests_total{method="GET",status="200",view="getCourses"} 1', body,
+                      "Postcondition: The status should be counted.")
+        self.assertIn('courses_response_size_bytes_bucket{view="getCourses",le="+Inf"} 1', body,
+                      "Postcondition: The response size should be recorded.")
+
+    def test_metrics_bounded_labels_and_allowed_networks(self):
+        """
+        Test arbitrary request methods share one label and /metrics is limited to allowed networks.
+        """
+        metrics.registry.clear()
+        # Precondition assertion
+        for address in ('203.0.113.5', '10.0.0.8', '192.168.1.20', 'fd00::1'):
+            self.assertEqual(self.client.get('/metrics', REMOTE_ADDR=address).status_code, status.HTTP_403_FORBIDDEN,
+                             f"Precondition: {address} (public or behind a proxy) should not read /metrics by default.")
+        # Testing assertion
+        for verb in ('BREW', 'PROPFIND'):
+            self.client.generic(verb, '/api/courses/', **self.student_headers)
+        body = self.client.get('/metrics').content.decode()
+        self.assertIn('courses_requests_total{method="other",status="405",view="getCourses"} 2', body,
+                      "Testing: Unknown methods should share the \"other\" label.")
+        self.assertNotIn('BREW', body, "Testing: Client-supplied methods should not become labels.")
+        # Postcondition assertion
+        with override_settings(METRICS_ALLOWED_NETWORKS=None):
+            self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='203.0.113.5').status_code, status.HTTP_200_OK,
+                             "Postcondition: None should allow every client.")
 
     def test_api_routing(self):
         """
@@ -192,4 +1119,439 @@ class CourseAPITestCase(TestCase):
         """
         response = self.client.get('/api/test-routing/')
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.data.get('message'), 'API routing works')
\ No newline at end of file
+        self.assertEqual(response.data.get('message'), 'API routing works')
+
+
+class StubDiscussionsServer:
+    """
+    Minimal local HTTP server standing in for the discussions service.
+    Records every request and answers with the next queued status code (200 by default).
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.statuses = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _handle(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                stub.requests.append((self.command, self.path, body))
+                self.send_response(stub.statuses.pop(0) if stub.statuses else 200)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            do_POST = do_PATCH = do_DELETE = _handle
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}/api/discussions/"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class DiscussionOutboxTestCase(TestCase):
+    """
+    Unit tests for delivering queued discussion side effects to a stub discussions service.
+    """
+
+    def setUp(self):
+        # Give every test a fresh discussions client (and circuit breaker)
+        self.client_patcher = patch('api.discussions._client', DiscussionsClient())
+        self.client_patcher.start()
+        self.course = Course.objects.create(
+            courseID=1,
+            courseSubject="COMPSCI", title="Intro to CS", instructor="Smith",
+            credits=3, schedule="MWF 10:00-10:50", room="CS101",
+            requirements="", description="Basics", instruction_mode="In Person"
+        )
+
+    def tearDown(self):
+        self.client_patcher.stop()
+
+    def test_dispatch_create_update_and_delete(self):
+        """
+        Test queued create, update and delete calls are delivered in order.
+        """
+        enqueue_discussion_create(self.course)
+        enqueue_discussion_update('COMPSCI', 1, self.course)
+        enqueue_discussion_delete(self.course)
+        # Precondition assertion
+        self.assertEqual(DiscussionOutbox.objects.filter(status=DiscussionOutbox.STATUS_PENDING).count(), 3,
+                         "Precondition: 3 pending outbox entries.")
+        with StubDiscussionsServer() as stub, override_settings(DISCUSSIONS_API_BASE_URL=stub.base_url):
+            # Testing assertion
+            self.assertEqual(OutboxDispatcher().run_once(), 1, "Testing: Only the oldest entry per course is claimed.")
+            self.assertEqual(OutboxDispatcher().run_once(), 1, "Testing: The update is delivered next.")
+            self.assertEqual(OutboxDispatcher().run_once(), 1, "Testing: The delete is delivered last.")
+        methods = [(method, path) for method, path, _ in stub.requests]
+        self.assertEqual(methods, [('POST', '/api/discussions/course-discussions/'),
+                                   ('PATCH', '/api/discussions/course-discussions/COMPSCI/1/'),
+                                   ('DELETE', '/api/discussions/course-discussions/COMPSCI/1/')],
+                         "Testing: Calls must reach the service in the order they were queued.")
+        self.assertEqual(stub.requests[0][2]['course_subject'], 'COMPSCI', "Testing: Payload should be sent.")
+        # Postcondition assertion
+        self.assertEqual(DiscussionOutbox.objects.filter(status=DiscussionOutbox.STATUS_DELIVERED).count(), 3,
+                         "Postcondition: All entries delivered.")
+
+    @override_settings(DISCUSSIONS_OUTBOX_MAX_ATTEMPTS=2)
+    def test_dispatch_retries_with_backoff(self):
+        """
+        Test server errors are retried with backoff and give up after the maximum attempts.
+        """
+        entry = enqueue_discussion_create(self.course)
+        with StubDiscussionsServer() as stub, override_settings(DISCUSSIONS_API_BASE_URL=stub.base_url):
+            stub.statuses = [503, 503]
+            # Precondition assertion
+            self.assertEqual(OutboxDispatcher().run_once(), 1, "Precondition: Entry is attempted once.")
+            entry.refresh_from_db()
+            self.assertEqual(entry.status, DiscussionOutbox.STATUS_PENDING, "Precondition: Entry stays pending.")
+            self.assertGreater(entry.next_attempt_at, timezone.now(), "Precondition: Retry is scheduled later.")
+            # Testing assertion
+            self.assertEqual(OutboxDispatcher().run_once(), 0, "Testing: Entry is not retried before its backoff.")
+            DiscussionOutbox.objects.filter(pk=entry.pk).update(next_attempt_at=timezone.now())
+            self.assertEqual(OutboxDispatcher().run_once(), 1, "Testing: Entry is retried once due.")
+        # Postcondition assertion
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, DiscussionOutbox.STATUS_FAILED, "Postcondition: Entry fails after max attempts.")
+        self.assertEqual(entry.attempts, 2, "Postcondition: Two attempts were made.")
+        self.assertEqual(len(stub.requests), 2, "Postcondition: Stub saw two requests.")
+
+
+    def test_claim_skips_backed_off_entries(self):
+        """
+        Test entries backing off do not crowd out newer due entries, and never let a course's later entry overtake.
+        """
+        later = timezone.now() + timezone.timedelta(hours=1)
+        for course_id in range(100, 110):
+            DiscussionOutbox.objects.create(action=DiscussionOutbox.ACTION_CREATE, course_subject='HIST',
+                                            course_id=course_id, next_attempt_at=later)
+        blocked = DiscussionOutbox.objects.create(action=DiscussionOutbox.ACTION_DELETE, course_subject='HIST', course_id=100)
+        due = enqueue_discussion_create(self.course)
+        # Precondition assertion
+        self.assertEqual(DiscussionOutbox.objects.filter(status=DiscussionOutbox.STATUS_PENDING).count(), 12,
+                         "Precondition: 10 backing-off entries, then 2 due ones.")
+        # Testing assertion
+        claimed = OutboxDispatcher(batch_size=2).claim()
+        # Postcondition assertion
+        self.assertEqual([entry.pk for entry in claimed], [due.pk],
+                         "Postcondition: The due entry is claimed; the delete waits for its course's older create.")
+        self.assertNotIn(blocked.pk, [entry.pk for entry in claimed], "Postcondition: Per-course order is kept.")
+
+    def test_claim_keeps_rename_before_delete(self):
+        """
+        Test a delete queued under a course's new key waits for the pending update that renamed it.
+        """
+        renamed = Course(courseID=7, courseSubject='COMPSCI', title=self.course.title)
+        rename = enqueue_discussion_update(self.course.courseSubject, self.course.courseID, renamed)
+        DiscussionOutbox.objects.filter(pk=rename.pk).update(next_attempt_at=timezone.now() + timezone.timedelta(hours=1))
+        delete = enqueue_discussion_delete(renamed)
+        # Precondition assertion
+        self.assertEqual((rename.course_id, delete.course_id), (1, 7), "Precondition: The two entries use different keys.")
+        # Testing assertion
+        claimed = OutboxDispatcher().claim()
+        self.assertEqual(claimed, [], "Testing: The delete must not overtake the backing-off rename.")
+        DiscussionOutbox.objects.filter(pk=rename.pk).update(status=DiscussionOutbox.STATUS_DELIVERED)
+        # Postcondition assertion
+        self.assertEqual([entry.pk for entry in OutboxDispatcher().claim()], [delete.pk],
+                         "Postcondition: The delete is claimed once the rename is delivered.")
+
+    def test_open_circuit_defers_without_using_attempts(self):
+        """
+        Test entries rejected by an open circuit breaker are rescheduled without counting an attempt.
+        """
+        first = enqueue_discussion_create(self.course)
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+        with StubDiscussionsServer() as stub, override_settings(DISCUSSIONS_API_BASE_URL=stub.base_url), \
+                patch('api.discussions._client', DiscussionsClient(breaker=breaker)):
+            stub.statuses = [503]
+            # Precondition assertion
+            self.assertEqual(OutboxDispatcher().run_once(), 1, "Precondition: The failing call opens the circuit.")
+            first.refresh_from_db()
+            self.assertEqual(first.attempts, 1, "Precondition: The failed call counts as an attempt.")
+            # Testing assertion
+            DiscussionOutbox.objects.filter(pk=first.pk).update(next_attempt_at=timezone.now())
+            self.assertEqual(OutboxDispatcher().run_once(), 1, "Testing: The entry is claimed again.")
+        self.assertEqual(len(stub.requests), 1, "Testing: The open circuit should not reach the service.")
+        # Postcondition assertion
+        first.refresh_from_db()
+        self.assertEqual((first.status, first.attempts), (DiscussionOutbox.STATUS_PENDING, 1),
+                         "Postcondition: The deferred call should not use up an attempt.")
+        self.assertGreater(first.next_attempt_at, timezone.now(), "Postcondition: Retry waits for the breaker.")
+
+class DiscussionsClientTestCase(TestCase):
+    """
+    Unit tests for the pooled discussions client and its circuit breaker.
+    """
+
+    def test_circuit_breaker_states(self):
+        """
+        Test the breaker opens after repeated failures and recovers through a half-open trial.
+        """
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+        # Precondition assertion
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED, "Precondition: Breaker starts closed.")
+        # Testing assertion
+        breaker.record_failure()
+        self.assertTrue(breaker.allow(), "Testing: One failure keeps the circuit closed.")
+        breaker.record_failure()
+        self.assertFalse(breaker.allow(), "Testing: Threshold failures open the circuit.")
+        now[0] = 10.0
+        self.assertTrue(breaker.allow(), "Testing: A trial call is allowed after the reset timeout.")
+        self.assertFalse(breaker.allow(), "Testing: Only one trial call at a time.")
+        breaker.record_success()
+        # Postcondition assertion
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED, "Postcondition: Successful trial closes the circuit.")
+
+    @override_settings(DISCUSSIONS_BREAKER_FAILURE_THRESHOLD=2)
+    def test_client_fails_fast_when_circuit_open(self):
+        """
+        Test the client stops calling a failing service and reports its counters.
+        """
+        client = DiscussionsClient()
+        with StubDiscussionsServer() as stub, override_settings(DISCUSSIONS_API_BASE_URL=stub.base_url):
+            stub.statuses = [503, 503]
+            # Precondition assertion
+            self.assertEqual(client.create_thread({}).status_code, 503, "Precondition: First call fails.")
+            self.assertEqual(client.delete_thread('COMPSCI', 1).status_code, 503, "Precondition: Second call fails.")
+            # Testing assertion
+            with self.assertRaises(CircuitOpenError):
+                client.create_thread({})
+        self.assertEqual(len(stub.requests), 2, "Testing: Open circuit should not reach the service.")
+        # Postcondition assertion
+        stats = client.stats()
+        self.assertEqual((stats['requests'], stats['errors'], stats['rejected']), (2, 2, 1),
+                         "Postcondition: Counters should record requests, errors and rejections.")
+        self.assertEqual(stats['circuit_state'], CircuitBreaker.OPEN, "Postcondition: Circuit should be open.")
+
+
+class ExternalJWTAuthenticationTestCase(TestCase):
+    """
+    Unit tests for JWT authentication and its verified-token cache.
+    """
+
+    def setUp(self):
+        self.backend = TokenBackend(algorithm='HS256', signing_key=settings.SECRET_KEY)
+        ExternalJWTAuthentication.token_cache.clear()
+
+    def request_with(self, token):
+        return RequestFactory().get('/api/courses/', HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_repeated_token_served_from_cache(self):
+        """
+        Test a token is verified once and then served from the cache.
+        """
+        token = self.backend.encode({'user_id': 7, 'role': 'STAFF', 'exp': int(time.time()) + 600})
+        auth = ExternalJWTAuthentication()
+        # Precondition assertion
+        self.assertEqual(auth.token_cache.stats()['size'], 0, "Precondition: Cache starts empty.")
+        # Testing assertion
+        with patch.object(auth.token_backend, 'decode', wraps=auth.token_backend.decode) as decode:
+            user, _ = auth.authenticate(self.request_with(token))
+            again, _ = ExternalJWTAuthentication().authenticate(self.request_with(token))
+        self.assertEqual((user.id, user.role), (7, 'STAFF'), "Testing: User should be decoded from the token.")
+        self.assertIs(again, user, "Testing: Second request should reuse the cached user.")
+        self.assertEqual(decode.call_count, 1, "Testing: Token should be verified only once.")
+        # Postcondition assertion
+        stats = auth.token_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1), "Postcondition: One hit and one miss recorded.")
+
+    async def test_sync_and_async_views_reject_tokens_alike(self):
+        """
+        Test the DRF and async views answer invalid and missing credentials with the same status.
+        """
+        expired = self.backend.encode({'user_id': 7, 'role': 'STAFF', 'exp': int(time.time()) - 600})
+        # Precondition assertion
+        self.assertFalse(ExternalJWTAuthentication.token_cache.stats()['size'], "Precondition: Cache starts empty.")
+        for headers in ({'Authorization': 'Bearer not-a-jwt'}, {'Authorization': f'Bearer {expired}'}, {}):
+            # Testing assertion
+            sync_response = await sync_to_async(self.client.get)('/api/courses/', headers=headers)
+            async_response = await self.async_client.get('/api/async/courses/', headers=headers)
+            self.assertEqual(sync_response.status_code, status.HTTP_403_FORBIDDEN, "Testing: DRF views answer 403.")
+            # Postcondition assertion
+            self.assertEqual(async_response.status_code, sync_response.status_code,
+                             f"Postcondition: Async views should match the DRF views for {headers}.")
+
+    def test_role_parsed_into_permission_bitmask(self):
+        """
+        Test the role claim is parsed into a bitmask once and the permission classes test only that.
+        """
+        request = Request(self.request_with('unused'))
+        # Precondition assertion
+        self.assertEqual(ExternalJWTUser(id=1, role='staff').roles, Role.STAFF, "Precondition: Roles parse case-insensitively.")
+        self.assertEqual(ExternalJWTUser(id=1, role='DEAN').roles, 0, "Precondition: Unknown roles grant nothing.")
+        # Testing assertion
+        checks = {'STUDENT': (True, False, False), 'STAFF': (True, True, False), 'ADMIN': (True, True, True),
+                  None: (False, False, False)}
+        for role, expected in checks.items():
+            request.user = ExternalJWTUser(id=1, role=role)
+            granted = tuple(permission().has_permission(request, None) for permission in (IsStudent, IsStaff, IsAdmin))
+            self.assertEqual(granted, expected, f"Testing: Role {role} should get {expected}.")
+        # Postcondition assertion
+        request.user = AnonymousUser()
+        self.assertFalse(IsStudent().has_permission(request, None), "Postcondition: Anonymous users are refused.")
+
+    def test_invalid_token_not_cached(self):
+        """
+        Test a token with a bad signature is rejected every time.
+        """
+        token = TokenBackend(algorithm='HS256', signing_key='wrong-key').encode({'user_id': 7})
+        # Precondition assertion
+        self.assertEqual(ExternalJWTAuthentication.token_cache.stats()['size'], 0, "Precondition: Cache starts empty.")
+        # Testing assertion
+        for _ in range(2):
+            with self.assertRaises(AuthenticationFailed):
+                ExternalJWTAuthentication().authenticate(self.request_with(token))
+        # Postcondition assertion
+        self.assertEqual(ExternalJWTAuthentication.token_cache.stats()['size'], 0, "Postcondition: Nothing cached.")
+
+    def test_token_cache_honours_exp_and_size(self):
+        """
+        Test cached entries expire at the token's exp and the cache stays bounded.
+        """
+        now = [1000.0]
+        token_cache = TokenCache(maxsize=2, ttl=300, clock=lambda: now[0])
+        token_cache.set('a', ('user-a', {}), exp=1010)
+        token_cache.set('b', ('user-b', {}))
+        # Precondition assertion
+        self.assertEqual(token_cache.get('a'), ('user-a', {}), "Precondition: Fresh entry is served.")
+        # Testing assertion
+        now[0] = 1010.0
+        self.assertIsNone(token_cache.get('a'), "Testing: Entry expires at the token's exp.")
+        token_cache.set('c', ('user-c', {}))
+        token_cache.set('d', ('user-d', {}))
+        self.assertIsNone(token_cache.get('b'), "Testing: Least recently used entry is evicted.")
+        # Postcondition assertion
+        self.assertEqual(token_cache.stats()['size'], 2, "Postcondition: Cache holds at most maxsize entries.")
+
+
+@skipUnless(connection.vendor == 'sqlite', "Query plans are checked against SQLite's EXPLAIN QUERY PLAN output.")
+class CourseQueryPlanTestCase(TestCase):
+    """
+    Check that the course filter paths are answered from their indexes,
+    so a query or index change cannot silently fall back to a full table scan.
+    """
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(f"USING INDEX {index_name}", plan, f"Query plan should use {index_name}:\n{plan}")
+
+    def test_subject_filter_uses_casefolded_index(self):
+        """
+        Test the courseSubject_prefix filter does a range scan on the Lower(courseSubject) index.
+        """
+        self.assertUsesIndex(_filter_courses({'courseSubject_prefix': 'Comp'}), 'base_course_subject_lower_idx')
+
+    def test_instructor_filter_uses_casefolded_index(self):
+        """
+        Test the instructor_prefix filter does a range scan on the Lower(instructor) index.
+        """
+        self.assertUsesIndex(_filter_courses({'instructor_prefix': 'smi'}), 'base_course_instr_lower_idx')
+
+    def test_ordering_uses_subject_id_index(self):
+        """
+        Test the default ordering and cursor pagination read the (courseSubject, courseID) index in order.
+        """
+        ordered = Course.objects.order_by('courseSubject', 'courseID')
+        plan = ordered.explain()
+        self.assertNotIn("TEMP B-TREE", plan, f"Ordering should not need a sort step:\n{plan}")
+        # Leading range condition used by cursor pagination
+        self.assertUsesIndex(ordered.filter(courseSubject__gte="COMPSCI"), 'base_course_courseSubject_courseID')
+
+
+
+@skipUnless(connection.vendor == 'sqlite', "SQLite connection settings")
+class SQLiteConnectionSettingsTestCase(TestCase):
+    """
+    Check that connections are opened with the busy timeout and write-lock
+    behaviour configured in settings.DATABASES.
+    """
+
+    def test_busy_timeout_and_immediate_transactions(self):
+        """
+        Test that writers wait for the lock and transactions take it up front.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA busy_timeout")
+            busy_timeout = cursor.fetchone()[0]
+        self.assertEqual(busy_timeout, int(settings.SQLITE_BUSY_TIMEOUT * 1000),
+                         "Testing: busy_timeout should match SQLITE_BUSY_TIMEOUT.")
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE', "Testing: Transactions should begin IMMEDIATE.")
+        # Postcondition assertion
+        self.assertTrue(connection.settings_dict['CONN_HEALTH_CHECKS'], "Postcondition: Reused connections are health-checked.")
+
+
+@skipUnless(connection.vendor == 'postgresql', "PostgreSQL-only code paths (run by the tox postgres environments).")
+class PostgresBackendTestCase(TestCase):
+    """
+    Check the code paths that only run on PostgreSQL: the GIN full-text index,
+    the advisory lock that orders change-log appends and the connection pool.
+    """
+
+    def setUp(self):
+        self.course = Course.objects.create(
+            courseID=1,
+            courseSubject="COMPSCI", title="Computer Networks", instructor="Smith",
+            credits=3, schedule="MWF 10:00-10:50", room="CS101",
+            requirements="", description="Routing and congestion control", instruction_mode="In Person"
+        )
+
+    def test_search_uses_gin_index(self):
+        """
+        Test full-text search is ranked by the tsvector document and answered from its GIN index.
+        """
+        # Precondition assertion
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT indexdef FROM pg_indexes WHERE indexname = 'base_course_search_idx'")
+            self.assertIn('USING gin', cursor.fetchone()[0], "Precondition: The search index should be a GIN index.")
+        # Testing assertion
+        self.assertEqual([course.courseID for course in search_courses(Course.objects.all(), 'networks')], [1],
+                         "Testing: Stemmed words should match.")
+        with transaction.atomic(), connection.cursor() as cursor:
+            # A one-row table is cheaper to scan; make the planner show whether the index applies
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = search_courses(Course.objects.all(), 'routing').explain()
+        # Postcondition assertion
+        self.assertIn('base_course_search_idx', plan, f"Postcondition: Search should use the GIN index:\n{plan}")
+
+    def test_change_log_append_holds_advisory_lock(self):
+        """
+        Test appending to the change log takes the transaction-level advisory lock until commit.
+        """
+        lock_query = ("SELECT count(*) FROM pg_locks WHERE locktype = 'advisory' "
+                      "AND pid = pg_backend_pid() AND objid = %s")
+        # Precondition assertion
+        with connection.cursor() as cursor:
+            cursor.execute(lock_query, [changes._POSTGRES_LOCK_KEY])
+            self.assertEqual(cursor.fetchone()[0], 0, "Precondition: No advisory lock is held.")
+        # Testing assertion
+        with transaction.atomic():
+            changes.record_created([self.course])
+            with connection.cursor() as cursor:
+                cursor.execute(lock_query, [changes._POSTGRES_LOCK_KEY])
+                self.assertEqual(cursor.fetchone()[0], 1, "Testing: The append should hold the advisory lock.")
+        # Postcondition assertion
+        self.assertEqual(CourseChange.objects.filter(courseID=1).count(), 1, "Postcondition: The change is logged.")
+
+    @skipUnless(getattr(settings, 'DB_POOL', False), "Connection pool enabled (tox -e postgres-pool).")
+    def test_connection_pool_configured(self):
+        """
+        Test COURSES_DB_POOL gives each process a psycopg pool instead of persistent connections.
+        """
+        # Precondition assertion
+        self.assertEqual(connection.settings_dict['CONN_MAX_AGE'], 0, "Precondition: The pool replaces persistent connections.")
+        # Testing assertion
+        connection.ensure_connection()
+        # Postcondition assertion
+        self.assertIsNotNone(connection.pool, "Postcondition: Connections should come from the pool.")
@@ -0,0 +1,109 @@
+"""
+Benchmarks of individual request-path components: JWT authentication,
+permission checks, rate limiting and listing serialization.
+"""
+import pytest
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from api.permissions import IsOwnerOrAdmin, IsStaff, IsStudent
+from api.throttling import CacheBucketStore, LocalBucketStore, ReadWriteThrottle
+from api.serializers import COURSE_FIELDS, CourseSerializer
+from base.models import Course
+from coursesService.authentication import ExternalJWTAuthentication
+
+pytestmark = pytest.mark.django_db
+
+BROWSE_FIELDS = ['courseSubject', 'courseID', 'title', 'instructor', 'credits', 'schedule']
+
+
+@pytest.fixture
+def auth_request(make_token):
+    request = RequestFactory().get('/api/courses/', HTTP_AUTHORIZATION=f"Bearer {make_token(1, 'STUDENT')}")
+    return Request(request)
+
+
+def _authenticate(request):
+    user, _ = ExternalJWTAuthentication().authenticate(request)
+    assert user.role == 'STUDENT'
+
+
+def test_jwt_authenticate_decode(benchmark, auth_request):
+    """Authentication with an empty token cache, i.e. a full signature check."""
+    def cold():
+        ExternalJWTAuthentication.token_cache.clear()
+        return (auth_request,), {}
+
+    benchmark.pedantic(_authenticate, setup=cold, rounds=200)
+
+
+def test_jwt_authenticate_cached(benchmark, auth_request):
+    """Authentication of a token that was verified before."""
+    benchmark.pedantic(_authenticate, args=(auth_request,), rounds=200)
+
+
+def _authorize(request):
+    # What a write view runs per request: authentication, then its role and object checks
+    user, _ = ExternalJWTAuthentication().authenticate(request)
+    request.user = user
+    assert IsStudent().has_permission(request, None)
+    assert not IsStaff().has_permission(request, None)
+    assert IsOwnerOrAdmin().has_object_permission(request, None, _OWNED)
+
+
+class _Owned:
+    creator_id = 1
+
+
+_OWNED = _Owned()
+
+
+def test_auth_and_permissions(benchmark, make_token):
+    """
+    Cached authentication plus the permission checks of a write view, 1000
+    requests per round (so milliseconds read as microseconds per request).
+    """
+    request = Request(RequestFactory().post('/api/courses/', HTTP_AUTHORIZATION=f"Bearer {make_token(1, 'STUDENT')}"))
+
+    def thousand_requests():
+        for _ in range(1000):
+            _authorize(request)
+
+    benchmark.pedantic(thousand_requests, rounds=50)
+
+
+@pytest.mark.parametrize('store', [LocalBucketStore, CacheBucketStore], ids=['local', 'cache'])
+def test_rate_limit_check(benchmark, settings, make_token, store):
+    """
+    The token-bucket check of one request, 1000 requests per round (so
+    milliseconds read as microseconds per request).
+    """
+    settings.COURSES_THROTTLE_STORE = f'{store.__module__}.{store.__name__}'
+    request = Request(RequestFactory().get('/api/courses/', HTTP_AUTHORIZATION=f"Bearer {make_token(1, 'STUDENT')}"))
+    request.user, _ = ExternalJWTAuthentication().authenticate(request)
+
+    def thousand_requests():
+        for _ in range(1000):
+            assert ReadWriteThrottle().allow_request(request, None)
+
+    benchmark.pedantic(thousand_requests, rounds=50)
+
+
+def _render_serializer():
+    courses = Course.objects.order_by('courseSubject', 'courseID')
+    return JSONRenderer().render(CourseSerializer(courses, many=True).data)
+
+
+def _render_values(fields):
+    courses = Course.objects.order_by('courseSubject', 'courseID')
+    return JSONRenderer().render(list(courses.values(*fields)))
+
+
+def test_serialize_listing_model_serializer(benchmark, catalog):
+    benchmark.pedantic(_render_serializer, rounds=5)
+
+
+@pytest.mark.parametrize('fields', [COURSE_FIELDS, BROWSE_FIELDS], ids=['all-fields', 'browse-fields'])
+def test_serialize_listing_values(benchmark, catalog, fields):
+    benchmark.pedantic(_render_values, args=(fields,), rounds=5)
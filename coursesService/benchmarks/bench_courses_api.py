@@ -0,0 +1,190 @@
+"""
+End-to-end benchmarks of the course endpoints through the Django test
+client, with real JWTs and a stubbed discussions service.
+"""
+import itertools
+
+import pytest
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.test import APIClient
+
+from api import discussions, snapshot
+from coursesService import compression
+from api.outbox import OutboxDispatcher
+from base.models import Course, DiscussionOutbox
+
+pytestmark = pytest.mark.django_db
+
+# getCourses query strings, one benchmark per combination
+FILTERS = {
+    'all': '',
+    'subject': 'courseSubject=compsci',
+    'courseID': 'courseID=500',
+    'title': 'title=networks',
+    'instructor': 'instructor=instructor 04',
+    'subject_prefix': 'courseSubject_prefix=comp',
+    'instructor_prefix': 'instructor_prefix=instructor 04',
+    'subject+instructor': 'courseSubject=math&instructor=instructor 1',
+    'subject+title': 'courseSubject=biology&title=genetics',
+    'search': 'q=algorithms',
+    'page': 'limit=50',
+    'page+subject': 'limit=50&courseSubject=physics',
+    'fields': 'fields=courseSubject,courseID,title,instructor,credits',
+    'days': 'days=TuTh&fields=courseSubject,courseID,title,schedule',
+    'days+time': 'days=MWF&starts_after=10:00&ends_before=14:00&fields=courseSubject,courseID,title,schedule',
+}
+
+_new_ids = itertools.count(10_000_000)
+
+
+@pytest.fixture
+def student_client(make_token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {make_token(1, 'STUDENT')}")
+    return client
+
+
+@pytest.fixture
+def staff_client(make_token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {make_token(2, 'STAFF')}")
+    return client
+
+
+@pytest.fixture
+def stubbed_discussions(settings, discussions_stub, monkeypatch):
+    settings.DISCUSSIONS_API_BASE_URL = discussions_stub
+    monkeypatch.setattr(discussions, '_client', discussions.DiscussionsClient())
+
+
+def _clear_listing_cache():
+    caches[settings.COURSES_CACHE_ALIAS].clear()
+    snapshot.clear()
+    return (), {}
+
+
+def _get(client, url):
+    response = client.get(url)
+    assert response.status_code == 200, response.content
+    return response
+
+
+@pytest.mark.parametrize('query', FILTERS.values(), ids=FILTERS.keys())
+def test_get_courses_uncached(benchmark, catalog, student_client, query):
+    benchmark.pedantic(lambda: _get(student_client, f'/api/courses/?{query}'), setup=_clear_listing_cache)
+
+
+@pytest.mark.parametrize('query', ['', 'courseSubject=compsci', 'limit=50'], ids=['all', 'subject', 'page'])
+def test_get_courses_cached(benchmark, catalog, student_client, query):
+    _clear_listing_cache()
+    _get(student_client, f'/api/courses/?{query}')
+    benchmark(_get, student_client, f'/api/courses/?{query}')
+
+
+@pytest.mark.parametrize('encoding', ['gzip', 'br', 'zstd'])
+def test_get_courses_cached_compressed(benchmark, catalog, student_client, encoding):
+    """The full listing, served from the precompressed catalog snapshot."""
+    if encoding not in compression.available_encodings():
+        pytest.skip(f'{encoding} support is not installed')
+    _clear_listing_cache()
+    plain = len(_get(student_client, '/api/courses/').content)
+    response = benchmark(lambda: student_client.get('/api/courses/', HTTP_ACCEPT_ENCODING=encoding))
+    assert response['Content-Encoding'] == encoding
+    print(f"\n{catalog} courses: {plain} bytes, {len(response.content)} bytes with {encoding}")
+
+
+def test_get_courses_revalidate(benchmark, catalog, student_client):
+    """A conditional GET of an unchanged catalog: 304 without reading the listing."""
+    etag = _get(student_client, '/api/courses/')['ETag']
+
+    def revalidate():
+        response = student_client.get('/api/courses/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+    benchmark(revalidate)
+
+
+@pytest.mark.parametrize('query', ['', 'courseSubject=compsci', 'instructor=instructor 04'],
+                         ids=['all', 'subject', 'instructor'])
+def test_course_facets_uncached(benchmark, catalog, student_client, query):
+    benchmark.pedantic(lambda: _get(student_client, f'/api/courses/facets/?{query}'), setup=_clear_listing_cache)
+
+
+def test_course_conflicts(benchmark, catalog, student_client):
+    """Check a full 40-course schedule cart for conflicts."""
+    cart = [list(key) for key in Course.objects.filter(courseID__lte=40).values_list('courseSubject', 'courseID')]
+
+    def check():
+        response = student_client.post('/api/courses/conflicts/', {'courses': cart}, format='json')
+        assert response.status_code == 200, response.content
+
+    benchmark(check)
+
+
+def test_create_course(benchmark, catalog, staff_client, stubbed_discussions):
+    def body():
+        courseID = next(_new_ids)
+        return (), {'data': {
+            'courseID': courseID, 'courseSubject': 'BENCH', 'title': f'Benchmark {courseID}',
+            'instructor': 'Bench', 'credits': 3, 'schedule': 'MWF 10:00-10:50', 'room': 'B1',
+            'requirements': 'None', 'description': 'Created by the benchmark suite.',
+            'instruction_mode': 'In Person',
+        }}
+
+    def create(data):
+        response = staff_client.post('/api/courses/create/', data, format='json')
+        assert response.status_code == 201, response.content
+
+    benchmark.pedantic(create, setup=body)
+
+
+def test_delete_course(benchmark, catalog, staff_client, stubbed_discussions):
+    def existing_course():
+        courseID = next(_new_ids)
+        Course.objects.create(courseID=courseID, courseSubject='BENCH', title='Doomed', instructor='Bench',
+                              credits=3, schedule='F 9:00-9:50', room='B1', requirements='None',
+                              description='Deleted by the benchmark suite.', instruction_mode='Online')
+        return (courseID,), {}
+
+    def delete(courseID):
+        response = staff_client.delete(f'/api/courses/BENCH/{courseID}/delete/')
+        assert response.status_code == 204, response.content
+
+    benchmark.pedantic(delete, setup=existing_course)
+
+
+def test_bulk_delete_courses(benchmark, catalog, staff_client, stubbed_discussions):
+    """Delete 100 courses by key in one request (one DELETE, one outbox INSERT)."""
+    def existing_courses():
+        courses = [Course(courseID=next(_new_ids), courseSubject='BENCH', title='Doomed', instructor='Bench',
+                          credits=3, schedule='F 9:00-9:50', room='B1', requirements='None',
+                          description='Deleted by the benchmark suite.', instruction_mode='Online')
+                   for _ in range(100)]
+        Course.objects.bulk_create(courses)
+        return ({'courses': [['BENCH', course.courseID] for course in courses]},), {}
+
+    def bulk_delete(body):
+        response = staff_client.post('/api/courses/bulk-delete/', body, format='json')
+        assert response.status_code == 200, response.content
+        assert response.data['deleted'] == 100
+
+    benchmark.pedantic(bulk_delete, setup=existing_courses, rounds=10)
+
+
+def test_dispatch_outbox_batch(benchmark, catalog, stubbed_discussions):
+    """Deliver one batch of discussion-thread creations to the stub service."""
+    dispatcher = OutboxDispatcher()
+
+    def pending_batch():
+        DiscussionOutbox.objects.bulk_create([
+            DiscussionOutbox(action=DiscussionOutbox.ACTION_CREATE, course_subject='BENCH',
+                             course_id=next(_new_ids), payload={'title': 'Benchmark'})
+            for _ in range(dispatcher.batch_size)
+        ])
+        return (), {}
+
+    def run():
+        assert dispatcher.run_once() == dispatcher.batch_size
+
+    benchmark.pedantic(run, setup=pending_batch, rounds=5)
@@ -0,0 +1,101 @@
+"""
+Benchmarks of the prerequisite graph on a synthetic catalog of
+BENCH_GRAPH_SIZE (default 50,000) courses.
+
+Courses form tracks of five levels; each course above level 0 requires the
+previous course of its track and the same-level predecessor of another
+track, so closures hold up to 30 courses and chains cross tracks.
+"""
+import os
+import time
+
+import pytest
+from rest_framework.test import APIClient
+
+from base import prerequisites
+from base.models import Course
+
+pytestmark = pytest.mark.django_db
+
+GRAPH_SIZE = int(os.environ.get('BENCH_GRAPH_SIZE', '50000'))
+LEVELS = 5
+FIRST_ID = 30_000_000
+SUBJECTS = ['ALGEBRA', 'BOTANY', 'CHEMENG', 'DANCE', 'ECOLOGY', 'FRENCH', 'GENOMICS', 'HYDRO']
+
+
+def _key(i):
+    """Return the (subject, courseID) of the ``i``-th synthetic course."""
+    return SUBJECTS[(i // LEVELS) % len(SUBJECTS)], FIRST_ID + i
+
+
+def _requirements(i):
+    level, track = i % LEVELS, i // LEVELS
+    if level == 0:
+        return ''
+    tracks = GRAPH_SIZE // LEVELS
+    other = ((track * 7 + 3) % tracks) * LEVELS + level - 1
+    return ' and '.join(f'{subject} {courseID}' for subject, courseID in {_key(i - 1), _key(other)})
+
+
+@pytest.fixture(scope='module')
+def graph(django_db_setup, django_db_blocker):
+    """Seed the synthetic catalog and build its closure (timed once); removed again after the module."""
+    with django_db_blocker.unblock():
+        Course.objects.bulk_create((Course(
+            courseID=courseID, courseSubject=subject, title=f'{subject} {courseID}', instructor='Graph',
+            credits=3, schedule='TBA', room='G1', requirements=_requirements(i),
+            description='Synthetic prerequisite graph.', instruction_mode='Online',
+        ) for i in range(GRAPH_SIZE) for subject, courseID in [_key(i)]), batch_size=2000)
+        start = time.perf_counter()
+        prerequisites.rebuild()
+        print(f"\nBuilt the prerequisite closure of {GRAPH_SIZE} courses in {time.perf_counter() - start:.1f} s")
+        yield GRAPH_SIZE
+        # Cascades to the graph's edges and closure rows
+        Course.objects.filter(courseID__gte=FIRST_ID).delete()
+
+
+@pytest.fixture
+def student_client(make_token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {make_token(1, 'STUDENT')}")
+    return client
+
+
+@pytest.fixture
+def admin_client(make_token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {make_token(3, 'ADMIN')}")
+    return client
+
+
+def _get(client, url):
+    response = client.get(url)
+    assert response.status_code == 200, response.content
+    return response
+
+
+def test_prerequisites_of_top_level_course(benchmark, graph, student_client):
+    subject, courseID = _key(LEVELS * 1000 + LEVELS - 1)
+    benchmark(_get, student_client, f'/api/courses/{subject}/{courseID}/prerequisites/')
+
+
+def test_unlocks_of_entry_course(benchmark, graph, student_client):
+    subject, courseID = _key(LEVELS * 1000)
+    benchmark(_get, student_client, f'/api/courses/{subject}/{courseID}/unlocks/')
+
+
+def test_update_requirements(benchmark, graph, admin_client):
+    """Change a mid-level course's requirements, recomputing its dependents' closures."""
+    i = LEVELS * 2000 + 2
+    subject, courseID = _key(i)
+    alternatives = ['%s %d' % _key(i - 1), _requirements(i)]
+    rounds = iter(range(10 ** 6))
+
+    def update():
+        requirements = alternatives[next(rounds) % 2]
+        response = admin_client.patch(f'/api/courses/{subject}/{courseID}/', {'requirements': requirements},
+                                      format='json', HTTP_IF_MATCH='*')
+        assert response.status_code == 200, response.content
+
+    benchmark(update)
+
@@ -0,0 +1,275 @@
+"""
+Benchmark harness for the courses API.
+
+The ``bench_*.py`` modules in this directory are collected only when the
+directory is passed to pytest explicitly, so the regular test run is not
+slowed down:
+
+    cd coursesService
+    python -m pytest benchmarks
+
+Each benchmark uses the ``benchmark`` fixture (modelled on pytest-benchmark)
+and records latency percentiles, the number of SQL queries per call and the
+peak Python memory of one call. Results are compared against
+``baseline.json``; a benchmark fails if it issues more queries than its
+baseline, or is slower or uses more memory than the baseline allows.
+
+Environment variables:
+    BENCH_SIZES          comma-separated catalog sizes to seed (default 1000,10000)
+    BENCH_ROUNDS         timed rounds per benchmark (default 20)
+    BENCH_TOLERANCE      allowed relative slowdown against the baseline (default 1.0, i.e. 2x)
+    BENCH_BASELINE       baseline file (default benchmarks/baseline.json)
+    BENCH_SAVE_BASELINE  set to 1 to write this run's results into the baseline file
+"""
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import threading
+
+import pytest
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+
+BENCH_DIR = Path(__file__).resolve().parent
+SIZES = [int(size) for size in os.environ.get('BENCH_SIZES', '1000,10000').split(',') if size.strip()]
+ROUNDS = int(os.environ.get('BENCH_ROUNDS', '20'))
+TOLERANCE = float(os.environ.get('BENCH_TOLERANCE', '1.0'))
+BASELINE_PATH = Path(os.environ.get('BENCH_BASELINE', BENCH_DIR / 'baseline.json'))
+SAVE_BASELINE = os.environ.get('BENCH_SAVE_BASELINE') == '1'
+
+# Differences below these are treated as noise when comparing with the baseline
+MIN_SLOWDOWN_MS = 0.05
+MIN_MEMORY_GROWTH_KIB = 64
+
+_results = {}
+
+
+def _requested(config):
+    for arg in config.args:
+        path = (config.invocation_params.dir / arg.split('::')[0]).resolve()
+        if path == BENCH_DIR or BENCH_DIR in path.parents:
+            return True
+    return False
+
+
+def pytest_collect_file(file_path, parent):
+    if file_path.suffix == '.py' and file_path.name.startswith('bench_') and _requested(parent.config):
+        return pytest.Module.from_parent(parent, path=file_path)
+    return None
+
+
+def _load_baseline():
+    if BASELINE_PATH.exists():
+        return json.loads(BASELINE_PATH.read_text())
+    return {}
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class Benchmark:
+    """
+    Time a callable over several rounds and check the result against the baseline.
+
+    ``benchmark(fn, *args, **kwargs)`` runs ``fn(*args, **kwargs)`` each round;
+    ``benchmark.pedantic(fn, setup=setup)`` first calls ``setup()`` (untimed),
+    which returns the ``(args, kwargs)`` for that round. Both return the value
+    of the last call.
+    """
+
+    def __init__(self, name, baseline):
+        self.name = name
+        self.baseline = baseline
+        self.stats = None
+
+    def __call__(self, fn, *args, **kwargs):
+        return self.pedantic(fn, args=args, kwargs=kwargs)
+
+    def pedantic(self, fn, args=(), kwargs=None, setup=None, rounds=None):
+        kwargs = kwargs or {}
+
+        def prepare():
+            return setup() if setup else (args, kwargs)
+
+        # Warm-up round, which also counts queries. The log is emptied first
+        # because the test client also empties it when a request starts.
+        call_args, call_kwargs = prepare()
+        reset_queries()
+        with CaptureQueriesContext(connection) as queries:
+            result = fn(*call_args, **call_kwargs)
+        query_count = len(queries)
+
+        timings = []
+        for _ in range(rounds or ROUNDS):
+            call_args, call_kwargs = prepare()
+            start = time.perf_counter()
+            result = fn(*call_args, **call_kwargs)
+            timings.append(time.perf_counter() - start)
+
+        # Memory is traced in a separate round since tracing slows every allocation.
+        call_args, call_kwargs = prepare()
+        tracemalloc.start()
+        try:
+            fn(*call_args, **call_kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.stats = {
+            'rounds': len(timings),
+            'p50_ms': statistics.median(timings) * 1000,
+            'p95_ms': _percentile(timings, 0.95) * 1000,
+            'p99_ms': _percentile(timings, 0.99) * 1000,
+            'mean_ms': statistics.fmean(timings) * 1000,
+            'queries': query_count,
+            'peak_kib': peak / 1024,
+        }
+        _results[self.name] = self.stats
+        self._check()
+        return result
+
+    def _check(self):
+        expected = self.baseline.get(self.name)
+        if not expected or SAVE_BASELINE:
+            return
+        stats = self.stats
+        problems = []
+        if stats['queries'] > expected['queries']:
+            problems.append(f"{stats['queries']} queries, baseline {expected['queries']}")
+        allowed = expected['p50_ms'] * (1 + TOLERANCE)
+        if stats['p50_ms'] > allowed and stats['p50_ms'] - expected['p50_ms'] > MIN_SLOWDOWN_MS:
+            problems.append(f"p50 {stats['p50_ms']:.3f} ms, baseline {expected['p50_ms']:.3f} ms")
+        allowed = expected['peak_kib'] * (1 + TOLERANCE)
+        if stats['peak_kib'] > allowed and stats['peak_kib'] - expected['peak_kib'] > MIN_MEMORY_GROWTH_KIB:
+            problems.append(f"peak memory {stats['peak_kib']:.0f} KiB, baseline {expected['peak_kib']:.0f} KiB")
+        if problems:
+            pytest.fail(f"Performance regression in {self.name}: " + "; ".join(problems), pytrace=False)
+
+
+@pytest.fixture(scope='session')
+def benchmark_baseline():
+    return _load_baseline()
+
+
+@pytest.fixture
+def benchmark(request, benchmark_baseline):
+    return Benchmark(f"{request.node.path.name}::{request.node.name}", benchmark_baseline)
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not _results:
+        return
+    terminalreporter.section("benchmarks")
+    terminalreporter.write_line(
+        f"{'name':<64}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}{'peak KiB':>10}")
+    for name, stats in sorted(_results.items()):
+        terminalreporter.write_line(
+            f"{name:<64}{stats['p50_ms']:>10.3f}{stats['p95_ms']:>10.3f}{stats['p99_ms']:>10.3f}"
+            f"{stats['queries']:>9}{stats['peak_kib']:>10.0f}")
+    if SAVE_BASELINE:
+        baseline = _load_baseline()
+        baseline.update(_results)
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2, sort_keys=True) + '\n')
+        terminalreporter.write_line(f"Baseline written to {BASELINE_PATH}")
+
+
+# Catalog fixtures
+
+SUBJECTS = ['COMPSCI', 'MATH', 'BIOLOGY', 'CHEM', 'PHYSICS', 'HIST', 'ECON', 'ENGLISH',
+            'PHIL', 'PSYCH', 'STATS', 'ART', 'MUSIC', 'LINGUIST', 'GEO', 'ASTRON']
+TOPICS = ['Introduction to', 'Advanced', 'Topics in', 'Foundations of', 'Seminar in', 'Applied']
+AREAS = ['Networks', 'Algorithms', 'Genetics', 'Thermodynamics', 'Renaissance Art', 'Game Theory',
+         'Ethics', 'Cognition', 'Probability', 'Harmony', 'Syntax', 'Climate', 'Galaxies', 'Databases']
+DAYS = ['MWF', 'TuTh', 'MW', 'F']
+
+
+def build_course(i):
+    """Build one synthetic, deterministic course (unsaved)."""
+    from base.models import Course
+
+    area = AREAS[i % len(AREAS)]
+    course = Course(
+        courseID=i,
+        courseSubject=SUBJECTS[i % len(SUBJECTS)],
+        title=f"{TOPICS[i % len(TOPICS)]} {area} {i}",
+        instructor=f"Instructor {i % 997:03d}",
+        credits=i % 4 + 1,
+        schedule=f"{DAYS[i % len(DAYS)]} {8 + i % 10}:00-{8 + i % 10}:50",
+        room=f"ROOM{i % 300}",
+        requirements=f"{SUBJECTS[(i + 1) % len(SUBJECTS)]} {max(i - 7, 1)}" if i % 3 else "",
+        description=f"A course on {area.lower()} covering theory and practice. " * 8,
+        instruction_mode='Online' if i % 5 == 0 else 'In Person',
+    )
+    course.parse_schedule()
+    return course
+
+
+@pytest.fixture(scope='session', params=SIZES, ids=lambda size: f"{size}")
+def catalog(request, django_db_setup, django_db_blocker):
+    """
+    Seed the test database with ``request.param`` courses, shared by all
+    benchmarks for that size. Returns the catalog size.
+    """
+    from api import snapshot
+    from base import facets
+    from base.models import Course
+
+    size = request.param
+    with django_db_blocker.unblock():
+        Course.objects.all().delete()
+        Course.objects.bulk_create((build_course(i) for i in range(1, size + 1)), batch_size=2000)
+        facets.rebuild()
+        # Seeding bypasses the change log, so the catalog version does not move
+        snapshot.clear()
+    return size
+
+
+class _StubDiscussionsHandler(BaseHTTPRequestHandler):
+    def _reply(self):
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        self.send_response(201 if self.command == 'POST' else 204)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    do_POST = do_PATCH = do_DELETE = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def unlimited_rates(settings):
+    """Keep the rate limiter in the request path, with budgets no benchmark can exhaust."""
+    settings.COURSES_THROTTLE_RATES = {'read': '1000000000/s', 'write': '1000000000/s'}
+
+
+@pytest.fixture(scope='session')
+def discussions_stub():
+    """A local discussions service that accepts every request. Returns its base URL."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _StubDiscussionsHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/api/discussions/"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(scope='session')
+def make_token():
+    """Return a function that signs a JWT for ``(user_id, role)`` the way the auth service does."""
+    from django.conf import settings
+    from rest_framework_simplejwt.backends import TokenBackend
+
+    backend = TokenBackend(algorithm=settings.SIMPLE_JWT['ALGORITHM'],
+                           signing_key=settings.SIMPLE_JWT['SIGNING_KEY'])
+
+    def sign(user_id, role, lifetime=3600):
+        return backend.encode({'user_id': user_id, 'role': role, 'exp': int(time.time()) + lifetime})
+    return sign
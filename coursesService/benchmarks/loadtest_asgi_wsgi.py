@@ -0,0 +1,148 @@
+"""
+Compare request throughput of the course API under WSGI and ASGI.
+
+Starts one single-worker uvicorn server per configuration, sends a fixed
+number of concurrent GET requests, and prints throughput and latency
+percentiles for each:
+
+    wsgi        uvicorn --interface wsgi, DRF view     /api/courses/
+    asgi-sync   uvicorn (ASGI), DRF view               /api/courses/
+    asgi-async  uvicorn (ASGI), native async view      /api/async/courses/
+
+Usage (from the coursesService directory):
+
+    python benchmarks/loadtest_asgi_wsgi.py --requests 2000 --concurrency 50
+
+Requests are read-only; the configured database is not modified. The
+servers run with rate limits no run can exhaust (the limiter stays in the
+request path), and the script exits with status 1 if any request gets a
+non-2xx response.
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'coursesService.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from rest_framework_simplejwt.backends import TokenBackend  # noqa: E402
+
+CONFIGURATIONS = [
+    ('wsgi', ['coursesService.wsgi:application', '--interface', 'wsgi'], '/api/courses/'),
+    ('asgi-sync', ['coursesService.asgi:application'], '/api/courses/'),
+    ('asgi-async', ['coursesService.asgi:application'], '/api/async/courses/'),
+]
+
+# Passed to the servers, so every request is measured rather than throttled
+UNLIMITED_RATES = {
+    'COURSES_THROTTLE_READ_RATE': '1000000000/s',
+    'COURSES_THROTTLE_WRITE_RATE': '1000000000/s',
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=15.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(('127.0.0.1', port)) == 0:
+                return
+        time.sleep(0.1)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_load(url, headers, total, concurrency):
+    local = threading.local()
+    latencies = []
+    errors = Counter()
+
+    def one(_):
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        start = time.perf_counter()
+        response = session.get(url, headers=headers)
+        return time.perf_counter() - start, response.status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for elapsed, status_code in pool.map(one, range(total)):
+            latencies.append(elapsed)
+            if not 200 <= status_code < 300:
+                errors[status_code] += 1
+    wall = time.perf_counter() - start
+    return {
+        'rps': total / wall,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'errors': errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--query', default='limit=50', help="Query string sent with every request.")
+    args = parser.parse_args()
+
+    token = TokenBackend(algorithm='HS256', signing_key=settings.SECRET_KEY).encode(
+        {'user_id': 1, 'role': 'STUDENT', 'exp': int(time.time()) + 3600})
+    headers = {'Authorization': f'Bearer {token}'}
+    if settings.ALLOWED_HOSTS:
+        headers['Host'] = settings.ALLOWED_HOSTS[0]
+
+    failed = False
+    print(f"{'config':<12}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for name, target, path in CONFIGURATIONS:
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'uvicorn', *target, '--port', str(port), '--workers', '1', '--log-level', 'warning'],
+            cwd=PROJECT_DIR,
+            env={**os.environ, **UNLIMITED_RATES},
+        )
+        try:
+            wait_for_port(port)
+            url = f"http://127.0.0.1:{port}{path}?{args.query}"
+            warm_up = run_load(url, headers, min(50, args.requests), args.concurrency)
+            result = run_load(url, headers, args.requests, args.concurrency)
+        finally:
+            server.terminate()
+            server.wait()
+        errors = warm_up['errors'] + result['errors']
+        print(f"{name:<12}{result['rps']:>10.1f}{result['p50_ms']:>10.1f}{result['p99_ms']:>10.1f}{errors.total():>8}")
+        for status_code, count in sorted(errors.items()):
+            print(f"  {count} x HTTP {status_code}", file=sys.stderr)
+        failed = failed or bool(errors)
+    if failed:
+        sys.exit("error: some requests failed; the results above are not comparable")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,13 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional, Tuple
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from enum import IntFlag
+from functools import lru_cache
+from typing import Callable, Optional, Tuple
 
 from django.conf import settings
 from rest_framework.authentication import BaseAuthentication
@@ -10,18 +16,58 @@ from rest_framework.request import Request
 from rest_framework_simplejwt.backends import TokenBackend
 from rest_framework_simplejwt.exceptions import TokenBackendError
 
+from . import metrics
 
-@dataclass
+
+class Role(IntFlag):
+    """
+    Roles issued by the auth service, as bits so a permission check is one
+    ``&`` against the set of roles it allows.
+
+    Masks are kept as plain ``int`` on users and permission classes: ``&``
+    on IntFlag members builds a new member and is over ten times slower.
+    """
+
+    NONE = 0
+    STUDENT = 1
+    STAFF = 2
+    ADMIN = 4
+
+    @classmethod
+    def mask(cls, *roles: "Role") -> int:
+        """Return the plain-int bitmask of ``roles``."""
+        mask = 0
+        for role in roles:
+            mask |= role.value
+        return mask
+
+    @classmethod
+    def parse(cls, raw_role: Optional[str]) -> int:
+        """Return the bitmask of a token's ``role`` claim (case-insensitive); 0 if unknown."""
+        if not isinstance(raw_role, str):
+            return 0
+        return cls.__members__.get(raw_role.upper(), cls.NONE).value
+
+
+@dataclass(slots=True)
 class ExternalJWTUser:
     """
     Lightweight user representation that mirrors the data encoded
     by the auth service without requiring a local User record.
+
+    ``roles`` is the ``role`` claim parsed once into a ``Role`` bitmask when
+    the token is decoded; permission classes test it instead of comparing
+    strings.
     """
 
     id: int
     email: Optional[str] = None
     username: Optional[str] = None
     role: Optional[str] = None
+    roles: int = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.roles = Role.parse(self.role)
 
     @property
     def is_authenticated(self) -> bool:  # pragma: no cover - simple property
@@ -34,6 +80,73 @@ class ExternalJWTUser:
         return f"ExternalJWTUser(id={self.id}, email={self.email}, username={self.username}, role={self.role})"
 
 
+class TokenCache:
+    """
+    Bounded LRU cache of already-verified tokens.
+
+    Entries are keyed on a SHA-256 digest of the raw token, so tokens are
+    never kept in memory verbatim. Each entry expires at the earlier of the
+    cache TTL and the token's own ``exp`` claim, so an expired token is never
+    served from the cache.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.time) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[bytes, Tuple[float, tuple]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> Optional[tuple]:
+        key = self._key(token)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, token: str, value: tuple, exp: Optional[float] = None) -> None:
+        expires_at = self._clock() + self.ttl
+        if exp is not None:
+            expires_at = min(expires_at, exp)
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+@lru_cache(maxsize=8)
+def _token_backend(algorithm: str, signing_key: str) -> TokenBackend:
+    # Building a TokenBackend costs more than a cached authentication, and DRF
+    # builds a new authenticator per request, so share one per key
+    return TokenBackend(algorithm=algorithm, signing_key=signing_key)
+
+
 class ExternalJWTAuthentication(BaseAuthentication):
     """
     Authenticate requests using the JWTs issued by the user-auth service.
@@ -43,14 +156,23 @@ class ExternalJWTAuthentication(BaseAuthentication):
 
     keyword = "bearer"
 
+    # Shared by every instance: DRF builds a new authenticator per request.
+    token_cache = TokenCache(
+        maxsize=getattr(settings, "AUTH_TOKEN_CACHE_SIZE", 1024),
+        ttl=getattr(settings, "AUTH_TOKEN_CACHE_TTL", 300),
+    )
+
     def __init__(self) -> None:
         signing_key = settings.SIMPLE_JWT.get("SIGNING_KEY", settings.SECRET_KEY)
         algorithm = settings.SIMPLE_JWT.get("ALGORITHM", "HS256")
-        self.token_backend = TokenBackend(algorithm=algorithm, signing_key=signing_key)
+        self.token_backend = _token_backend(algorithm, signing_key)
 
     def authenticate(self, request: Request) -> Optional[Tuple[ExternalJWTUser, dict]]:
+        with metrics.timed("auth"):
+            return self._authenticate(request)
+
+    def _authenticate(self, request: Request) -> Optional[Tuple[ExternalJWTUser, dict]]:
         auth_header = request.headers.get("Authorization")
-        print("53-auth_header: ", auth_header)
         if not auth_header:
             return None
 
@@ -62,8 +184,11 @@ class ExternalJWTAuthentication(BaseAuthentication):
         if scheme.lower() != self.keyword:
             return None
 
+        cached = self.token_cache.get(token)
+        if cached is not None:
+            return cached
+
         payload = self._decode_token(token)
-        print("payload: ",payload)
         raw_user_id = payload.get("user_id")
         if raw_user_id is None:
             raise AuthenticationFailed("Token payload missing user_id")
@@ -79,7 +204,8 @@ class ExternalJWTAuthentication(BaseAuthentication):
             username=payload.get("username"),
             role=payload.get("role")
         )
-        print("user: ", user)
+        exp = payload.get("exp")
+        self.token_cache.set(token, (user, payload), exp=exp if isinstance(exp, (int, float)) else None)
         return (user, payload)
 
     def _decode_token(self, token: str) -> dict:
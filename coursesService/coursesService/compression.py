@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import gzip
+from typing import Callable, Dict, Optional
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.http import parse_etags
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+# Negotiated response compression.
+#
+# CompressionMiddleware compresses buffered responses of at least
+# COURSES_COMPRESSION_MIN_SIZE bytes with the best encoding the client accepts
+# (Accept-Encoding q-values first, then the server preference in
+# COURSES_COMPRESSION_ENCODINGS). Brotli and Zstandard are used when the
+# optional ``brotli``/``zstandard`` packages are installed; gzip always is.
+#
+# ETags stay strong: each encoding gets its own tag ("<etag>-gzip"), and the
+# suffix is stripped from If-None-Match/If-Match before views compare tags, so
+# views only ever see the tags they issued.
+
+COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {
+    # mtime=0 keeps the output byte-identical for identical bodies, as a strong ETag requires
+    "gzip": lambda data: gzip.compress(data, compresslevel=settings.COURSES_COMPRESSION_GZIP_LEVEL, mtime=0),
+}
+if brotli is not None:
+    COMPRESSORS["br"] = lambda data: brotli.compress(data, quality=settings.COURSES_COMPRESSION_BROTLI_QUALITY)
+if zstandard is not None:
+    COMPRESSORS["zstd"] = lambda data: zstandard.ZstdCompressor(
+        level=settings.COURSES_COMPRESSION_ZSTD_LEVEL).compress(data)
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+def available_encodings():
+    """Return the configured encodings that can be produced in this process, in preference order."""
+    return [encoding for encoding in settings.COURSES_COMPRESSION_ENCODINGS if encoding in COMPRESSORS]
+
+
+def negotiate(accept_encoding: str, encodings) -> Optional[str]:
+    """
+    Pick the encoding of ``encodings`` (in preference order) that an
+    ``Accept-Encoding`` header ranks highest, or ``None`` for identity.
+    """
+    if not accept_encoding:
+        return None
+    qualities = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        quality = 1.0
+        params = params.strip().replace(" ", "")
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[coding] = quality
+    wildcard = qualities.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = qualities.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """Return the strong ETag of the ``encoding`` variant of a response tagged ``etag``."""
+    return f'{etag[:-1]}-{encoding}"' if etag.endswith('"') and not etag.startswith("W/") else etag
+
+
+def strip_encoding(etag: str) -> str:
+    """Return the tag a view issued for a (possibly) encoded variant's ``etag``."""
+    if etag.startswith('"') and etag.endswith('"'):
+        for encoding in COMPRESSORS:
+            suffix = f'-{encoding}"'
+            if etag.endswith(suffix):
+                return etag[:-len(suffix)] + '"'
+    return etag
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress responses above COURSES_COMPRESSION_MIN_SIZE with the best
+    encoding the client accepts.
+
+    Streaming responses (exports, the SSE change feed) and responses that
+    already carry a Content-Encoding are passed through untouched, so views
+    can serve pre-compressed bytes themselves.
+    """
+
+    def process_request(self, request):
+        # Let views compare the tags they issued, whatever variant the client holds
+        for header in ("HTTP_IF_NONE_MATCH", "HTTP_IF_MATCH"):
+            value = request.META.get(header)
+            if value and "-" in value:
+                request.META[f"{header}_ENCODED"] = value
+                request.META[header] = ", ".join(strip_encoding(etag) for etag in parse_etags(value))
+
+    def process_response(self, request, response):
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if response.has_header("Content-Encoding") or response.streaming:
+            return response
+        encoding = negotiate(request.META.get("HTTP_ACCEPT_ENCODING", ""), available_encodings())
+        if encoding is None:
+            return response
+
+        etag = response.get("ETag")
+        if response.status_code == 304:
+            # Echo the variant the client holds, so it keeps revalidating with it
+            if etag and encoded_etag(etag, encoding) in request.META.get("HTTP_IF_NONE_MATCH_ENCODED", ""):
+                response["ETag"] = encoded_etag(etag, encoding)
+            return response
+        if (response.status_code != 200
+                or len(response.content) < settings.COURSES_COMPRESSION_MIN_SIZE
+                or not response.get("Content-Type", "").startswith(COMPRESSIBLE_TYPES)
+                or "no-transform" in response.get("Cache-Control", "")):
+            return response
+
+        compressed = COMPRESSORS[encoding](response.content)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+        if etag:
+            response["ETag"] = encoded_etag(etag, encoding)
+        return response
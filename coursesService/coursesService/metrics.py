@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+import contextvars
+import ipaddress
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Optional, Sequence, Tuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+
+# Per-request performance instrumentation.
+#
+# MetricsMiddleware opens a RequestTimings for every request. Database
+# queries (through a connection execute wrapper), outbound HTTP calls and
+# authentication add their time to it, and the middleware folds the totals
+# into in-process histograms served at /metrics in the Prometheus text format.
+# Metrics are per process: with several workers, scrape each one or sum them.
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# Methods recorded under their own label; any other verb a client sends is
+# counted as "other", so clients cannot create series without bound.
+METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+
+
+def method_label(method: str) -> str:
+    return method if method in METHODS else "other"
+
+
+class Histogram:
+    """A fixed-bucket histogram of one labelled series."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    """Thread-safe collection of histogram families and counters."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._families: Dict[str, Tuple[str, Sequence[float]]] = {}
+        self._histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Histogram] = {}
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._counter_help: Dict[str, str] = {}
+        # Bumped by clear() so cached series handles can be dropped
+        self.generation = 0
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float]) -> None:
+        self._families[name] = (help_text, buckets)
+
+    def counter(self, name: str, help_text: str) -> None:
+        self._counter_help[name] = help_text
+
+    @property
+    def lock(self) -> threading.Lock:
+        """Lock to hold while observing into histograms returned by :meth:`series`."""
+        return self._lock
+
+    def series(self, name: str, **labels: str) -> Histogram:
+        """Return the histogram of ``name`` with ``labels``, creating it on first use."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self._families[name][1])
+            return histogram
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        histogram = self.series(name, **labels)
+        with self._lock:
+            histogram.observe(value)
+
+    def inc(self, name: str, amount: float = 1, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self.generation += 1
+
+    def render(self) -> str:
+        """Return every series in the Prometheus text exposition format."""
+        with self._lock:
+            histograms = {key: (list(h.counts), h.sum, h.count) for key, h in self._histograms.items()}
+            counters = dict(self._counters)
+        lines = []
+        for name, (help_text, buckets) in sorted(self._families.items()):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for (series, labels), (counts, total, count) in sorted(histograms.items()):
+                if series != name:
+                    continue
+                cumulative = 0
+                for bound, bucket_count in zip([*buckets, "+Inf"], counts):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{_labels(labels, le=_number(bound))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+                lines.append(f"{name}_count{_labels(labels)} {count}")
+        for name, help_text in sorted(self._counter_help.items()):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for (series, labels), value in sorted(counters.items()):
+                if series == name:
+                    lines.append(f"{name}{_labels(labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _number(value) -> str:
+    if isinstance(value, str):
+        return value
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _labels(labels, **extra) -> str:
+    pairs = [*labels, *extra.items()]
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+registry = Registry()
+registry.histogram("courses_request_duration_seconds", "Wall time of API requests.", LATENCY_BUCKETS)
+registry.histogram("courses_request_db_queries", "Database queries per API request.", QUERY_COUNT_BUCKETS)
+registry.histogram("courses_request_db_duration_seconds", "Database time per API request.", LATENCY_BUCKETS)
+registry.histogram("courses_request_http_duration_seconds",
+                   "Outbound HTTP time per API request.", LATENCY_BUCKETS)
+registry.histogram("courses_request_auth_duration_seconds", "Authentication time per API request.", LATENCY_BUCKETS)
+registry.histogram("courses_response_size_bytes", "Size of API response bodies.", SIZE_BUCKETS)
+registry.histogram("courses_discussions_request_duration_seconds",
+                   "Duration of calls to the discussions service, including background delivery.",
+                   LATENCY_BUCKETS)
+registry.counter("courses_requests_total", "API requests by view, method and status code.")
+
+
+class RequestTimings:
+    """Time spent in each instrumented phase of the current request."""
+
+    __slots__ = ("db_queries", "db", "http", "auth")
+
+    def __init__(self) -> None:
+        self.db_queries = 0
+        self.db = 0.0
+        self.http = 0.0
+        self.auth = 0.0
+
+
+_current: contextvars.ContextVar[Optional[RequestTimings]] = contextvars.ContextVar("request_timings", default=None)
+
+
+def current() -> Optional[RequestTimings]:
+    """Return the timings of the request being handled, or ``None`` outside a request."""
+    return _current.get()
+
+
+@contextmanager
+def timed(phase: str):
+    """Add the duration of the block to ``phase`` (``'auth'`` or ``'http'``) of the current request."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(timings, phase, getattr(timings, phase) + time.perf_counter() - start)
+
+
+def observe_discussions_call(elapsed: float) -> None:
+    """Record one call to the discussions service, made in or outside a request."""
+    registry.observe("courses_discussions_request_duration_seconds", elapsed)
+    timings = _current.get()
+    if timings is not None:
+        timings.http += elapsed
+
+
+def _db_wrapper(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db += time.perf_counter() - start
+        timings.db_queries += 1
+
+
+def _install_db_wrapper(connection) -> None:
+    if _db_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_db_wrapper)
+
+
+def _on_connection_created(sender, connection, **kwargs) -> None:
+    _install_db_wrapper(connection)
+
+
+# api.apps imports this module at startup, before any connection is opened.
+connection_created.connect(_on_connection_created)
+
+
+class MetricsMiddleware:
+    """
+    Record wall time, DB queries and time, outbound HTTP time, authentication
+    time and response size for every request, labelled by view name.
+
+    With ``METRICS_SERVER_TIMING`` enabled the same breakdown is returned in a
+    ``Server-Timing`` header. Overhead is a few microseconds per request: the
+    counters live in a context variable and are folded into the histograms
+    once, when the response is ready.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+        self.server_timing = getattr(settings, "METRICS_SERVER_TIMING", True)
+        # Histograms per (view, method), so a request looks its series up once
+        self._cache = {}
+        self._cache_generation = registry.generation
+        self._is_async = iscoroutinefunction(get_response)
+        if self._is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self._is_async:
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, timings, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, timings, time.perf_counter() - start)
+
+    def _series(self, view: str, method: str):
+        key = (view, method)
+        series = self._cache.get(key)
+        if series is None or self._cache_generation != registry.generation:
+            if self._cache_generation != registry.generation:
+                self._cache = {}
+                self._cache_generation = registry.generation
+            series = self._cache[key] = (
+                registry.series("courses_request_duration_seconds", view=view, method=method),
+                registry.series("courses_request_db_queries", view=view),
+                registry.series("courses_request_db_duration_seconds", view=view),
+                registry.series("courses_request_http_duration_seconds", view=view),
+                registry.series("courses_request_auth_duration_seconds", view=view),
+                registry.series("courses_response_size_bytes", view=view),
+            )
+        return series
+
+    def _finish(self, request, response, timings: RequestTimings, elapsed: float):
+        match = request.resolver_match
+        view = match.view_name if match else "unmatched"
+        if view == "metrics":
+            return response
+        method = method_label(request.method)
+        duration, queries, db, http, auth, size = self._series(view, method)
+        with registry.lock:
+            duration.observe(elapsed)
+            queries.observe(timings.db_queries)
+            db.observe(timings.db)
+            http.observe(timings.http)
+            auth.observe(timings.auth)
+            if not response.streaming:
+                size.observe(len(response.content))
+        registry.inc("courses_requests_total", view=view, method=method, status=str(response.status_code))
+
+        if self.server_timing:
+            response["Server-Timing"] = (
+                f'auth;dur={timings.auth * 1000:.2f}, '
+                f'db;dur={timings.db * 1000:.2f};desc="{timings.db_queries} queries", '
+                f'http;dur={timings.http * 1000:.2f}, '
+                f'total;dur={elapsed * 1000:.2f}'
+            )
+        return response
+
+
+def _metrics_allowed(address: Optional[str]) -> bool:
+    networks = settings.METRICS_ALLOWED_NETWORKS
+    if networks is None:
+        return True
+    try:
+        address = ipaddress.ip_address(address or "")
+    except ValueError:
+        return False
+    return any(address in ipaddress.ip_network(network) for network in networks)
+
+
+def metrics_view(request):
+    """
+    Serve the collected metrics in the Prometheus text format, to clients in
+    METRICS_ALLOWED_NETWORKS only.
+    """
+    if not _metrics_allowed(request.META.get("REMOTE_ADDR")):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
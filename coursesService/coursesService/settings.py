@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -42,12 +45,16 @@ INSTALLED_APPS = [
     'rest_framework',
     'rest_framework_simplejwt',
     'base.apps.BaseConfig',
+    'api.apps.ApiConfig',
 ]
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'coursesService.authentication.ExternalJWTAuthentication',
     ),
+    'DEFAULT_THROTTLE_CLASSES': (
+        'api.throttling.ReadWriteThrottle',
+    ),
 }
 
 SIMPLE_JWT = {
@@ -55,7 +62,13 @@ SIMPLE_JWT = {
     'SIGNING_KEY': SECRET_KEY,
 }
 
+# Verified-token cache in ExternalJWTAuthentication (entries also expire at the token's exp)
+AUTH_TOKEN_CACHE_SIZE = 1024
+AUTH_TOKEN_CACHE_TTL = 300  # seconds
+
 MIDDLEWARE = [
+    'coursesService.metrics.MetricsMiddleware',
+    'coursesService.compression.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -89,10 +102,73 @@ WSGI_APPLICATION = 'coursesService.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
+# Selected with environment variables:
+#   COURSES_DB_ENGINE          'sqlite' (default) or 'postgres'
+#   COURSES_DB_CONN_MAX_AGE    seconds a connection is reused across requests (default 60)
+#   COURSES_DB_NAME            database name (SQLite: file path)
+#   COURSES_DB_USER, COURSES_DB_PASSWORD, COURSES_DB_HOST, COURSES_DB_PORT   PostgreSQL only
+#   COURSES_DB_POOL            PostgreSQL only: '1' to use a psycopg connection pool per process
+#   COURSES_DB_POOL_MIN_SIZE, COURSES_DB_POOL_MAX_SIZE                       pool bounds (default 2 / 10)
+#   COURSES_SQLITE_BUSY_TIMEOUT  seconds a SQLite writer waits for the write lock (default 5)
+
+DB_ENGINE = os.environ.get('COURSES_DB_ENGINE', 'sqlite')
+DB_CONN_MAX_AGE = int(os.environ.get('COURSES_DB_CONN_MAX_AGE', '60'))
+
+if DB_ENGINE == 'postgres':
+    DB_POOL = os.environ.get('COURSES_DB_POOL') == '1'
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('COURSES_DB_NAME', 'courses'),
+            'USER': os.environ.get('COURSES_DB_USER', 'courses'),
+            'PASSWORD': os.environ.get('COURSES_DB_PASSWORD', ''),
+            'HOST': os.environ.get('COURSES_DB_HOST', 'localhost'),
+            'PORT': os.environ.get('COURSES_DB_PORT', '5432'),
+            # A pool hands connections back after each request, so it replaces persistent connections.
+            'CONN_MAX_AGE': 0 if DB_POOL else DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.environ.get('COURSES_DB_POOL_MIN_SIZE', '2')),
+                    'max_size': int(os.environ.get('COURSES_DB_POOL_MAX_SIZE', '10')),
+                },
+            } if DB_POOL else {},
+        }
+    }
+elif DB_ENGINE == 'sqlite':
+    SQLITE_BUSY_TIMEOUT = float(os.environ.get('COURSES_SQLITE_BUSY_TIMEOUT', '5'))
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('COURSES_DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                # WAL lets readers proceed while a write is in progress; NORMAL
+                # sync is durable across application crashes in WAL mode.
+                'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL',
+                # Take the write lock when a transaction starts, so concurrent
+                # writers queue on the busy timeout instead of failing with
+                # "database is locked" when upgrading a read lock.
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': SQLITE_BUSY_TIMEOUT,
+            },
+        }
+    }
+else:
+    raise ImproperlyConfigured(f"Unsupported COURSES_DB_ENGINE {DB_ENGINE!r}; use 'sqlite' or 'postgres'")
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'courses-service',
+        'OPTIONS': {
+            'MAX_ENTRIES': 1000,
+        },
     }
 }
 
@@ -138,4 +214,79 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
-DISCUSSIONS_API_BASE_URL = "https://isolweb.pythonanywhere.com/api/discussions/"
\ No newline at end of file
+DISCUSSIONS_API_BASE_URL = "https://isolweb.pythonanywhere.com/api/discussions/"
+
+# Discussions client (see api/discussions.py)
+DISCUSSIONS_CONNECT_TIMEOUT = 3.05  # seconds
+DISCUSSIONS_READ_TIMEOUT = 10.0  # seconds
+DISCUSSIONS_POOL_SIZE = 10  # keep-alive connections shared by all threads
+DISCUSSIONS_BREAKER_FAILURE_THRESHOLD = 5  # consecutive failures that open the circuit
+DISCUSSIONS_BREAKER_RESET_TIMEOUT = 30.0  # seconds before a trial call is allowed
+
+# Discussions outbox delivery (see api/outbox.py and `manage.py dispatch_outbox`)
+DISCUSSIONS_OUTBOX_AUTOSTART = True  # deliver from a background thread in the web process
+DISCUSSIONS_OUTBOX_CONCURRENCY = 4
+DISCUSSIONS_OUTBOX_BATCH_SIZE = 50
+DISCUSSIONS_OUTBOX_MAX_ATTEMPTS = 8
+DISCUSSIONS_OUTBOX_BACKOFF_BASE = 2.0  # seconds; doubles per attempt
+DISCUSSIONS_OUTBOX_BACKOFF_MAX = 300.0
+DISCUSSIONS_OUTBOX_LEASE = 60  # seconds a claimed entry is hidden from other dispatchers
+DISCUSSIONS_OUTBOX_POLL_INTERVAL = 5.0
+
+# Cursor pagination for GET /api/courses/ (opt-in via ?limit= or ?cursor=)
+COURSES_PAGE_DEFAULT_LIMIT = 50
+COURSES_PAGE_MAX_LIMIT = 500
+
+# Maximum number of ranked results returned by GET /api/courses/?q=
+COURSES_SEARCH_MAX_RESULTS = 100
+
+# Response cache for GET /api/courses/ (invalidated on every course write)
+COURSES_CACHE_ALIAS = 'default'
+COURSES_CACHE_TIMEOUT = 300
+
+# Bulk import (POST /api/courses/bulk/ and `manage.py import_courses`)
+COURSES_IMPORT_BATCH_SIZE = 1000
+COURSES_IMPORT_MAX_REPORTED_ERRORS = 1000
+
+# Rows fetched per database round trip when streaming /api/courses/export/
+COURSES_EXPORT_CHUNK_SIZE = 2000
+
+# Per-request instrumentation (see coursesService/metrics.py); metrics are served at /metrics
+METRICS_SERVER_TIMING = True  # add a Server-Timing header with the auth/db/http breakdown
+# Client networks that may read /metrics, checked against REMOTE_ADDR (the direct peer, so
+# behind a reverse proxy only list the scraper's own address, never the proxy's network).
+# Loopback only by default; None allows everyone.
+METRICS_ALLOWED_NETWORKS = ('127.0.0.0/8', '::1/128')
+
+# Batch lookup (POST /api/courses/lookup/)
+COURSES_LOOKUP_MAX_KEYS = 100
+
+# Bulk delete (POST /api/courses/bulk-delete/): most courses one request may delete
+COURSES_BULK_DELETE_MAX_COURSES = 5000
+
+# Change feed (GET /api/courses/changes/)
+COURSES_CHANGES_MAX_LIMIT = 500  # changes per response
+COURSES_CHANGES_MAX_WAIT = 30.0  # seconds a long-poll request may wait
+COURSES_CHANGES_POLL_INTERVAL = 1.0  # seconds between checks for writes made by other processes
+COURSES_CHANGES_SSE_HEARTBEAT = 15.0  # seconds between keep-alive comments on an idle stream
+COURSES_CHANGES_SSE_MAX_DURATION = 300.0  # seconds before a stream ends; EventSource reconnects
+COURSES_CHANGES_MAX_WAITERS = 4  # long-poll/SSE readers per process; each holds a worker thread
+
+# Response compression (see coursesService/compression.py)
+COURSES_COMPRESSION_MIN_SIZE = 1024  # bytes; smaller responses are sent as is
+COURSES_COMPRESSION_ENCODINGS = ('br', 'zstd', 'gzip')  # preference order; br/zstd need brotli/zstandard installed
+COURSES_COMPRESSION_GZIP_LEVEL = 6
+COURSES_COMPRESSION_BROTLI_QUALITY = 5
+COURSES_COMPRESSION_ZSTD_LEVEL = 3
+
+# Pre-serialized snapshot of the unfiltered GET /api/courses/ (see api/snapshot.py)
+COURSES_SNAPSHOT_CACHE_ALIAS = None  # cache alias shared by all workers (e.g. Redis); None keeps snapshots per process
+COURSES_SNAPSHOT_PREBUILD = True  # rebuild in a background thread after each catalog write
+
+# Token-bucket rate limits per client (see api/throttling.py); a rate of None disables a scope
+COURSES_THROTTLE_RATES = {
+    'read': os.environ.get('COURSES_THROTTLE_READ_RATE', '1200/min'),  # GET endpoints and read-only POST lookups
+    'write': os.environ.get('COURSES_THROTTLE_WRITE_RATE', '120/min'),  # create, update, delete and bulk endpoints
+}
+COURSES_THROTTLE_STORE = 'api.throttling.LocalBucketStore'  # or 'api.throttling.CacheBucketStore' to share buckets between workers
+COURSES_THROTTLE_CACHE_ALIAS = 'default'  # cache used by CacheBucketStore